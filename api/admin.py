@@ -1,5 +1,9 @@
 from django.contrib import admin
 from core.models import Note, Category
+from core.search import filter_notes
+from core.usage import apply_usage_changes, note_links
+from .services import duplicate_notes
+from django.db.models import Q
 from django.utils.html import format_html
 from django.urls import reverse
 from django.contrib.auth import get_user_model
@@ -7,15 +11,54 @@ from django.contrib.auth import get_user_model
 User = get_user_model()
 
 
+class OwnerFilter(admin.SimpleListFilter):
+    """
+    Filtro por proprietário com um campo de texto (nome de usuário exato)
+    em vez da lista de todos os usuários, que não escala na barra lateral.
+    """
+
+    title = "proprietário"
+    parameter_name = "owner"
+    template = "admin/input_filter.html"
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        username = (self.value() or "").strip()
+        if username:
+            return queryset.filter(owner__username=username)
+        return queryset
+
+    def choices(self, changelist):
+        # Só a opção "Todos", com os demais parâmetros da URL para o formulário
+        query_string = changelist.get_query_string(remove=[self.parameter_name])
+        yield {
+            "selected": self.value() is None,
+            "query_string": query_string,
+            "query_parts": [
+                (key, value)
+                for key, value in changelist.params.items()
+                if key != self.parameter_name
+            ],
+            "display": "Todos",
+        }
+
+
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ("name", "note_count")
     search_fields = ("name",)
 
     def note_count(self, obj):
-        return obj.notes.count()  # Aqui foi feita a correção, usando o 'related_name'
+        # Contador mantido pelos sinais, sem COUNT por linha
+        return obj.usage_count
 
     note_count.short_description = "Número de Notas"
+    note_count.admin_order_field = "usage_count"
 
 
 @admin.register(Note)
@@ -27,7 +70,7 @@ class NoteAdmin(admin.ModelAdmin):
         "created_at",
         "updated_at",
     )
-    list_filter = ("categories", "owner", "created_at")
+    list_filter = ("categories", OwnerFilter, "created_at")
     search_fields = ("title", "content", "categories__name", "owner__username")
     readonly_fields = ("created_at", "updated_at")
     actions = ["duplicate_note"]
@@ -44,24 +87,44 @@ class NoteAdmin(admin.ModelAdmin):
     categories_list.short_description = "Categorias"
 
     def owner_link(self, obj):
-        url = reverse("admin:auth_user_change", args=[obj.owner.id])
+        url = reverse("admin:auth_user_change", args=[obj.owner_id])
         return format_html('<a href="{}">{}</a>', url, obj.owner.username)
 
     owner_link.short_description = "Proprietário"
+    owner_link.admin_order_field = "owner__username"
 
     def duplicate_note(self, request, queryset):
-        for note in queryset:
-            note.pk = None
-            note.title = f"Cópia de {note.title}"
-            note.save()
-        self.message_user(
-            request, f"{queryset.count()} nota(s) duplicada(s) com sucesso."
-        )
+        copies = duplicate_notes(queryset.order_by("pk"))
+        self.message_user(request, f"{len(copies)} nota(s) duplicada(s) com sucesso.")
 
     duplicate_note.short_description = "Duplicar nota(s) selecionada(s)"
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Usa o índice de busca para título e conteúdo em vez de icontains,
+        mantendo a busca exata por nome de categoria e usuário.
+        """
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+
+        owner_id = None if request.user.is_superuser else request.user.id
+        matches = filter_notes(Note.objects.all(), search_term, owner_id=owner_id)
+        queryset = queryset.filter(
+            Q(id__in=matches.values("id"))
+            | Q(categories__name=" ".join(search_term.lower().split()))
+            | Q(owner__username=search_term)
+        )
+        return queryset, True
+
     def get_queryset(self, request):
-        qs = super().get_queryset(request)
+        # Proprietário e categorias carregados de uma vez para toda a página
+        qs = (
+            super()
+            .get_queryset(request)
+            .select_related("owner")
+            .prefetch_related("categories")
+        )
         if request.user.is_superuser:
             return qs
         return qs.filter(owner=request.user)
@@ -74,4 +137,16 @@ class NoteAdmin(admin.ModelAdmin):
     def save_model(self, request, obj, form, change):
         if not obj.pk and not request.user.is_superuser:
             obj.owner = request.user
+        # Ligações lidas antes de salvar, ainda com o dono anterior
+        links = None
+        if change and "owner" in form.changed_data:
+            links = note_links(note_id=obj.pk)
         super().save_model(request, obj, form, change)
+        if links:
+            # Os contadores de uso por usuário passam para o novo dono; as
+            # categorias alteradas no mesmo formulário são contadas depois,
+            # pelo m2m_changed do save_related, já com o novo dono
+            apply_usage_changes(
+                added=[(obj.owner_id, category_id) for _, category_id in links],
+                removed=links,
+            )
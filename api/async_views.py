@@ -0,0 +1,314 @@
+import asyncio
+import base64
+import binascii
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import aauthenticate
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import serializers
+from rest_framework.authentication import CSRFCheck, get_authorization_header
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.validators import UniqueValidator
+
+from core.events import get_event_backend, user_channel
+from core.models import Category, Note
+from .serializers import CategorySerializer, NoteSerializer
+
+
+def render_json(data):
+    """
+    Serializa como o JSONRenderer do DRF (compacto, sem escapar unicode),
+    para que as respostas sejam iguais às do caminho síncrono.
+    """
+    return json.dumps(
+        data, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def json_response(data, status=200):
+    return HttpResponse(
+        render_json(data), status=status, content_type="application/json"
+    )
+
+
+class AuthenticationFailed(Exception):
+    """
+    Credenciais enviadas, porém inválidas (resposta 401).
+    """
+
+
+class AsyncAPIView(View):
+    """
+    Base das views assíncronas da API.
+
+    Sob ASGI, as views do DRF são síncronas e cada requisição ocupa uma
+    thread do pool do sync_to_async. Estas views rodam direto no event loop:
+    autenticam com ``request.auser()`` (sessão) ou ``aauthenticate`` (HTTP
+    Basic), com a mesma verificação de CSRF do DRF para sessões, e usam o
+    ORM assíncrono. Erros seguem o formato ``{"detail": ...}`` do DRF.
+    """
+
+    http_method_names = ["get", "post", "options"]
+    chunk_size = 500
+    www_authenticate_realm = "api"
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # O CSRF é verificado em dispatch só para sessões, como no DRF
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            user, via_session = await self.authenticate(request)
+        except AuthenticationFailed as exc:
+            return self.unauthorized(str(exc))
+        if user is None:
+            return self.unauthorized("Authentication credentials were not provided.")
+
+        if via_session and request.method not in SAFE_METHODS:
+            reason = self.check_csrf(request)
+            if reason:
+                return json_response({"detail": f"CSRF Failed: {reason}"}, status=403)
+
+        request.user = user
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def authenticate(self, request):
+        """
+        Retorna ``(usuário, veio_da_sessão)``; o usuário é None quando a
+        requisição não traz credenciais.
+        """
+        auth = get_authorization_header(request).split()
+        if auth and auth[0].lower() == b"basic":
+            try:
+                decoded = base64.b64decode(auth[1]).decode("utf-8")
+                username, _, password = decoded.partition(":")
+            except (IndexError, binascii.Error, UnicodeDecodeError):
+                raise AuthenticationFailed("Invalid basic header.")
+            user = await aauthenticate(request, username=username, password=password)
+            if user is None or not user.is_active:
+                raise AuthenticationFailed("Invalid username/password.")
+            return user, False
+
+        user = await request.auser()
+        if user.is_authenticated and user.is_active:
+            return user, True
+        return None, False
+
+    def check_csrf(self, request):
+        check = CSRFCheck(lambda request: None)
+        check.process_request(request)
+        return check.process_view(request, None, (), {})
+
+    def unauthorized(self, detail):
+        response = json_response({"detail": detail}, status=401)
+        response["WWW-Authenticate"] = f'Basic realm="{self.www_authenticate_realm}"'
+        return response
+
+    def parse_body(self, request):
+        """
+        Lê o corpo JSON; retorna ``(dados, resposta_de_erro)``.
+        """
+        try:
+            return json.loads(request.body or b"null"), None
+        except ValueError as exc:
+            return None, json_response({"detail": f"JSON parse error - {exc}"}, 400)
+
+    def stream_list(self, queryset, serializer):
+        """
+        Resposta com um array JSON gerado em streaming a partir do
+        ``aiterator`` do queryset, em blocos de ``chunk_size`` linhas.
+        """
+
+        async def rows():
+            # Cada bloco lido do banco vira uma única mensagem do corpo,
+            # em vez de uma por linha
+            buffer = [b"["]
+            count = 0
+            async for obj in queryset.aiterator(chunk_size=self.chunk_size):
+                if count:
+                    buffer.append(b",")
+                buffer.append(render_json(serializer.to_representation(obj)))
+                count += 1
+                if count % self.chunk_size == 0:
+                    yield b"".join(buffer)
+                    buffer = []
+            buffer.append(b"]")
+            yield b"".join(buffer)
+
+        return StreamingHttpResponse(rows(), content_type="application/json")
+
+
+class AsyncNoteListView(AsyncAPIView):
+    """
+    ``GET`` lista e ``POST`` cria notas do usuário atual, com o mesmo
+    formato do ``NoteViewSet``. A criação passa pelo ``NoteSerializer``
+    numa thread (``sync_to_async``), já que a transação com a nota e as
+    categorias não pode ser aberta pelo ORM assíncrono.
+    """
+
+    def get_queryset(self):
+        return NoteSerializer.setup_eager_loading(
+            Note.objects.filter(owner=self.request.user).order_by("id")
+        )
+
+    async def get(self, request):
+        return self.stream_list(self.get_queryset(), NoteSerializer())
+
+    async def post(self, request):
+        data, error = self.parse_body(request)
+        if error:
+            return error
+        serializer = NoteSerializer(data=data, context={"request": request})
+        if not serializer.is_valid():
+            return json_response(serializer.errors, status=400)
+
+        try:
+            # O mesmo NoteSerializer.create do caminho síncrono: a nota e as
+            # categorias são gravadas numa única transação
+            note = await sync_to_async(serializer.save)()
+        except serializers.ValidationError as exc:
+            return json_response(exc.detail, status=400)
+
+        note = await self.get_queryset().aget(pk=note.pk)
+        return json_response(NoteSerializer(note).data, status=201)
+
+
+class AsyncNoteDetailView(AsyncAPIView):
+    """
+    ``GET`` de uma nota do usuário atual.
+    """
+
+    http_method_names = ["get", "options"]
+
+    async def get(self, request, pk):
+        queryset = NoteSerializer.setup_eager_loading(
+            Note.objects.filter(owner=request.user)
+        )
+        try:
+            note = await queryset.aget(pk=pk)
+        except Note.DoesNotExist:
+            return json_response({"detail": "No Note matches the given query."}, 404)
+        return json_response(NoteSerializer(note).data)
+
+
+class AsyncNoteEventsView(AsyncAPIView):
+    """
+    Server-Sent Events com as alterações das notas do usuário atual.
+
+    Cada evento traz ``event: note.created|note.updated|note.deleted`` e, em
+    ``data``, o id da nota (e o ``updated_at`` quando há); o cliente busca a
+    nota em ``/api/notes/<id>/`` em vez de fazer polling da listagem. Um
+    evento ``resync`` indica que a fila da conexão encheu e eventos foram
+    descartados: o cliente deve recarregar a lista. Comentários periódicos
+    mantêm a conexão viva através de proxies.
+
+    A conexão fica aberta indefinidamente, então só é servida sob ASGI.
+    """
+
+    http_method_names = ["get", "options"]
+    queue_size = 100
+    heartbeat = 15
+    retry_ms = 3000
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return json_response(
+                {"detail": "The event stream requires an ASGI server."}, 501
+            )
+
+        subscription = get_event_backend().subscribe(
+            user_channel(request.user.pk),
+            getattr(settings, "NOTES_EVENTS_QUEUE_SIZE", self.queue_size),
+        )
+        heartbeat = getattr(settings, "NOTES_EVENTS_HEARTBEAT", self.heartbeat)
+
+        async def events():
+            try:
+                yield f"retry: {self.retry_ms}\nevent: ready\ndata: {{}}\n\n".encode()
+                while True:
+                    try:
+                        event = await subscription.get(timeout=heartbeat)
+                    except asyncio.TimeoutError:
+                        yield b": keepalive\n\n"
+                        continue
+                    yield self.format_event(event)
+            finally:
+                subscription.close()
+
+        response = StreamingHttpResponse(events(), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def format_event(self, event):
+        event = dict(event)
+        lines = []
+        if "seq" in event:
+            lines.append(f"id: {event.pop('seq')}")
+        lines.append(f"event: {event.pop('type')}")
+        lines.append(f"data: {render_json(event).decode()}")
+        return ("\n".join(lines) + "\n\n").encode()
+
+
+class AsyncCategoryListView(AsyncAPIView):
+    """
+    ``GET`` lista e ``POST`` cria categorias.
+    """
+
+    async def get(self, request):
+        return self.stream_list(Category.objects.order_by("id"), CategorySerializer())
+
+    async def post(self, request):
+        data, error = self.parse_body(request)
+        if error:
+            return error
+        # A unicidade do nome é conferida aqui com o ORM assíncrono em vez
+        # do UniqueValidator do serializer, que consultaria o banco em
+        # código síncrono
+        serializer = CategorySerializer(data=data)
+        name_field = serializer.fields["name"]
+        name_field.validators = [
+            validator
+            for validator in name_field.validators
+            if not isinstance(validator, UniqueValidator)
+        ]
+        if not serializer.is_valid():
+            return json_response(serializer.errors, status=400)
+
+        name = serializer.validated_data["name"]
+        duplicate = json_response(
+            {"name": ["category with this name already exists."]}, 400
+        )
+        if await Category.objects.filter(name=name).aexists():
+            return duplicate
+        try:
+            # Outra requisição pode ter criado o nome depois da verificação
+            category = await Category.objects.acreate(name=name)
+        except IntegrityError:
+            return duplicate
+        return json_response(CategorySerializer(category).data, status=201)
+
+
+class AsyncCategoryDetailView(AsyncAPIView):
+    """
+    ``GET`` de uma categoria.
+    """
+
+    http_method_names = ["get", "options"]
+
+    async def get(self, request, pk):
+        try:
+            category = await Category.objects.aget(pk=pk)
+        except Category.DoesNotExist:
+            return json_response(
+                {"detail": "No Category matches the given query."}, 404
+            )
+        return json_response(CategorySerializer(category).data)
@@ -0,0 +1,216 @@
+import codecs
+import csv
+import json
+import time
+
+from django.db import transaction
+from rest_framework import serializers
+
+from core.models import Category, Note
+from core.signals import notes_bulk_saved
+from core.usage import apply_usage_changes
+from .renderers import CSVRenderer
+from .serializers import NoteSerializer
+
+
+def parse_ndjson(lines):
+    """
+    Lê NDJSON de um iterável de linhas (bytes ou str), uma nota por linha.
+    Linhas que não são JSON válido viram ``None`` e são contadas como erro.
+    """
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+def parse_csv(lines):
+    """
+    Lê CSV com cabeçalho de um iterável de linhas (bytes ou str). A coluna
+    ``categories`` traz os nomes separados por ``;``, como na exportação.
+    """
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return
+    if isinstance(first, bytes):
+        lines = codecs.iterdecode(lines, "utf-8")
+        first = first.decode("utf-8")
+
+    def all_lines():
+        yield first
+        yield from lines
+
+    for row in csv.DictReader(all_lines()):
+        categories = row.pop("categories", None) or ""
+        row["category_names"] = [
+            name for name in categories.split(CSVRenderer.list_separator) if name
+        ]
+        yield row
+
+
+PARSERS = {
+    "ndjson": parse_ndjson,
+    "csv": parse_csv,
+}
+
+
+class NoteImporter:
+    """
+    Importação de grandes volumes de notas para um usuário.
+
+    As linhas são lidas como stream e processadas em lotes de
+    ``batch_size``: cada lote é validado com o NoteSerializer, as categorias
+    ainda desconhecidas são resolvidas de uma vez (e guardadas num mapa
+    nome → id em memória para os lotes seguintes) e as notas e a tabela
+    intermediária são gravadas com bulk_create, em uma transação por lote.
+    Linhas inválidas são puladas e reportadas com o número da linha.
+    """
+
+    max_reported_errors = 100
+
+    def __init__(self, owner, batch_size=1000, progress=None):
+        self.owner = owner
+        self.batch_size = batch_size
+        self.progress = progress
+        self.serializer = NoteSerializer()
+        self.category_ids = {}
+        self.stats = {"rows": 0, "created": 0, "errors": 0}
+        self.errors = []
+
+    def run(self, rows):
+        """
+        Importa as linhas (dicionários) e retorna o relatório final.
+        """
+        self.started = time.monotonic()
+        batch = []
+        for row in rows:
+            self.stats["rows"] += 1
+            batch.append((self.stats["rows"], row))
+            if len(batch) >= self.batch_size:
+                self._import_batch(batch)
+                batch = []
+        if batch:
+            self._import_batch(batch)
+        return self.report()
+
+    def report(self):
+        elapsed = time.monotonic() - self.started
+        return {
+            **self.stats,
+            "elapsed": round(elapsed, 3),
+            "rows_per_sec": round(self.stats["rows"] / elapsed, 1) if elapsed else 0,
+            "error_details": self.errors,
+        }
+
+    def _import_batch(self, batch):
+        valid = []
+        for line, row in batch:
+            try:
+                valid.append((line, self.serializer.run_validation(self._prepare(row))))
+            except serializers.ValidationError as exc:
+                self._add_error(line, exc.detail)
+
+        valid = self._check_category_ids(valid)
+        if valid:
+            with transaction.atomic():
+                self._resolve_categories(valid)
+                notes = self._create_notes(valid)
+                notes_bulk_saved.send(sender=Note, notes=notes, created=True)
+            self.stats["created"] += len(notes)
+
+        if self.progress:
+            self.progress(self.report())
+
+    def _prepare(self, row):
+        if not isinstance(row, dict):
+            raise serializers.ValidationError({"non_field_errors": ["Invalid row."]})
+        # Aceita o formato da exportação, com categorias como objetos
+        if "category_names" not in row and isinstance(row.get("categories"), list):
+            row = {
+                **row,
+                "category_names": [
+                    item.get("name") if isinstance(item, dict) else item
+                    for item in row["categories"]
+                ],
+            }
+        return row
+
+    def _add_error(self, line, detail):
+        self.stats["errors"] += 1
+        if len(self.errors) < self.max_reported_errors:
+            self.errors.append({"line": line, "errors": detail})
+
+    def _check_category_ids(self, valid):
+        """
+        Pula, como linhas inválidas, as que citam ids de categoria
+        inexistentes; os ids do lote são conferidos com uma consulta.
+        Recebe e retorna pares ``(linha, dados validados)``.
+        """
+        ids = {
+            item
+            for _, attrs in valid
+            for item in attrs.get("category_names", [])
+            if isinstance(item, int)
+        } - self.category_ids.keys()
+        if ids:
+            for pk in Category.objects.filter(pk__in=ids).values_list("pk", flat=True):
+                self.category_ids[pk] = pk
+
+        checked = []
+        for line, attrs in valid:
+            unknown = [
+                item
+                for item in attrs.get("category_names", [])
+                if isinstance(item, int) and item not in self.category_ids
+            ]
+            if unknown:
+                self._add_error(
+                    line,
+                    {
+                        "category_names": [
+                            f"Category with id {pk} does not exist." for pk in unknown
+                        ]
+                    },
+                )
+            else:
+                checked.append(attrs)
+        return checked
+
+    def _resolve_categories(self, validated):
+        key = self.serializer._category_key
+        missing = {
+            key(item) for attrs in validated for item in attrs.get("category_names", [])
+        } - self.category_ids.keys()
+        if missing:
+            category_map = self.serializer._resolve_category_map(list(missing))
+            for name, category in category_map.items():
+                self.category_ids[name] = category.pk
+
+    def _create_notes(self, validated):
+        key = self.serializer._category_key
+        notes = []
+        names_by_note = []
+        for attrs in validated:
+            names_by_note.append(attrs.pop("category_names", []))
+            notes.append(Note(owner=self.owner, **attrs))
+        Note.objects.bulk_create(notes)
+
+        Through = Note.categories.through
+        rows = {
+            (note.pk, self.category_ids[key(item)])
+            for note, items in zip(notes, names_by_note)
+            for item in items
+        }
+        Through.objects.bulk_create(
+            [Through(note_id=note_id, category_id=cat_id) for note_id, cat_id in rows],
+            batch_size=self.batch_size,
+        )
+        apply_usage_changes(added=[(self.owner.pk, cat_id) for _, cat_id in rows])
+        return notes
@@ -0,0 +1,280 @@
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.cache import get_notes_cache
+from core.models import Category, Note
+from core.seeding import WORDS, DatasetSeeder
+
+SCENARIOS = (
+    "list",
+    "list_summary",
+    "list_full",
+    "retrieve",
+    "create",
+    "update",
+    "search",
+    "export",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede a API de notas (listagem, detalhe, criação, atualização, busca "
+        "e exportação) sobre um conjunto de dados gerado em lote e grava os "
+        "resultados em JSON para comparar entre commits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--notes", type=int, default=1000)
+        parser.add_argument("--users", type=int, default=None)
+        parser.add_argument("--categories", type=int, default=200)
+        parser.add_argument("--skew", type=float, default=1.1, help="Expoente de Zipf.")
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS)
+        )
+        parser.add_argument(
+            "--full-list-limit",
+            type=int,
+            default=10000,
+            help="Pula list_full quando o usuário medido tem mais notas.",
+        )
+        parser.add_argument("--output", help="Arquivo JSON de saída.")
+        parser.add_argument(
+            "--compare", help="JSON de uma execução anterior para comparar."
+        )
+        parser.add_argument(
+            "--current-db",
+            action="store_true",
+            help=(
+                "Usa o banco já configurado (ex.: o dos testes) em vez de "
+                "criar um banco de testes temporário. Grava dados nele."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["compare"]:
+            try:
+                with open(options["compare"]) as stream:
+                    baseline = json.load(stream)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Não foi possível ler {options['compare']}: {exc}")
+
+        if options["current_db"]:
+            report = self.run(options)
+        else:
+            setup_test_environment()
+            old_name = connection.creation.create_test_db(verbosity=0)
+            try:
+                report = self.run(options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                teardown_test_environment()
+
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options["output"]:
+            with open(options["output"], "w") as stream:
+                stream.write(output + "\n")
+            self.stdout.write(f"Resultados gravados em {options['output']}.")
+        else:
+            self.stdout.write(output)
+        self.print_table(report, baseline)
+
+    def run(self, options):
+        seeder = DatasetSeeder(
+            options["notes"],
+            users=options["users"],
+            categories=options["categories"],
+            skew=options["skew"],
+            batch_size=options["batch_size"],
+            seed=options["seed"],
+            prefix=f"bench{options['seed']}",
+            progress=self.progress,
+        )
+        seed = seeder.run()
+
+        # Mede como o usuário com mais notas, o caso mais pesado
+        user = get_user_model().objects.get(pk=seed["users"][0])
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+        self.random = random.Random(options["seed"])
+        self.note_ids = list(
+            Note.objects.filter(owner=user).values_list("id", flat=True)
+        )
+        self.category_names = list(
+            Category.objects.order_by("-usage_count").values_list("name", flat=True)[
+                :20
+            ]
+        )
+
+        results = {}
+        for name in options["scenarios"]:
+            if name == "list_full" and len(self.note_ids) > options["full_list_limit"]:
+                results[name] = {
+                    "skipped": "user has more notes than --full-list-limit"
+                }
+                continue
+            results[name] = self.measure(getattr(self, f"bench_{name}"), options)
+
+        return {
+            "meta": self.metadata(),
+            "dataset": {
+                "notes": seed["notes"],
+                "users": len(seed["users"]),
+                "categories": len(seed["categories"]),
+                "links": seed["links"],
+                "skew": options["skew"],
+                "seed": options["seed"],
+                "measured_user_notes": len(self.note_ids),
+                "seed_seconds": seed["elapsed"],
+                "seed_rows_per_sec": seed["rows_per_sec"],
+            },
+            "results": results,
+        }
+
+    def measure(self, scenario, options):
+        """
+        Roda o cenário ``repeat`` vezes com o cache de respostas vazio (o
+        caminho sem cache é o que interessa) e uma vez a mais para contar
+        as consultas.
+        """
+        cache = get_notes_cache()
+        timings = []
+        status = None
+        for _ in range(options["repeat"]):
+            cache.clear()
+            started = time.perf_counter()
+            status = scenario()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            scenario()
+
+        timings.sort()
+        return {
+            "runs": len(timings),
+            "status": status,
+            "mean_ms": round(statistics.fmean(timings), 3),
+            "median_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(timings[max(0, round(len(timings) * 0.95) - 1)], 3),
+            "min_ms": round(timings[0], 3),
+            "queries": len(context.captured_queries),
+        }
+
+    def request(self, method, url, data=None):
+        response = getattr(self.client, method)(url, data, format="json")
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        else:
+            response.content
+        return response.status_code
+
+    def bench_list(self):
+        return self.request("get", reverse("note-list") + "?page_size=50")
+
+    def bench_list_summary(self):
+        return self.request(
+            "get", reverse("note-list") + "?view=summary&preview=120&page_size=50"
+        )
+
+    def bench_list_full(self):
+        return self.request("get", reverse("note-list"))
+
+    def bench_retrieve(self):
+        pk = self.random.choice(self.note_ids)
+        return self.request("get", reverse("note-detail", kwargs={"pk": pk}))
+
+    def bench_create(self):
+        data = {
+            "title": " ".join(self.random.choices(WORDS, k=4)),
+            "content": " ".join(self.random.choices(WORDS, k=60)),
+            "category_names": self.random.sample(
+                self.category_names, min(3, len(self.category_names))
+            ),
+        }
+        return self.request("post", reverse("note-list"), data)
+
+    def bench_update(self):
+        pk = self.random.choice(self.note_ids)
+        data = {
+            "title": " ".join(self.random.choices(WORDS, k=4)),
+            "category_names": self.random.sample(
+                self.category_names, min(2, len(self.category_names))
+            ),
+        }
+        return self.request("patch", reverse("note-detail", kwargs={"pk": pk}), data)
+
+    def bench_search(self):
+        return self.request(
+            "get", reverse("note-list") + f"?q={self.random.choice(WORDS)}"
+        )
+
+    def bench_export(self):
+        return self.request("get", reverse("note-export") + "?format=ndjson")
+
+    def metadata(self):
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            "commit": commit,
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "database": connection.vendor,
+        }
+
+    def progress(self, created, total):
+        self.stderr.write(f"{created}/{total} notas geradas")
+
+    def print_table(self, report, baseline=None):
+        previous = (baseline or {}).get("results", {})
+        self.stderr.write(
+            f"{'cenário':14} {'mediana ms':>11} {'p95 ms':>9} {'consultas':>9}"
+            + (f" {'antes ms':>9} {'variação':>9}" if baseline else "")
+        )
+        for name, row in report["results"].items():
+            if "skipped" in row:
+                self.stderr.write(f"{name:14} pulado ({row['skipped']})")
+                continue
+            line = (
+                f"{name:14} {row['median_ms']:>11} {row['p95_ms']:>9} "
+                f"{row['queries']:>9}"
+            )
+            before = previous.get(name, {}).get("median_ms")
+            if before:
+                change = (row["median_ms"] - before) / before * 100
+                line += f" {before:>9} {change:>+8.1f}%"
+            self.stderr.write(line)
@@ -0,0 +1,50 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from api.importers import PARSERS, NoteImporter
+
+
+class Command(BaseCommand):
+    help = "Importa notas de um arquivo NDJSON ou CSV para um usuário."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Arquivo de entrada ou '-' para stdin.")
+        parser.add_argument("--user", required=True, help="Username do dono das notas.")
+        parser.add_argument("--format", choices=sorted(PARSERS), default=None)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            owner = User.objects.get(username=options["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"Usuário {options['user']!r} não encontrado.")
+
+        path = options["path"]
+        fmt = options["format"] or ("csv" if path.endswith(".csv") else "ndjson")
+        importer = NoteImporter(
+            owner, batch_size=options["batch_size"], progress=self._progress
+        )
+
+        if path == "-":
+            report = importer.run(PARSERS[fmt](sys.stdin.buffer))
+        else:
+            with open(path, "rb") as stream:
+                report = importer.run(PARSERS[fmt](stream))
+
+        for error in report["error_details"]:
+            self.stderr.write(f"Linha {error['line']}: {error['errors']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{report['created']} nota(s) importada(s), {report['errors']} erro(s) "
+                f"em {report['elapsed']}s ({report['rows_per_sec']} linhas/s)."
+            )
+        )
+
+    def _progress(self, report):
+        self.stdout.write(
+            f"{report['rows']} linhas lidas, {report['created']} criadas, "
+            f"{report['errors']} erros ({report['rows_per_sec']} linhas/s)"
+        )
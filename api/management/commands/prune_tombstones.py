@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.sync import get_tombstone_retention
+from core.models import NoteTombstone
+
+
+class Command(BaseCommand):
+    help = "Remove registros de exclusão mais antigos que a retenção da sincronização."
+
+    def handle(self, *args, **options):
+        limit = timezone.now() - get_tombstone_retention()
+        deleted, _ = NoteTombstone.objects.filter(deleted_at__lt=limit).delete()
+        self.stdout.write(f"{deleted} registro(s) de exclusão removido(s).")
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from core.search import get_backend
+
+
+class Command(BaseCommand):
+    help = "Reconstrói o índice de busca textual das notas."
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        backend.rebuild()
+        self.stdout.write(f"Índice reconstruído com {type(backend).__name__}.")
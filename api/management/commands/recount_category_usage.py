@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.usage import recount_usage
+
+
+class Command(BaseCommand):
+    help = "Recalcula os contadores de uso das categorias a partir das notas."
+
+    def handle(self, *args, **options):
+        updated = recount_usage()
+        self.stdout.write(f"Contadores de {updated} categoria(s) recalculados.")
@@ -0,0 +1,176 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from core.cache import get_notes_cache, user_cache_key
+from core.metrics import get_request_metrics, instrument, measure
+
+
+class UserCachedListMixin:
+    """
+    Guarda em cache os dados da listagem por usuário.
+
+    A chave inclui a versão dos dados do usuário, que é avançada pelos
+    sinais de Note e Category, então qualquer alteração invalida as
+    respostas anteriores sem precisar apagá-las uma a uma. Com o
+    ``ConditionalRequestMixin`` antes deste na MRO, os agregados do ETag
+    (contagem e maior updated_at) também entram na chave, então edições e
+    exclusões feitas por outro processo mudam a chave mesmo quando a
+    versão vista por este está atrasada.
+    """
+
+    cache_timeout = None
+
+    def list(self, request, *args, **kwargs):
+        cache = get_notes_cache()
+        key = user_cache_key(
+            request.user.pk,
+            "api",
+            request.get_full_path(),
+            *getattr(self, "list_validator_parts", ()),
+        )
+        data = cache.get(key)
+        if data is None:
+            response = super().list(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            data = response.data
+            timeout = (
+                {} if self.cache_timeout is None else {"timeout": self.cache_timeout}
+            )
+            cache.set(key, data, **timeout)
+        return Response(data)
+
+
+class ValuesListMixin:
+    """
+    Listagens serializadas pelo caminho rápido de ``ValuesSerializer``.
+
+    Quando ``get_values_serializer`` devolve um serializer, a listagem lê
+    linhas de ``.values()`` (paginadas normalmente) e monta a resposta sem
+    instanciar modelos; caso contrário segue o caminho padrão do DRF.
+    """
+
+    def get_values_serializer(self):
+        return None
+
+    def list(self, request, *args, **kwargs):
+        values_serializer = self.get_values_serializer()
+        if values_serializer is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = values_serializer.get_values(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        with measure("serialize"):
+            data = values_serializer.serialize(queryset if page is None else page)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+class InstrumentedViewMixin:
+    """
+    Com o ``InstrumentationMiddleware`` ativo, mede a serialização (o
+    ``to_representation`` do serializer da view) e a renderização da
+    resposta, que aparecem no ``Server-Timing`` e em ``/metrics/``.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        return instrument(serializer, "to_representation", "serialize")
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if get_request_metrics() is not None and isinstance(response, Response):
+            # Renderiza aqui (em vez de no handler do Django) para medir
+            with measure("render"):
+                response.render()
+        return response
+
+
+class ConditionalRequestMixin:
+    """
+    Requisições condicionais com validadores baratos.
+
+    Em GET/HEAD responde 304 para ``If-None-Match``/``If-Modified-Since``
+    e, em PUT/PATCH/DELETE, responde 412 quando ``If-Match`` ou
+    ``If-Unmodified-Since`` não conferem (concorrência otimista). Os
+    validadores vêm de ``get_list_validators`` e ``get_object_validators``,
+    que devem consultar só agregados ou colunas, sem serializar nada.
+    """
+
+    def get_list_validators(self):
+        """
+        Retorna ``(partes do ETag, last_modified)`` da listagem.
+        """
+        raise NotImplementedError
+
+    def get_object_validators(self):
+        """
+        Retorna ``(partes do ETag, last_modified)`` do objeto da URL, ou
+        None se ele não existir (a view segue e responde 404).
+        """
+        raise NotImplementedError
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(
+            self._get_list_validators, super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(
+            self.get_object_validators, super().retrieve, request, *args, **kwargs
+        )
+
+    def update(self, request, *args, **kwargs):
+        return self._conditional(
+            self.get_object_validators, super().update, request, *args, **kwargs
+        )
+
+    def destroy(self, request, *args, **kwargs):
+        return self._conditional(
+            self.get_object_validators, super().destroy, request, *args, **kwargs
+        )
+
+    def _get_list_validators(self):
+        # A query string (filtros, busca, cursor) também muda o conteúdo
+        parts, last_modified = self.get_list_validators()
+        # Reaproveitadas na chave do cache da listagem (UserCachedListMixin)
+        self.list_validator_parts = parts
+        return [*parts, self.request.get_full_path()], last_modified
+
+    def _conditional(self, get_validators, handler, request, *args, **kwargs):
+        validators = get_validators()
+        if validators is None:
+            return handler(request, *args, **kwargs)
+
+        etag, last_modified = self._make_validators(request, *validators)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if request.method in ("PUT", "PATCH") and response.status_code == 200:
+                # Devolve os validadores da versão que acabou de ser gravada
+                etag, last_modified = self._make_validators(request, *get_validators())
+            elif request.method not in ("GET", "HEAD"):
+                return response
+
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def _make_validators(self, request, parts, last_modified):
+        parts = [*parts, getattr(request, "accepted_media_type", "")]
+        digest = hashlib.md5(
+            "|".join(str(part) for part in parts).encode(), usedforsecurity=False
+        ).hexdigest()
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        return quote_etag(digest), timestamp
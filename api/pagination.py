@@ -0,0 +1,229 @@
+import base64
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por cursor (keyset) opcional.
+
+    Só é ativada quando o cliente envia ``cursor`` ou ``page_size`` na query
+    string; sem esses parâmetros a listagem continua devolvendo todos os
+    registros, como antes. Em vez de OFFSET, cada página é obtida com uma
+    busca por faixa a partir da posição (valores de ``ordering``) do último
+    item visto, então o custo não cresce com a profundidade da página e
+    edições concorrentes não duplicam nem pulam registros.
+
+    A view pode trocar a ordenação por requisição com o atributo
+    ``pagination_ordering``, que aceita também anotações numéricas do
+    queryset (ex.: a relevância da busca).
+    """
+
+    ordering = ("-id",)
+    page_size = 50
+    max_page_size = 200
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor."
+
+    def is_requested(self, request):
+        """
+        Indica se o cliente pediu paginação explicitamente.
+        """
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request):
+        """
+        Lê o tamanho de página pedido pelo cliente, limitado a ``max_page_size``.
+        """
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, view=None):
+        """
+        Ordenação da view (``pagination_ordering``), se houver, ou a da classe.
+        """
+        return tuple(getattr(view, "pagination_ordering", None) or self.ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(view)
+
+        reverse, position = self.decode_cursor(request)
+        ordering = self._invert(self.ordering) if reverse else self.ordering
+
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._seek_filter(ordering, position))
+
+        # Busca um registro extra só para saber se existe uma próxima página
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self._position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # Página vazia depois do fim: volta para o início da listagem
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self._position(self.page[0]), reverse=True)
+
+    def encode_cursor(self, position, reverse):
+        """
+        Serializa a posição em um token opaco e devolve a URL correspondente.
+        """
+        payload = {"p": position}
+        if reverse:
+            payload["r"] = 1
+        token = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":")).encode()
+        ).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        """
+        Retorna ``(reverse, position)`` a partir do cursor da requisição.
+        """
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return False, None
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            raw_position = payload["p"]
+            if len(raw_position) != len(self.ordering):
+                raise ValueError
+            position = [
+                self._to_python(name, value)
+                for name, value in zip(self._field_names(), raw_position)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        return bool(payload.get("r")), position
+
+    def _field_names(self):
+        return [name.lstrip("-") for name in self.ordering]
+
+    def _field(self, name):
+        try:
+            return self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Anotação do queryset
+            return None
+
+    def _to_python(self, name, value):
+        field = self._field(name)
+        if field is not None:
+            return field.to_python(value)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(value)
+        return value
+
+    def _position(self, obj):
+        # Aceita instâncias e linhas de .values()
+        position = []
+        for name in self._field_names():
+            field = self._field(name)
+            attname = name if field is None else field.attname
+            value = obj[attname] if isinstance(obj, dict) else getattr(obj, attname)
+            position.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        return position
+
+    @staticmethod
+    def _invert(ordering):
+        return tuple(
+            name[1:] if name.startswith("-") else f"-{name}" for name in ordering
+        )
+
+    @staticmethod
+    def _seek_filter(ordering, position):
+        """
+        Monta a condição "depois da posição" para a ordenação dada.
+
+        Para ``(a, b)`` descendente gera ``a <= x AND (a < x OR (a = x AND b < y))``;
+        o primeiro termo permite que o banco faça uma busca por faixa no índice.
+        """
+        lookups = [
+            (name.lstrip("-"), "lt" if name.startswith("-") else "gt")
+            for name in ordering
+        ]
+        seek = Q()
+        for i, (name, lookup) in enumerate(lookups):
+            term = Q(**{f"{name}__{lookup}": position[i]})
+            for j, (prev_name, _) in enumerate(lookups[:i]):
+                term &= Q(**{prev_name: position[j]})
+            seek |= term
+
+        first_name, first_lookup = lookups[0]
+        return Q(**{f"{first_name}__{first_lookup}e": position[0]}) & seek
+
+
+class NoteCursorPagination(KeysetPagination):
+    """
+    Notas mais recentemente atualizadas primeiro, desempatando pelo id.
+    """
+
+    ordering = ("-updated_at", "-id")
+
+
+class CategoryCursorPagination(KeysetPagination):
+    """
+    Categorias em ordem alfabética, desempatando pelo id.
+    """
+
+    ordering = ("name", "id")
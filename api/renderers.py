@@ -0,0 +1,83 @@
+import csv
+import io
+import itertools
+import json
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils import encoders
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    JSON delimitado por linhas: um objeto por linha.
+
+    ``iter_render`` gera as linhas uma a uma para respostas em streaming;
+    ``render`` cobre as respostas comuns (por exemplo, erros).
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        items = data if isinstance(data, list) else [data]
+        return "".join(self.iter_render(items)).encode(self.charset)
+
+    def iter_render(self, rows, header=None):
+        for row in rows:
+            yield json.dumps(row, cls=encoders.JSONEncoder, ensure_ascii=False) + "\n"
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    CSV com cabeçalho. Listas (como as categorias) viram nomes separados
+    por ``;`` em uma única coluna.
+    """
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+    list_separator = ";"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        items = data if isinstance(data, list) else [data]
+        return "".join(self.iter_render(items)).encode(self.charset)
+
+    def iter_render(self, rows, header=None):
+        """
+        Gera o CSV linha a linha. Sem ``header``, as colunas são as chaves
+        da primeira linha.
+        """
+        rows = iter(rows)
+        if header is None:
+            first = next(rows, None)
+            if first is None:
+                return
+            header = list(first)
+            rows = itertools.chain([first], rows)
+
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=header)
+        writer.writeheader()
+        yield self._flush(buffer)
+        for row in rows:
+            writer.writerow({key: self._cell(value) for key, value in row.items()})
+            yield self._flush(buffer)
+
+    def _flush(self, buffer):
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    def _cell(self, value):
+        if isinstance(value, list):
+            return self.list_separator.join(
+                str(item.get("name", item)) if isinstance(item, dict) else str(item)
+                for item in value
+            )
+        return value
@@ -1,12 +1,103 @@
-from rest_framework import serializers
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from core.models import Note, Category
+from core.signals import notes_bulk_saved
+from core.usage import apply_usage_changes, note_links
 from django.contrib.auth import get_user_model
 from django.db import transaction
-from django.core.exceptions import ValidationError
+from django.db.models import Prefetch, Q, prefetch_related_objects
+from django.utils import timezone
+from django.core.exceptions import FieldDoesNotExist, ValidationError
 
 User = get_user_model()
 
 
+class EagerLoadingMixin:
+    """
+    Permite que o serializer declare as relações que ele percorre, para que
+    a view aplique o select_related/prefetch_related correspondente e evite
+    uma consulta extra por objeto serializado.
+    """
+
+    select_related_fields = ()
+    prefetch_related_fields = ()
+    # Colunas lidas por campos que não correspondem a uma coluna de mesmo
+    # nome, e colunas sempre carregadas (ex.: as usadas na paginação)
+    field_columns = {}
+    always_loaded_columns = ("pk",)
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, field_names=None):
+        """
+        Aplica ao queryset as relações declaradas pelo serializer. Com
+        ``field_names``, carrega só as relações e colunas usadas por esses
+        campos (via ``.only()``), deixando colunas grandes fora da consulta.
+        """
+        select_related = cls.select_related_fields
+        prefetch_related = cls.prefetch_related_fields
+        if field_names is not None:
+            field_names = set(field_names)
+            select_related = [
+                name for name in select_related if name.split("__")[0] in field_names
+            ]
+            prefetch_related = [
+                lookup
+                for lookup in prefetch_related
+                if getattr(lookup, "prefetch_to", lookup).split("__")[0] in field_names
+            ]
+            queryset = queryset.only(*cls.get_loaded_columns(field_names))
+
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+    @classmethod
+    def get_loaded_columns(cls, field_names):
+        """
+        Colunas necessárias para representar os campos informados.
+        """
+        model = cls.Meta.model
+        columns = set(cls.always_loaded_columns)
+        for name in field_names:
+            if name in cls.field_columns:
+                columns.update(cls.field_columns[name])
+                continue
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete and not field.many_to_many:
+                columns.add(name)
+        return sorted(columns)
+
+
+class SparseFieldsMixin:
+    """
+    Representação parcial: ``fields`` e ``omit`` no contexto do serializer
+    (listas de nomes) escolhem quais campos de leitura aparecem na saída.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        only = self.context.get("fields")
+        omit = set(self.context.get("omit") or ())
+        return {
+            name: field
+            for name, field in fields.items()
+            if field.write_only or ((only is None or name in only) and name not in omit)
+        }
+
+    @classmethod
+    def get_readable_field_names(cls, context=None):
+        """
+        Nomes que podem ser pedidos em ``?fields=``/``?omit=``.
+        """
+        fields = cls(context=context or {}).fields
+        return [name for name, field in fields.items() if not field.write_only]
+
+
 class CategorySerializer(serializers.ModelSerializer):
     """
     Serializa todos os campos do modelo Category.
@@ -17,17 +108,181 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ["id", "name"]
 
 
-class NoteSerializer(serializers.ModelSerializer):
+class CategoryCountSerializer(CategorySerializer):
+    """
+    Categoria com a quantidade de notas que a usam (contador mantido em
+    ``Category.usage_count``, sem COUNT por categoria).
+    """
+
+    class Meta(CategorySerializer.Meta):
+        fields = CategorySerializer.Meta.fields + ["usage_count"]
+
+
+class CategoryItemField(serializers.Field):
+    """
+    Item de ``category_names``: o id (inteiro) de uma categoria existente
+    ou o nome de uma categoria, criada se ainda não existir. Diferente do
+    CharField, mantém os ids como inteiros.
+    """
+
+    default_error_messages = {
+        "invalid": "Each category must be either a string (name) or an integer (ID).",
+        "blank": "Category names may not be blank.",
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool) or not isinstance(data, (str, int)):
+            self.fail("invalid")
+        if isinstance(data, str) and not data.strip():
+            self.fail("blank")
+        return data
+
+    def to_representation(self, value):
+        return value
+
+
+class NoteListSerializer(serializers.ListSerializer):
+    """
+    Criação e atualização de notas em lote.
+
+    Em vez de salvar nota por nota, usa bulk_create/bulk_update e resolve as
+    categorias de todo o lote de uma vez. Para atualizações, ``instance``
+    deve ser o queryset de notas que o usuário pode alterar e cada item
+    precisa trazer o ``id`` da nota.
+    """
+
+    def to_internal_value(self, data):
+        if self.instance is not None and isinstance(data, list):
+            ids = [
+                item.get("id")
+                for item in data
+                if isinstance(item, dict) and isinstance(item.get("id"), int)
+            ]
+            self._instance_map = self.instance.in_bulk(ids)
+        return super().to_internal_value(data)
+
+    def run_child_validation(self, data):
+        if self.instance is None:
+            return super().run_child_validation(data)
+
+        note = (
+            self._instance_map.get(data.get("id")) if isinstance(data, dict) else None
+        )
+        if note is None:
+            raise serializers.ValidationError({"id": ["Not found."]})
+
+        self.child.instance = note
+        self.child.initial_data = data
+        try:
+            validated = super().run_child_validation(data)
+        finally:
+            self.child.instance = None
+        validated["id"] = note.pk
+        return validated
+
+    def create(self, validated_data):
+        """
+        Cria todas as notas com um bulk_create e associa as categorias com
+        um único bulk_create na tabela intermediária.
+        """
+        notes = []
+        categories_by_note = []
+        for attrs in validated_data:
+            categories_by_note.append(attrs.pop("category_names", []))
+            notes.append(Note(**attrs))
+
+        with transaction.atomic():
+            Note.objects.bulk_create(notes)
+            self._replace_categories(zip(notes, categories_by_note))
+            notes_bulk_saved.send(sender=Note, notes=notes, created=True)
+
+        prefetch_related_objects(notes, "categories")
+        return notes
+
+    def update(self, instance, validated_data):
+        """
+        Atualiza as notas com um bulk_update; as categorias são substituídas
+        apenas nas notas que enviaram ``category_names``.
+        """
+        now = timezone.now()
+        notes = []
+        fields = {"updated_at"}
+        categories_by_note = []
+        for attrs in validated_data:
+            note = self._instance_map[attrs.pop("id")]
+            category_names = attrs.pop("category_names", None)
+            for attr, value in attrs.items():
+                setattr(note, attr, value)
+                fields.add(attr)
+            # bulk_update não aplica o auto_now
+            note.updated_at = now
+            notes.append(note)
+            if category_names is not None:
+                categories_by_note.append((note, category_names))
+
+        with transaction.atomic():
+            Note.objects.bulk_update(notes, sorted(fields))
+            self._replace_categories(categories_by_note)
+            notes_bulk_saved.send(sender=Note, notes=notes)
+
+        for note in notes:
+            note._prefetched_objects_cache = {}
+        prefetch_related_objects(notes, "categories")
+        return notes
+
+    def _replace_categories(self, categories_by_note):
+        """
+        Troca as categorias das notas informadas por ``(nota, category_names)``
+        usando a tabela intermediária diretamente.
+        """
+        categories_by_note = list(categories_by_note)
+        if not categories_by_note:
+            return
+
+        category_map = self.child._resolve_category_map(
+            [item for _, names in categories_by_note for item in names]
+        )
+
+        Through = Note.categories.through
+        rows = {}
+        for note, names in categories_by_note:
+            for item in names:
+                category = category_map[self.child._category_key(item)]
+                rows[(note.pk, category.pk)] = Through(
+                    note_id=note.pk, category_id=category.pk
+                )
+
+        note_ids = [note.pk for note, _ in categories_by_note]
+        # bulk_create e delete na tabela intermediária não disparam
+        # m2m_changed, então os contadores de uso são ajustados aqui
+        removed = note_links(note_id__in=note_ids)
+        Through.objects.filter(note_id__in=note_ids).delete()
+        Through.objects.bulk_create(rows.values())
+
+        owners = {note.pk: note.owner_id for note, _ in categories_by_note}
+        apply_usage_changes(
+            added=[(owners[note_id], category_id) for note_id, category_id in rows],
+            removed=removed,
+        )
+
+
+class NoteSerializer(SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer):
     """
     Inclui campos personalizados para o proprietário (somente leitura) e
     para o nome da categoria, além de uma representação personalizada
     para exibir o nome da categoria
     """
 
+    select_related_fields = ("owner",)
+    prefetch_related_fields = ("categories",)
+    field_columns = {"owner": ("owner__username",)}
+    # updated_at e id ordenam a paginação por cursor
+    always_loaded_columns = ("id", "updated_at")
+
     owner = serializers.StringRelatedField(read_only=True)
     categories = CategorySerializer(many=True, read_only=True)
     category_names = serializers.ListField(
-        child=serializers.CharField(), write_only=True, required=False
+        child=CategoryItemField(), write_only=True, required=False
     )
 
     class Meta:
@@ -42,16 +297,7 @@ class NoteSerializer(serializers.ModelSerializer):
             "categories",
             "category_names",
         ]
-
-    def validate_category_data(self, value):
-        """
-        Valida se cada item em category_data é uma string ou um inteiro.
-        """
-        if not all(isinstance(item, (str, int)) for item in value):
-            raise serializers.ValidationError(
-                "Each category must be either a string (name) or an integer (ID)."
-            )
-        return value
+        list_serializer_class = NoteListSerializer
 
     def create(self, validated_data):
         """
@@ -77,37 +323,21 @@ class NoteSerializer(serializers.ModelSerializer):
         """
         # Extrai os dados de categoria do validated_data
         category_names = validated_data.pop("category_names", None)
-        # Atualiza os outros campos da nota
-        instance = super().update(instance, validated_data)
 
-        # Se foram fornecidos dados de categoria, atualiza as categorias
-        if category_names is not None:
-            self._set_categories(instance, category_names)
+        with transaction.atomic():
+            # Atualiza os outros campos da nota
+            instance = super().update(instance, validated_data)
+
+            # Se foram fornecidos dados de categoria, atualiza as categorias
+            if category_names is not None:
+                self._set_categories(instance, category_names)
         return instance
 
     def _set_categories(self, note, category_names):
         """
         Associa categorias a uma nota, criando novas se necessário.
         """
-        categories = []
-        for item in category_names:
-            if isinstance(item, int):
-                # Se o item é um ID, tenta obter a categoria existente
-                try:
-                    category = Category.objects.get(id=item)
-                    categories.append(category)
-                except Category.DoesNotExist:
-                    raise serializers.ValidationError(
-                        f"Category with id {item} does not exist."
-                    )
-            else:
-                # Se o item é uma string, normaliza o nome e obtém ou cria a categoria
-                normalized_name = self._normalize_category_name(item)
-                category, created = Category.objects.get_or_create(name=normalized_name)
-                categories.append(category)
-
-        # Define as categorias da nota
-        note.categories.set(categories)
+        note.categories.set(self._optimize_category_query(category_names))
 
     def _normalize_category_name(self, name):
         """
@@ -115,32 +345,248 @@ class NoteSerializer(serializers.ModelSerializer):
         """
         return " ".join(name.lower().split())
 
+    def _category_key(self, item):
+        """
+        Chave usada no mapa de categorias: o próprio id ou o nome normalizado.
+        """
+        return item if isinstance(item, int) else self._normalize_category_name(item)
+
     @transaction.atomic
     def _optimize_category_query(self, category_names):
         """
         Otimiza a criação e recuperação de categorias em lote.
+        Retorna as categorias na ordem recebida, sem repetições.
         """
-        # Converte todos os nomes para a forma normalizada
-        normalized_names = [
-            self._normalize_category_name(item)
-            for item in category_names
-            if isinstance(item, str)
-        ]
+        category_map = self._resolve_category_map(category_names)
 
-        # Busca todas as categorias existentes em uma única consulta
-        existing_categories = {
-            cat.name: cat for cat in Category.objects.filter(name__in=normalized_names)
-        }
+        categories = {}
+        for item in category_names:
+            category = category_map[self._category_key(item)]
+            categories.setdefault(category.pk, category)
+        return list(categories.values())
 
-        # Cria quaisquer categorias ausentes em lote
-        new_categories = [
-            Category(name=name)
-            for name in normalized_names
-            if name not in existing_categories
-        ]
-        Category.objects.bulk_create(new_categories)
+    def _resolve_category_map(self, category_names):
+        """
+        Resolve ids e nomes de categorias com um número fixo de consultas.
+
+        Faz um único SELECT para ids e nomes já existentes, um bulk_create com
+        ignore_conflicts para os nomes ausentes e um novo SELECT para buscar as
+        categorias criadas. Se outra requisição criar o mesmo nome ao mesmo
+        tempo, o conflito na restrição unique é ignorado e a releitura devolve
+        a linha gravada por ela.
+
+        Retorna um dicionário {id ou nome normalizado: Category}.
+        """
+        ids = set()
+        names = set()
+        for item in category_names:
+            key = self._category_key(item)
+            (ids if isinstance(key, int) else names).add(key)
+
+        category_map = {}
+        if ids or names:
+            for category in Category.objects.filter(Q(id__in=ids) | Q(name__in=names)):
+                if category.id in ids:
+                    category_map[category.id] = category
+                if category.name in names:
+                    category_map[category.name] = category
+
+        unknown = sorted(ids - category_map.keys())
+        if unknown:
+            raise serializers.ValidationError(
+                {
+                    "category_names": [
+                        f"Category with id {pk} does not exist." for pk in unknown
+                    ]
+                }
+            )
+
+        missing_names = names - category_map.keys()
+        if missing_names:
+            Category.objects.bulk_create(
+                [Category(name=name) for name in missing_names],
+                ignore_conflicts=True,
+            )
+            for category in Category.objects.filter(name__in=missing_names):
+                category_map[category.name] = category
+
+        return category_map
+
+
+class NoteSummarySerializer(
+    SparseFieldsMixin, EagerLoadingMixin, serializers.ModelSerializer
+):
+    """
+    Representação compacta para telas de listagem: sem o conteúdo completo
+    e com as categorias só pelo nome. Com ``preview`` no contexto, inclui
+    os primeiros caracteres do conteúdo em ``content_preview``, que a view
+    calcula no banco (anotação ``content_preview``) para que a coluna
+    ``content`` inteira não seja lida.
+    """
+
+    prefetch_related_fields = (
+        Prefetch("categories", queryset=Category.objects.only("id", "name")),
+    )
+    always_loaded_columns = ("id", "updated_at")
+
+    categories = serializers.SlugRelatedField(
+        many=True, read_only=True, slug_field="name"
+    )
+    content_preview = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Note
+        fields = ["id", "title", "updated_at", "categories", "content_preview"]
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.context.get("preview"):
+            fields.pop("content_preview", None)
+        return fields
 
-        # Combina categorias existentes e novas
-        all_categories = list(existing_categories.values()) + new_categories
+    def get_content_preview(self, obj):
+        size = self.context["preview"]
+        preview = getattr(obj, "content_preview", None)
+        if preview is None:
+            preview = obj.content[: size + 1]
+        if len(preview) > size:
+            return preview[:size].rstrip() + "…"
+        return preview
 
-        return all_categories
+
+class ValuesSerializer:
+    """
+    Caminho rápido de leitura: monta a saída a partir de linhas de
+    ``.values()``, sem instanciar modelos nem passar pelos campos do DRF.
+
+    Cada subclasse reproduz a saída de um ModelSerializer (mesmas chaves,
+    na mesma ordem, com os mesmos formatos), de modo que o JSON gerado é
+    idêntico ao do serializer equivalente. Só serve para leitura.
+    """
+
+    # Campo de saída -> coluna lida com .values(), na ordem da saída
+    columns = {}
+    datetime_fields = ()
+    # Lidas mesmo fora da saída (ex.: as usadas na paginação por cursor)
+    always_loaded_columns = ("id",)
+
+    def __init__(self, field_names=None):
+        if field_names is None:
+            field_names = self.get_default_field_names()
+        self.field_names = list(field_names)
+
+    def get_default_field_names(self):
+        return list(self.columns)
+
+    def get_values(self, queryset):
+        """
+        Troca o queryset de modelos por um de dicionários com as colunas
+        necessárias e as anotações do queryset (ex.: a relevância da busca,
+        que a paginação por cursor lê das linhas).
+        """
+        columns = dict.fromkeys(self.always_loaded_columns)
+        columns.update(
+            dict.fromkeys(
+                self.columns[name] for name in self.field_names if name in self.columns
+            )
+        )
+        columns.update(dict.fromkeys(queryset.query.annotations))
+        return queryset.select_related(None).prefetch_related(None).values(*columns)
+
+    def serialize(self, rows):
+        """
+        Recebe as linhas de ``get_values`` e devolve a lista de dicionários
+        pronta para o renderer.
+        """
+        rows = list(rows)
+        format_datetime = self._datetime_formatter()
+        getters = []
+        for name in self.field_names:
+            column = self.columns.get(name)
+            if column is None:
+                getters.append((name, self.get_extra_getter(name, rows)))
+            elif name in self.datetime_fields:
+                getters.append((name, lambda row, c=column: format_datetime(row[c])))
+            else:
+                getters.append((name, lambda row, c=column: row[c]))
+        return [{name: get(row) for name, get in getters} for row in rows]
+
+    def get_extra_getter(self, name, rows):
+        """
+        Campos que não vêm de uma coluna (ex.: relações muitos-para-muitos)
+        recebem todas as linhas para carregar os dados em lote.
+        """
+        raise KeyError(name)
+
+    @staticmethod
+    def _datetime_formatter():
+        # Mesmo formato do DateTimeField do DRF: fuso atual e ISO 8601 com
+        # "Z" para UTC; outros formatos configurados usam o próprio campo
+        field = serializers.DateTimeField()
+        if api_settings.DATETIME_FORMAT != ISO_8601:
+            return field.to_representation
+        tz = field.default_timezone()
+
+        def format_datetime(value):
+            if not value:
+                return None
+            if tz is not None and timezone.is_aware(value):
+                value = value.astimezone(tz)
+            value = value.isoformat()
+            if value.endswith("+00:00"):
+                value = value[:-6] + "Z"
+            return value
+
+        return format_datetime
+
+
+class CategoryValuesSerializer(ValuesSerializer):
+    """
+    Saída de ``CategorySerializer`` (ou ``CategoryCountSerializer``, com
+    ``with_counts``) a partir de ``.values()``.
+    """
+
+    columns = {"id": "id", "name": "name", "usage_count": "usage_count"}
+    always_loaded_columns = ("id", "name")
+
+    def __init__(self, with_counts=False):
+        serializer_class = (
+            CategoryCountSerializer if with_counts else CategorySerializer
+        )
+        super().__init__(serializer_class.Meta.fields)
+
+
+class NoteValuesSerializer(ValuesSerializer):
+    """
+    Saída de ``NoteSerializer`` a partir de ``.values()``: o proprietário
+    vem da coluna ``owner__username`` (o ``__str__`` do usuário) e as
+    categorias de todas as linhas são lidas numa única consulta.
+    """
+
+    columns = {
+        "id": "id",
+        "title": "title",
+        "content": "content",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+        "owner": "owner__username",
+    }
+    datetime_fields = ("created_at", "updated_at")
+    always_loaded_columns = NoteSerializer.always_loaded_columns
+
+    def get_default_field_names(self):
+        return NoteSerializer.get_readable_field_names()
+
+    def get_extra_getter(self, name, rows):
+        if name != "categories":
+            return super().get_extra_getter(name, rows)
+        # Mesma consulta do prefetch_related("categories"), para manter a
+        # ordem das categorias de cada nota
+        categories = {row["id"]: [] for row in rows}
+        if categories:
+            links = Category.objects.filter(notes__in=list(categories)).values_list(
+                "notes__id", "id", "name"
+            )
+            for note_id, category_id, category_name in links:
+                categories[note_id].append({"id": category_id, "name": category_name})
+        return lambda row: categories[row["id"]]
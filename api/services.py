@@ -0,0 +1,74 @@
+from django.db import transaction
+
+from core.models import Note, NoteTombstone
+from core.signals import bulk_deleting, notes_bulk_saved
+from core.usage import apply_usage_changes, note_links
+
+DUPLICATE_TITLE_PREFIX = "Cópia de "
+
+
+def duplicate_notes(notes, owner=None, title_prefix=DUPLICATE_TITLE_PREFIX):
+    """
+    Cria cópias das notas informadas, com as mesmas categorias.
+
+    As cópias são gravadas com um único bulk_create e as ligações com as
+    categorias com outro, tudo na mesma transação; sem ``owner`` cada cópia
+    fica com o dono da nota original. Retorna as cópias na ordem recebida.
+    """
+    notes = list(notes)
+    if not notes:
+        return []
+
+    max_length = Note._meta.get_field("title").max_length
+    copies = [
+        Note(
+            title=f"{title_prefix}{note.title}"[:max_length],
+            content=note.content,
+            owner_id=owner.pk if owner is not None else note.owner_id,
+        )
+        for note in notes
+    ]
+
+    Through = Note.categories.through
+    with transaction.atomic():
+        category_ids = {}
+        for note_id, category_id in Through.objects.filter(
+            note_id__in=[note.pk for note in notes]
+        ).values_list("note_id", "category_id"):
+            category_ids.setdefault(note_id, []).append(category_id)
+
+        Note.objects.bulk_create(copies)
+        links = Through.objects.bulk_create(
+            [
+                Through(note_id=copy.pk, category_id=category_id)
+                for note, copy in zip(notes, copies)
+                for category_id in category_ids.get(note.pk, [])
+            ],
+            batch_size=1000,
+        )
+        owners = {copy.pk: copy.owner_id for copy in copies}
+        apply_usage_changes(
+            added=[(owners[link.note_id], link.category_id) for link in links]
+        )
+        notes_bulk_saved.send(sender=Note, notes=copies, created=True)
+    return copies
+
+
+def delete_notes(queryset):
+    """
+    Exclui as notas do queryset com um número fixo de consultas: as
+    exclusões são registradas para a sincronização com um único
+    bulk_create e os contadores de uso são ajustados uma vez para todas as
+    ligações, em vez de nota a nota pelos receptores de exclusão. Retorna a
+    quantidade de notas excluídas.
+    """
+    with transaction.atomic():
+        notes = list(queryset.values_list("pk", "owner_id"))
+        links = note_links(note_id__in=[pk for pk, _ in notes])
+        with bulk_deleting():
+            Note.objects.filter(pk__in=[pk for pk, _ in notes]).delete()
+        NoteTombstone.objects.bulk_create(
+            NoteTombstone(note_id=pk, owner_id=owner_id) for pk, owner_id in notes
+        )
+        apply_usage_changes(removed=links)
+    return len(notes)
@@ -0,0 +1,44 @@
+import base64
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+# Janela de segurança: transações que gravaram updated_at pouco antes do
+# token, mas ainda não tinham sido confirmadas, entram na próxima sincronização.
+SYNC_SAFETY_WINDOW = timedelta(seconds=5)
+
+
+def get_tombstone_retention():
+    """
+    Por quanto tempo os registros de exclusão são mantidos. Tokens mais
+    antigos que isso exigem uma sincronização completa.
+    """
+    return timedelta(days=getattr(settings, "NOTES_SYNC_TOMBSTONE_DAYS", 30))
+
+
+def encode_sync_token(moment):
+    """
+    Converte o instante da sincronização em um token opaco.
+    """
+    return base64.urlsafe_b64encode(moment.isoformat().encode()).decode()
+
+
+def decode_sync_token(token):
+    """
+    Converte um token em instante. Levanta ValueError se o token for inválido.
+    """
+    try:
+        moment = datetime.fromisoformat(base64.urlsafe_b64decode(token).decode())
+    except Exception:
+        raise ValueError("Invalid sync token.")
+    if timezone.is_naive(moment):
+        raise ValueError("Invalid sync token.")
+    return moment
+
+
+def next_sync_token():
+    """
+    Token a ser entregue ao cliente ao final de uma sincronização.
+    """
+    return encode_sync_token(timezone.now() - SYNC_SAFETY_WINDOW)
@@ -1,5 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from .async_views import (
+    AsyncCategoryDetailView,
+    AsyncCategoryListView,
+    AsyncNoteDetailView,
+    AsyncNoteEventsView,
+    AsyncNoteListView,
+)
 from .views import NoteViewSet, CategoryViewSet
 
 router = DefaultRouter()
@@ -7,6 +14,21 @@ router = DefaultRouter()
 router.register(r"notes", NoteViewSet, basename="note")
 router.register(r"categories", CategoryViewSet, basename="category")
 
+# Versões assíncronas de listagem, detalhe e criação, para servir sob ASGI
+# sem ocupar uma thread por requisição
+async_urlpatterns = [
+    path("notes/", AsyncNoteListView.as_view(), name="async-note-list"),
+    path("notes/<int:pk>/", AsyncNoteDetailView.as_view(), name="async-note-detail"),
+    path("notes/events/", AsyncNoteEventsView.as_view(), name="async-note-events"),
+    path("categories/", AsyncCategoryListView.as_view(), name="async-category-list"),
+    path(
+        "categories/<int:pk>/",
+        AsyncCategoryDetailView.as_view(),
+        name="async-category-detail",
+    ),
+]
+
 urlpatterns = [
+    path("async/", include(async_urlpatterns)),
     path("", include(router.urls)),
 ]
@@ -1,36 +1,377 @@
-from rest_framework import viewsets
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.db.models.functions import Substr
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import serializers, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
-from core.models import Note, Category
-from .serializers import NoteSerializer, CategorySerializer
+from rest_framework.response import Response
+from core.cache import get_categories_version, note_list_validators
+from core.models import Note, Category, CategoryUsage, NoteTombstone
+from core.search import categories_by_prefix, filter_notes
+from core.usage import get_usage_version
+from .mixins import (
+    ConditionalRequestMixin,
+    InstrumentedViewMixin,
+    UserCachedListMixin,
+    ValuesListMixin,
+)
+from .importers import PARSERS, NoteImporter
+from .renderers import CSVRenderer, NDJSONRenderer
+from .services import delete_notes, duplicate_notes
+from .pagination import NoteCursorPagination, CategoryCursorPagination
+from .serializers import (
+    NoteSerializer,
+    NoteSummarySerializer,
+    NoteValuesSerializer,
+    CategorySerializer,
+    CategoryCountSerializer,
+    CategoryValuesSerializer,
+)
+from .sync import decode_sync_token, get_tombstone_retention, next_sync_token
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(
+    InstrumentedViewMixin,
+    ConditionalRequestMixin,
+    ValuesListMixin,
+    viewsets.ModelViewSet,
+):
     """
     Fornece operações CRUD para categorias.
     Requer autenticação para todas as operações.
+    A listagem aceita paginação por cursor opcional (?page_size= / ?cursor=)
+    e ``?with_counts=1`` para incluir quantas notas usam cada categoria.
+    ``GET /api/categories/cloud/`` devolve as categorias mais usadas e
+    ``GET /api/categories/autocomplete/?q=`` as mais usadas com um prefixo.
+    Respostas trazem ETag para GET condicional e If-Match.
     """
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CategoryCursorPagination
+    cloud_size = 50
+    cloud_max_size = 200
+    autocomplete_size = 10
+    autocomplete_max_size = 50
 
+    def with_counts(self):
+        return self.request.query_params.get("with_counts") in ("1", "true")
 
-class NoteViewSet(viewsets.ModelViewSet):
+    def get_serializer_class(self):
+        if self.action == "list" and self.with_counts():
+            return CategoryCountSerializer
+        return super().get_serializer_class()
+
+    def get_values_serializer(self):
+        """
+        A listagem é montada a partir de ``.values()``, com a mesma saída.
+        """
+        if self.serializer_class is not CategorySerializer:
+            return None
+        return CategoryValuesSerializer(with_counts=self.with_counts())
+
+    def get_list_validators(self):
+        """
+        Categorias não têm data de alteração: o ETag combina contagem,
+        maior id e a versão global de categorias (e a dos contadores, se
+        eles forem incluídos).
+        """
+        stats = Category.objects.aggregate(count=Count("id"), last_id=Max("id"))
+        parts = [stats["count"], stats["last_id"], get_categories_version()]
+        if self.with_counts():
+            parts.append(get_usage_version())
+        return parts, None
+
+    def _get_limit(self, default, maximum):
+        try:
+            limit = int(self.request.query_params.get("limit", default))
+        except ValueError:
+            limit = default
+        return min(max(limit, 1), maximum)
+
+    def get_object_validators(self):
+        """
+        O próprio nome é a versão da linha.
+        """
+        try:
+            name = (
+                Category.objects.filter(pk=self.kwargs["pk"])
+                .values_list("name", flat=True)
+                .first()
+            )
+        except (TypeError, ValueError, ValidationError):
+            return None
+        if name is None:
+            return None
+        return [self.kwargs["pk"], name], None
+
+    @action(detail=False, methods=["get"])
+    def autocomplete(self, request):
+        """
+        Até ``?limit=`` categorias cujo nome começa com ``?q=``, na mesma
+        forma normalizada usada ao gravar (minúsculas, espaços simples),
+        ordenadas por uso. Sem ``q`` devolve as mais usadas.
+        """
+        prefix = NoteSerializer()._normalize_category_name(
+            request.query_params.get("q", "")
+        )
+        limit = self._get_limit(self.autocomplete_size, self.autocomplete_max_size)
+        queryset = categories_by_prefix(prefix)[:limit]
+        return Response(CategoryCountSerializer(queryset, many=True).data)
+
+    @action(detail=False, methods=["get"])
+    def cloud(self, request):
+        """
+        Nuvem de tags: as ``?limit=`` categorias mais usadas nas notas do
+        usuário atual, ou em todas as notas com ``?scope=all``, lidas dos
+        contadores de uso.
+        """
+        limit = self._get_limit(self.cloud_size, self.cloud_max_size)
+
+        if request.query_params.get("scope") == "all":
+            rows = (
+                Category.objects.filter(usage_count__gt=0)
+                .order_by("-usage_count", "name")
+                .values_list("id", "name", "usage_count")
+            )
+        else:
+            rows = (
+                CategoryUsage.objects.filter(owner=request.user, count__gt=0)
+                .order_by("-count", "category__name")
+                .values_list("category_id", "category__name", "count")
+            )
+        return Response(
+            [
+                {"id": pk, "name": name, "count": count}
+                for pk, name, count in rows[:limit]
+            ]
+        )
+
+
+class NoteViewSet(
+    InstrumentedViewMixin,
+    ConditionalRequestMixin,
+    UserCachedListMixin,
+    ValuesListMixin,
+    viewsets.ModelViewSet,
+):
     """
     Fornece operações CRUD para as anotações.
     Filtra as notas para mostrar apenas as do usuário atual.
     Requer autenticação para todas as operações.
+    A listagem aceita paginação por cursor opcional (?page_size= / ?cursor=),
+    ordenada por (updated_at, id) decrescentes, ou pela relevância na busca.
+
+    Operações em lote (tudo ou nada, com erros reportados por item):
+
+    - ``POST /api/notes/`` com uma lista cria várias notas;
+    - ``PATCH /api/notes/bulk/`` com uma lista de objetos com ``id`` atualiza;
+    - ``DELETE /api/notes/bulk/`` com ``{"ids": [...]}`` exclui;
+    - ``POST /api/notes/duplicate/`` com ``{"ids": [...]}`` duplica, copiando
+      as categorias.
+
+    ``GET /api/notes/sync/?token=`` devolve apenas o que mudou desde o token.
+    ``GET /api/notes/export/?format=ndjson|csv`` exporta todas as notas em
+    streaming; ``POST /api/notes/import/`` importa no mesmo formato.
+    ``GET /api/notes/?q=`` faz busca textual em título e conteúdo, com
+    resultados ordenados por relevância.
+    Listagem e detalhe aceitam ``?fields=``/``?omit=`` (nomes separados por
+    vírgula) e ``?view=summary``, uma representação compacta com os nomes
+    das categorias e, com ``?preview=N``, os N primeiros caracteres do
+    conteúdo; as colunas não usadas não são lidas do banco.
+    As listagens são montadas a partir de ``.values()``, sem instanciar
+    modelos, e ficam em cache por usuário até a próxima alteração.
+    Respostas trazem ETag para GET condicional (304) e
+    If-Match em PUT/PATCH/DELETE (412 quando a nota mudou).
     """
 
     serializer_class = NoteSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = NoteCursorPagination
+    bulk_max_size = 1000
+    export_chunk_size = 2000
+    import_batch_size = 1000
+    preview_max_size = 1000
+    representation_actions = ("list", "retrieve")
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # Parâmetros de representação inválidos viram 400 antes de qualquer
+        # consulta
+        self.get_representation()
+
+    def get_representation(self):
+        """
+        Lê ``view``, ``fields``, ``omit`` e ``preview`` da query string nas
+        ações de leitura. Retorna None quando a representação é a completa.
+        """
+        if hasattr(self, "_representation"):
+            return self._representation
+        self._representation = None
+        if self.action not in self.representation_actions:
+            return None
+
+        params = self.request.query_params
+        view = params.get("view", "full")
+        if view not in ("full", "summary"):
+            raise serializers.ValidationError(
+                {"view": ['Must be "full" or "summary".']}
+            )
+        summary = view == "summary"
+        serializer_class = NoteSummarySerializer if summary else NoteSerializer
+
+        preview = 0
+        if summary and "preview" in params:
+            field = serializers.IntegerField(
+                min_value=0, max_value=self.preview_max_size
+            )
+            try:
+                preview = field.run_validation(params["preview"])
+            except serializers.ValidationError as exc:
+                raise serializers.ValidationError({"preview": exc.detail})
+
+        available = serializer_class.get_readable_field_names({"preview": preview})
+        spec = {}
+        for param in ("fields", "omit"):
+            if param not in params:
+                continue
+            names = [name.strip() for name in params[param].split(",") if name.strip()]
+            unknown = [name for name in names if name not in available]
+            if unknown:
+                raise serializers.ValidationError(
+                    {param: [f"Unknown field(s): {', '.join(unknown)}."]}
+                )
+            spec[param] = names
+
+        if summary or spec:
+            self._representation = {"summary": summary, "preview": preview, **spec}
+            only = spec.get("fields", available)
+            self._representation["field_names"] = [
+                name for name in only if name not in spec.get("omit", ())
+            ]
+        return self._representation
+
+    def get_serializer_class(self):
+        representation = self.get_representation()
+        if representation and representation["summary"]:
+            return NoteSummarySerializer
+        return super().get_serializer_class()
+
+    def get_values_serializer(self):
+        """
+        Listagens na representação completa (ou com ``?fields=``/``?omit=``)
+        usam o caminho rápido, que gera o mesmo JSON do NoteSerializer.
+        """
+        if self.serializer_class is not NoteSerializer:
+            return None
+        representation = self.get_representation()
+        if representation is None:
+            return NoteValuesSerializer()
+        if representation["summary"]:
+            return None
+        return NoteValuesSerializer(representation["field_names"])
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        representation = self.get_representation()
+        if representation:
+            context.update(
+                fields=representation.get("fields"),
+                omit=representation.get("omit"),
+                preview=representation["preview"],
+            )
+        return context
 
     def get_queryset(self):
         """
         Retorna um queryset de notas filtrado para incluir apenas
-        as notas do usuário atual.
+        as notas do usuário atual, já com as relações usadas pelo
+        serializer carregadas antecipadamente.
+        """
+        queryset = Note.objects.filter(owner=self.request.user)
+        query = self.request.query_params.get("q")
+        if query:
+            queryset = self.search_queryset(queryset, query)
+
+        representation = self.get_representation()
+        if representation is None:
+            return self.get_serializer_class().setup_eager_loading(queryset)
+        field_names = representation["field_names"]
+        if "content_preview" in field_names:
+            # Só o início do conteúdo sai do banco; um caractere a mais indica
+            # que houve corte
+            queryset = queryset.annotate(
+                content_preview=Substr("content", 1, representation["preview"] + 1)
+            )
+        return self.get_serializer_class().setup_eager_loading(
+            queryset, field_names=field_names
+        )
+
+    def get_list_validators(self):
+        """
+        Agregados das notas do usuário e das suas categorias, lidos do
+        banco numa consulta, então o ETag é o mesmo em todos os processos.
+
+        Sem Last-Modified: o maior updated_at não muda quando uma nota é
+        excluída ou uma categoria é renomeada, e um If-Modified-Since
+        receberia um 304 com a listagem antiga. Só o ETag valida.
+        """
+        return note_list_validators(self.request.user.pk), None
+
+    def get_object_validators(self):
         """
-        return Note.objects.filter(owner=self.request.user)
+        Versão da linha montada só a partir da nota: updated_at mais id,
+        nome e data de alteração das suas categorias, numa consulta. Editar
+        outra nota do usuário não muda o ETag desta. Como na listagem, não
+        vira Last-Modified: renomear uma categoria muda a representação da
+        nota sem mudar o updated_at.
+        """
+        try:
+            rows = list(
+                Note.objects.filter(
+                    owner=self.request.user, pk=self.kwargs["pk"]
+                ).values_list(
+                    "updated_at",
+                    "categories__id",
+                    "categories__name",
+                    "categories__updated_at",
+                )
+            )
+        except (TypeError, ValueError, ValidationError):
+            return None
+        if not rows:
+            return None
+        parts = [self.kwargs["pk"], rows[0][0]]
+        parts.extend(sorted(row[1:] for row in rows if row[1] is not None))
+        if self.get_representation():
+            # Representações parciais têm conteúdo (e ETag) diferentes
+            parts.append(self.request.GET.urlencode())
+        return parts, None
+
+    search_ordering = ("search_rank", "-id")
+
+    @property
+    def pagination_ordering(self):
+        """
+        Na busca, a paginação por cursor segue a relevância (KeysetPagination).
+        """
+        if self.request.query_params.get("q"):
+            return self.search_ordering
+        return None
+
+    def search_queryset(self, queryset, query):
+        """
+        Restringe o queryset a todas as notas encontradas pelo índice de
+        busca, ordenadas da mais relevante para a menos relevante. O filtro
+        é uma subconsulta no índice, sem limite de resultados, então a
+        paginação por cursor percorre todos eles.
+        """
+        return filter_notes(queryset, query, owner_id=self.request.user.id).order_by(
+            *self.search_ordering
+        )
 
     def perform_create(self, serializer):
         """
@@ -38,3 +379,191 @@ class NoteViewSet(viewsets.ModelViewSet):
         da nota como o usuário atual antes de salvar.
         """
         serializer.save(owner=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        """
+        Aceita um objeto (criação simples) ou uma lista (criação em lote).
+        """
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+
+        serializer = self.get_serializer(
+            data=request.data, many=True, max_length=self.bulk_max_size
+        )
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["patch"], url_path="bulk", url_name="bulk")
+    def bulk_update(self, request):
+        """
+        Atualização parcial em lote. Cada item precisa do ``id`` de uma nota
+        do usuário atual; ids desconhecidos são reportados no item.
+        """
+        serializer = self.get_serializer(
+            self.get_queryset(),
+            data=request.data,
+            many=True,
+            partial=True,
+            max_length=self.bulk_max_size,
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data)
+
+    @bulk_update.mapping.delete
+    def bulk_destroy(self, request):
+        """
+        Exclui em lote as notas cujos ids foram enviados em ``{"ids": [...]}``.
+        Se algum id não pertencer ao usuário atual, nada é excluído.
+        """
+        delete_notes(self.get_queryset().filter(id__in=self.get_bulk_ids(request)))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=["post"])
+    def duplicate(self, request):
+        """
+        Duplica as notas cujos ids foram enviados em ``{"ids": [...]}``,
+        com as mesmas categorias, e devolve as cópias na ordem dos ids.
+        """
+        ids = self.get_bulk_ids(request)
+        notes = Note.objects.in_bulk(ids)
+        copies = duplicate_notes(
+            [notes[pk] for pk in dict.fromkeys(ids)], owner=request.user
+        )
+        queryset = self.get_serializer_class().setup_eager_loading(
+            Note.objects.filter(pk__in=[copy.pk for copy in copies]).order_by("pk")
+        )
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def get_bulk_ids(self, request):
+        """
+        Valida ``{"ids": [...]}`` do corpo da requisição. Se algum id não
+        pertencer ao usuário atual, os erros são reportados por item.
+        """
+        field = serializers.ListField(
+            child=serializers.IntegerField(),
+            allow_empty=False,
+            max_length=self.bulk_max_size,
+        )
+        data = request.data if isinstance(request.data, dict) else {}
+        try:
+            ids = field.run_validation(data.get("ids"))
+        except serializers.ValidationError as exc:
+            raise serializers.ValidationError({"ids": exc.detail})
+
+        found = set(
+            Note.objects.filter(owner=request.user, id__in=ids).values_list(
+                "id", flat=True
+            )
+        )
+        errors = [{} if pk in found else {"id": ["Not found."]} for pk in ids]
+        if any(errors):
+            raise serializers.ValidationError({"ids": errors})
+        return ids
+
+    @action(detail=False, methods=["get"])
+    def sync(self, request):
+        """
+        Sincronização incremental.
+
+        Sem ``token`` devolve todas as notas do usuário. Com ``token`` devolve
+        só as notas criadas ou alteradas depois dele e os ids das notas
+        excluídas. A resposta sempre traz o token para a próxima chamada; se
+        o token for mais antigo que a retenção dos registros de exclusão,
+        ``reset`` vem verdadeiro e o cliente deve substituir sua cópia local.
+        """
+        token = request.query_params.get("token")
+        # O novo token é calculado antes das consultas para não perder
+        # alterações gravadas enquanto a resposta é montada.
+        new_token = next_sync_token()
+
+        since = None
+        if token:
+            try:
+                since = decode_sync_token(token)
+            except ValueError as exc:
+                raise serializers.ValidationError({"token": [str(exc)]})
+            if since < timezone.now() - get_tombstone_retention():
+                since = None
+
+        changed = self.get_queryset()
+        deleted = []
+        if since is not None:
+            changed = changed.filter(updated_at__gte=since)
+            deleted = list(
+                NoteTombstone.objects.filter(
+                    owner=request.user, deleted_at__gte=since
+                ).values_list("note_id", flat=True)
+            )
+
+        return Response(
+            {
+                "changed": self.get_serializer(changed, many=True).data,
+                "deleted": deleted,
+                "token": new_token,
+                "reset": since is None,
+            }
+        )
+
+    @action(
+        detail=False,
+        methods=["get"],
+        renderer_classes=[NDJSONRenderer, CSVRenderer],
+    )
+    def export(self, request):
+        """
+        Exporta as notas do usuário (com categorias) em NDJSON ou CSV.
+
+        A resposta é gerada em streaming: o queryset é percorrido no banco
+        em blocos de ``export_chunk_size`` notas, com as categorias de cada
+        bloco buscadas em uma consulta, então a memória usada não depende
+        da quantidade de notas.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        if not queryset.ordered:
+            queryset = queryset.order_by("id")
+
+        serializer = self.get_serializer()
+        header = [
+            name for name, field in serializer.fields.items() if not field.write_only
+        ]
+        rows = (
+            serializer.to_representation(note)
+            for note in queryset.iterator(chunk_size=self.export_chunk_size)
+        )
+
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.iter_render(rows, header=header),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="notes.{renderer.format}"'
+        )
+        return response
+
+    @action(detail=False, methods=["post"], url_path="import", url_name="import")
+    def import_notes(self, request):
+        """
+        Importa notas enviadas no corpo da requisição como NDJSON
+        (``application/x-ndjson``) ou CSV (``text/csv``), lendo o corpo
+        como stream. Linhas inválidas são puladas e reportadas; a resposta
+        traz as contagens e a vazão em linhas por segundo.
+        """
+        formats = {
+            NDJSONRenderer.media_type: "ndjson",
+            CSVRenderer.media_type: "csv",
+        }
+        content_type = request.content_type.split(";")[0].strip()
+        if content_type not in formats:
+            return Response(
+                {"detail": f"Unsupported content type {content_type!r}."},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            )
+
+        parse = PARSERS[formats[content_type]]
+        importer = NoteImporter(request.user, batch_size=self.import_batch_size)
+        report = importer.run(parse(request.stream or []))
+        return Response(report)
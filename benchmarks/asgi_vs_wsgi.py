@@ -0,0 +1,228 @@
+"""
+Compara o caminho WSGI (views síncronas do DRF) com o ASGI (as mesmas
+views via sync_to_async e as views assíncronas de ``api/async_views.py``)
+sob carga concorrente, medindo requisições por segundo e latências.
+
+Sobe cada servidor localmente em um subprocesso:
+
+- WSGI: ``manage.py runserver`` (uma thread por requisição);
+- ASGI: ``uvicorn setup.asgi:application`` (``pip install uvicorn``).
+
+Uso::
+
+    python benchmarks/asgi_vs_wsgi.py --requests 2000 --concurrency 50
+
+O banco configurado em ``setup.settings`` é migrado e recebe um usuário
+``bench`` com ``--notes`` notas, se ainda não existir. As requisições usam
+um cookie de sessão criado no início, para que o hash de senha da
+autenticação HTTP Basic não domine o tempo medido.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "setup.settings")
+
+USERNAME = "bench"
+
+
+def seed(notes):
+    """
+    Garante o banco migrado e o usuário de benchmark com ``notes`` notas;
+    retorna o cookie de uma sessão autenticada desse usuário.
+    """
+    import django
+
+    django.setup()
+    from django.conf import settings
+    from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+    from django.contrib.auth.models import User
+    from django.contrib.sessions.backends.db import SessionStore
+    from django.core.management import call_command
+
+    from core.models import Category, Note
+
+    call_command("migrate", verbosity=0)
+    user, created = User.objects.get_or_create(username=USERNAME)
+    if created:
+        user.set_unusable_password()
+        user.save()
+    missing = notes - Note.objects.filter(owner=user).count()
+    if missing > 0:
+        category, _ = Category.objects.get_or_create(name="bench")
+        created_notes = Note.objects.bulk_create(
+            Note(owner=user, title=f"Bench {i}", content="lorem ipsum " * 20)
+            for i in range(missing)
+        )
+        Through = Note.categories.through
+        Through.objects.bulk_create(
+            Through(note_id=note.id, category_id=category.id) for note in created_notes
+        )
+
+    session = SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = "django.contrib.auth.backends.ModelBackend"
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.create()
+    return f"{settings.SESSION_COOKIE_NAME}={session.session_key}"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, port):
+    if kind == "wsgi":
+        command = [
+            sys.executable,
+            "manage.py",
+            "runserver",
+            f"127.0.0.1:{port}",
+            "--noreload",
+        ]
+    else:
+        command = [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "setup.asgi:application",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ]
+    process = subprocess.Popen(
+        command,
+        cwd=BASE_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"O servidor {kind} não subiu na porta {port}.")
+
+
+async def fetch(port, path, headers):
+    """
+    Faz um GET HTTP/1.1 e lê a resposta inteira; retorna o status.
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    request = f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n"
+    request += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+    writer.write((request + "\r\n").encode())
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    return int(data.split(b" ", 2)[1])
+
+
+async def load(port, path, total, concurrency, headers):
+    """
+    Dispara ``total`` requisições com ``concurrency`` clientes simultâneos.
+    """
+    latencies = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                status = await fetch(port, path, headers)
+            except OSError:
+                status = 0
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--notes", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON.")
+    args = parser.parse_args()
+
+    headers = {"Cookie": seed(args.notes)}
+
+    # A listagem síncrona de notas passa pelo cache por usuário; a de
+    # categorias não tem cache nos dois caminhos
+    scenarios = [
+        ("wsgi", "DRF síncrono", "/api/notes/"),
+        ("wsgi", "DRF síncrono", "/api/categories/"),
+    ]
+    if importlib.util.find_spec("uvicorn"):
+        scenarios += [
+            ("asgi", "DRF síncrono", "/api/notes/"),
+            ("asgi", "assíncrono", "/api/async/notes/"),
+            ("asgi", "DRF síncrono", "/api/categories/"),
+            ("asgi", "assíncrono", "/api/async/categories/"),
+        ]
+    else:
+        print("uvicorn não instalado: medindo só o caminho WSGI.", file=sys.stderr)
+
+    results = []
+    for kind, label, path in scenarios:
+        port = free_port()
+        process = start_server(kind, port)
+        try:
+            # Aquecimento: abre conexões com o banco e carrega o código
+            asyncio.run(load(port, path, 20, 5, headers))
+            result = asyncio.run(
+                load(port, path, args.requests, args.concurrency, headers)
+            )
+        finally:
+            process.terminate()
+            process.wait()
+        results.append({"server": kind, "view": label, "path": path, **result})
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+    print(
+        f"{'servidor':8} {'view':14} {'caminho':24} "
+        f"{'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} erros"
+    )
+    for row in results:
+        print(
+            f"{row['server']:8} {row['view']:14} {row['path']:24} {row['rps']:9} "
+            f"{row['p50_ms']:9} {row['p99_ms']:9} {row['errors']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Compara a serialização da listagem de notas pelo NoteSerializer (campos do
+DRF sobre instâncias do modelo) com o caminho rápido ``NoteValuesSerializer``
+(linhas de ``.values()`` e mapa de categorias), incluindo a consulta e a
+renderização do JSON, e confere que os dois geram os mesmos bytes.
+
+Uso::
+
+    python benchmarks/serialization.py --sizes 1000 10000 --repeat 5
+
+Roda num banco de testes temporário, criado e descartado pelo script.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "setup.settings")
+
+
+def seed(size):
+    """
+    Cria um usuário com ``size`` notas, cada uma com até três categorias.
+    """
+    from django.contrib.auth.models import User
+
+    from core.models import Category, Note
+
+    user = User.objects.create(username=f"bench-{size}")
+    categories = Category.objects.bulk_create(
+        Category(name=f"bench {size} {i}") for i in range(10)
+    )
+    notes = Note.objects.bulk_create(
+        Note(owner=user, title=f"Nota {i}", content="lorem ipsum " * 40)
+        for i in range(size)
+    )
+    Through = Note.categories.through
+    Through.objects.bulk_create(
+        (
+            Through(note_id=note.id, category_id=categories[(i + k) % 10].id)
+            for i, note in enumerate(notes)
+            for k in range(i % 4)
+        ),
+        batch_size=2000,
+    )
+    return user
+
+
+def measure(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return result, statistics.median(timings)
+
+
+def run(sizes, repeat):
+    from rest_framework.renderers import JSONRenderer
+
+    from api.serializers import NoteSerializer, NoteValuesSerializer
+    from core.models import Note
+
+    renderer = JSONRenderer()
+    results = []
+    for size in sizes:
+        user = seed(size)
+        queryset = Note.objects.filter(owner=user)
+
+        def drf():
+            notes = NoteSerializer.setup_eager_loading(queryset)
+            return renderer.render(NoteSerializer(notes, many=True).data)
+
+        def fast():
+            serializer = NoteValuesSerializer()
+            return renderer.render(
+                serializer.serialize(serializer.get_values(queryset))
+            )
+
+        drf_output, drf_time = measure(drf, repeat)
+        fast_output, fast_time = measure(fast, repeat)
+        results.append(
+            {
+                "notes": size,
+                "drf_ms": round(drf_time * 1000, 1),
+                "values_ms": round(fast_time * 1000, 1),
+                "speedup": round(drf_time / fast_time, 2),
+                "identical": drf_output == fast_output,
+            }
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON.")
+    args = parser.parse_args()
+
+    import django
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    django.setup()
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        results = run(args.sizes, args.repeat)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'notas':>7} {'DRF ms':>9} {'values ms':>10} {'ganho':>7} idêntico")
+    for row in results:
+        print(
+            f"{row['notes']:>7} {row['drf_ms']:>9} {row['values_ms']:>10} "
+            f"{row['speedup']:>6}x {'sim' if row['identical'] else 'NÃO'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
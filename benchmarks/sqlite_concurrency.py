@@ -0,0 +1,213 @@
+"""
+Compara o SQLite com a configuração padrão do Django (journal de rollback,
+uma conexão nova por requisição, transações DEFERRED) com o perfil
+ajustado de ``setup.settings`` (WAL, PRAGMAs, transações IMMEDIATE e
+conexões persistentes), medindo leituras e escritas por segundo com
+leitores e escritores concorrentes.
+
+Uso::
+
+    python benchmarks/sqlite_concurrency.py --readers 4 --writers 2 --duration 10
+
+Cada perfil roda num subprocesso, com um banco em arquivo temporário
+migrado e populado pelo ``DatasetSeeder``. As threads simulam requisições:
+enviam ``request_started`` e ``request_finished``, como o handler do
+Django, para que as conexões sejam fechadas ou reaproveitadas conforme o
+``CONN_MAX_AGE`` do perfil. Leitura: a primeira página de notas de um
+usuário, com as categorias. Escrita: criar uma nota com duas categorias
+numa transação (índice de busca, contadores de uso e cache incluídos).
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "setup.settings")
+
+PROFILES = ("baseline", "tuned")
+
+
+def configure(profile, path):
+    """
+    Aponta o banco para ``path`` e, no perfil ``baseline``, desfaz o ajuste
+    de ``setup.settings``. Precisa rodar antes do ``django.setup()``.
+    """
+    from django.conf import settings
+
+    database = settings.DATABASES["default"]
+    database["NAME"] = path
+    if profile == "baseline":
+        database.update(CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=False, OPTIONS={})
+        settings.NOTES_SQLITE_PRAGMAS = {}
+
+
+class Worker(threading.Thread):
+    """
+    Repete ``operation`` como uma requisição até ``deadline``, contando as
+    concluídas, os erros de banco e a latência de cada uma.
+    """
+
+    def __init__(self, operation, barrier, deadline, seed):
+        super().__init__()
+        self.operation = operation
+        self.barrier = barrier
+        self.deadline = deadline
+        self.random = random.Random(seed)
+        self.timings = []
+        self.errors = 0
+
+    def run(self):
+        from django.core.signals import request_finished, request_started
+        from django.db import OperationalError, connections
+
+        self.barrier.wait()
+        try:
+            while time.monotonic() < self.deadline[0]:
+                request_started.send(sender=self.__class__)
+                started = time.perf_counter()
+                try:
+                    self.operation(self.random)
+                except OperationalError:
+                    # "database is locked": o busy_timeout estourou ou o
+                    # SQLite recusou promover uma transação de leitura
+                    self.errors += 1
+                else:
+                    self.timings.append(time.perf_counter() - started)
+                finally:
+                    request_finished.send(sender=self.__class__)
+        finally:
+            connections.close_all()
+
+
+def run_profile(profile, args):
+    import django
+    from django.core.management import call_command
+    from django.db import connection, transaction
+
+    with tempfile.TemporaryDirectory() as directory:
+        configure(profile, os.path.join(directory, "bench.sqlite3"))
+        django.setup()
+
+        from core.models import Note
+        from core.seeding import WORDS, DatasetSeeder
+
+        call_command("migrate", verbosity=0)
+        seed = DatasetSeeder(args.notes, seed=args.seed).run()
+        user_ids, category_ids = seed["users"], seed["categories"]
+        journal_mode = connection.cursor().execute("PRAGMA journal_mode").fetchone()
+        connection.close()
+
+        def read(rng):
+            notes = (
+                Note.objects.filter(owner_id=rng.choice(user_ids))
+                .prefetch_related("categories")
+                .order_by("-updated_at")[:50]
+            )
+            for note in notes:
+                list(note.categories.all())
+
+        def write(rng):
+            with transaction.atomic():
+                note = Note.objects.create(
+                    owner_id=rng.choice(user_ids),
+                    title=" ".join(rng.choices(WORDS, k=4)),
+                    content=" ".join(rng.choices(WORDS, k=60)),
+                )
+                note.categories.add(*rng.sample(category_ids, 2))
+
+        threads = args.readers + args.writers
+        barrier = threading.Barrier(threads + 1)
+        deadline = [0.0]
+        readers = [
+            Worker(read, barrier, deadline, args.seed + i) for i in range(args.readers)
+        ]
+        writers = [
+            Worker(write, barrier, deadline, args.seed + 1000 + i)
+            for i in range(args.writers)
+        ]
+        for worker in readers + writers:
+            worker.start()
+        deadline[0] = time.monotonic() + args.duration
+        barrier.wait()
+        for worker in readers + writers:
+            worker.join()
+
+    return {
+        "profile": profile,
+        "journal_mode": journal_mode[0],
+        "reads": summarize(readers, args.duration),
+        "writes": summarize(writers, args.duration),
+    }
+
+
+def summarize(workers, duration):
+    timings = sorted(t for worker in workers for t in worker.timings)
+    p95 = timings[max(0, round(len(timings) * 0.95) - 1)] if timings else 0
+    return {
+        "count": len(timings),
+        "per_sec": round(len(timings) / duration, 1),
+        "errors": sum(worker.errors for worker in workers),
+        "median_ms": round(statistics.median(timings) * 1000, 2) if timings else 0,
+        "p95_ms": round(p95 * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--notes", type=int, default=5000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=10, help="Segundos.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Saída em JSON.")
+    parser.add_argument("--profile", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        # Subprocesso: roda um perfil e devolve o resultado em JSON
+        print(json.dumps(run_profile(args.profile, args)))
+        return
+
+    results = []
+    for profile in PROFILES:
+        output = subprocess.run(
+            [sys.executable, __file__, "--profile", profile, *sys.argv[1:]],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        results.append(json.loads(output.splitlines()[-1]))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(
+        f"{'perfil':9} {'journal':8} {'leituras/s':>10} {'p95 ms':>8} "
+        f"{'escritas/s':>10} {'p95 ms':>8} {'erros':>6}"
+    )
+    for row in results:
+        reads, writes = row["reads"], row["writes"]
+        print(
+            f"{row['profile']:9} {row['journal_mode']:8} {reads['per_sec']:>10} "
+            f"{reads['p95_ms']:>8} {writes['per_sec']:>10} {writes['p95_ms']:>8} "
+            f"{reads['errors'] + writes['errors']:>6}"
+        )
+    before, after = results
+    for kind, label in (("reads", "leituras"), ("writes", "escritas")):
+        if before[kind]["per_sec"]:
+            change = after[kind]["per_sec"] / before[kind]["per_sec"]
+            print(f"{label}: {change:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        # Registra as verificações e os receivers de sinais dos modelos
+        from . import checks, signals  # noqa: F401
+        from .db import configure_sqlite
+
+        connection_created.connect(configure_sqlite, dispatch_uid="configure_sqlite")
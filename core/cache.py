@@ -0,0 +1,195 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models import Count, Max
+
+# Uso de memória por cache nomeado, compartilhado entre as instâncias de
+# cada thread do mesmo jeito que o armazenamento do LocMemCache.
+_usage = {}
+
+
+class _Usage:
+    def __init__(self):
+        self.sizes = {}
+        self.total = 0
+
+    def track(self, key, size):
+        self.total += size - self.sizes.get(key, 0)
+        self.sizes[key] = size
+
+    def untrack(self, key):
+        self.total -= self.sizes.pop(key, 0)
+
+    def clear(self):
+        self.sizes.clear()
+        self.total = 0
+
+
+class BoundedLocMemCache(LocMemCache):
+    """
+    LocMemCache com despejo LRU de verdade e limite de memória.
+
+    Além de ``MAX_ENTRIES``, aceita ``OPTIONS["MAX_BYTES"]``: quando o total
+    dos valores serializados passa desse limite, as entradas usadas há mais
+    tempo são removidas uma a uma, então o consumo de memória fica estável.
+    Valores maiores que o limite inteiro simplesmente não são guardados.
+    """
+
+    def __init__(self, name, params):
+        super().__init__(name, params)
+        options = params.get("OPTIONS", {})
+        self._max_bytes = int(options.get("MAX_BYTES", 0)) or None
+        self._usage = _usage.setdefault(name, _Usage())
+
+    def _set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        super()._set(key, value, timeout)
+        self._usage.track(key, len(value))
+        if self._max_bytes is None:
+            return
+        while self._usage.total > self._max_bytes and self._cache:
+            self._evict_oldest()
+
+    def _cull(self):
+        # Remove só a entrada menos usada, em vez de um terço do cache
+        self._evict_oldest()
+
+    def _evict_oldest(self):
+        key, _ = self._cache.popitem()
+        self._expire_info.pop(key, None)
+        self._usage.untrack(key)
+
+    def _delete(self, key):
+        deleted = super()._delete(key)
+        self._usage.untrack(key)
+        return deleted
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._expire_info.clear()
+            self._usage.clear()
+
+    @property
+    def current_bytes(self):
+        return self._usage.total
+
+
+def get_notes_cache():
+    """
+    Cache usado pelas respostas por usuário (``NOTES_CACHE_ALIAS``).
+    """
+    return caches[getattr(settings, "NOTES_CACHE_ALIAS", "default")]
+
+
+def _version_key(scope):
+    return f"notes:version:{scope}"
+
+
+def get_version(scope):
+    """
+    Versão atual de um conjunto de dados (os de um usuário, as categorias).
+    Se a chave sumir do cache (despejo ou reinício), recomeça de um valor
+    baseado no relógio, para nunca reaproveitar uma versão antiga.
+    """
+    cache = get_notes_cache()
+    key = _version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key, 0)
+    return version
+
+
+def bump_versions(scopes):
+    """
+    Avança a versão dos conjuntos de dados, invalidando o que estava em cache.
+    """
+    cache = get_notes_cache()
+    for scope in set(scopes):
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def get_user_version(user_id):
+    """
+    Versão atual dos dados (notas e suas categorias) do usuário.
+    """
+    return get_version(user_id)
+
+
+def bump_user_versions(user_ids):
+    """
+    Avança a versão dos usuários, invalidando todas as respostas em cache.
+    """
+    bump_versions(user_ids)
+
+
+def invalidate_users(user_ids):
+    """
+    Invalida o cache dos usuários agora e de novo quando a transação
+    atual for confirmada, para descartar respostas montadas no meio dela.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    bump_user_versions(user_ids)
+    transaction.on_commit(lambda: bump_user_versions(user_ids))
+
+
+def note_list_validators(owner_id):
+    """
+    Valores do banco que mudam com qualquer alteração nas notas do usuário:
+    contagem e maior updated_at das notas, quantidade de ligações com
+    categorias e maior updated_at dessas categorias (renomeações), numa
+    consulta agregada. Ao contrário das versões acima, são os mesmos em
+    todos os processos.
+    """
+    # Importado aqui: o backend de cache deste módulo é carregado pelas
+    # configurações, possivelmente antes dos modelos
+    from .models import Note
+
+    stats = Note.objects.filter(owner_id=owner_id).aggregate(
+        count=Count("id", distinct=True),
+        last_modified=Max("updated_at"),
+        links=Count("categories"),
+        categories_modified=Max("categories__updated_at"),
+    )
+    return [
+        stats["count"],
+        stats["last_modified"],
+        stats["links"],
+        stats["categories_modified"],
+    ]
+
+
+def user_cache_key(user_id, *parts):
+    """
+    Chave de cache para uma resposta do usuário na versão atual.
+    """
+    digest = hashlib.md5(
+        "|".join(str(part) for part in parts).encode(), usedforsecurity=False
+    ).hexdigest()
+    return f"notes:{user_id}:{get_user_version(user_id)}:{digest}"
+
+
+def get_categories_version():
+    """
+    Versão da tabela de categorias, compartilhada por todos os usuários.
+    """
+    return get_version("categories")
+
+
+def invalidate_categories():
+    """
+    Invalida o que depende da lista global de categorias.
+    """
+    bump_versions(["categories"])
+    transaction.on_commit(lambda: bump_versions(["categories"]))
@@ -0,0 +1,31 @@
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Tags, Warning, register
+
+from .cache import get_notes_cache
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_notes_cache(app_configs, **kwargs):
+    """
+    As versões que invalidam as respostas em cache ficam no próprio cache
+    de notas. Num cache em memória, cada processo tem as suas: as chaves
+    também levam agregados das notas lidos do banco, mas uma edição que não
+    muda esses agregados (mover uma categoria entre duas notas) só é vista
+    pelo worker que a atendeu, e cada um guarda a própria cópia.
+    """
+    if not isinstance(get_notes_cache(), LocMemCache):
+        return []
+    return [
+        Warning(
+            "The notes response cache is local to each process, so every "
+            "worker keeps its own copy of each response, and an edit that "
+            "leaves the note aggregates in the cache keys unchanged is only "
+            "seen by the worker that handled it.",
+            hint=(
+                "Point the NOTES_CACHE_ALIAS entry of CACHES at a shared "
+                "backend (Redis, Memcached or DatabaseCache; FileBasedCache "
+                "on a single host) when running more than one process."
+            ),
+            id="core.W001",
+        )
+    ]
@@ -0,0 +1,19 @@
+from django.conf import settings
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Receptor do sinal ``connection_created``: aplica os PRAGMAs de
+    ``NOTES_SQLITE_PRAGMAS`` a cada conexão SQLite aberta.
+
+    Usa a conexão do sqlite3 diretamente, e não um cursor do Django, para
+    que os PRAGMAs não apareçam no log de SQL nem sejam contados pela
+    instrumentação como consultas da requisição que abriu a conexão.
+    """
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "NOTES_SQLITE_PRAGMAS", {})
+    for name, value in pragmas.items():
+        if not name.isidentifier():
+            raise ValueError(f"Invalid SQLite pragma name: {name!r}.")
+        connection.connection.execute(f"PRAGMA {name} = {value}").fetchall()
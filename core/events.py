@@ -0,0 +1,160 @@
+import asyncio
+import itertools
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+# Evento enviado no lugar dos que foram descartados quando a fila de uma
+# conexão enche: o cliente deve recarregar a lista inteira
+RESYNC = {"type": "resync"}
+
+
+class Subscription:
+    """
+    Uma conexão inscrita em um canal, com fila limitada.
+
+    Os eventos são publicados a partir de qualquer thread (os sinais do ORM
+    rodam nas threads das views síncronas) e entregues no event loop da
+    conexão. Se o cliente não consome rápido o bastante e a fila enche, os
+    eventos pendentes são trocados por um único ``resync``, então a memória
+    por conexão fica limitada a ``maxsize`` eventos.
+    """
+
+    def __init__(self, backend, channel, maxsize):
+        self.backend = backend
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def deliver(self, event):
+        """
+        Entrega o evento; pode ser chamado de qualquer thread.
+        """
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # Event loop já encerrado: a conexão caiu sem fechar a inscrição
+            self.close()
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+    async def get(self, timeout=None):
+        """
+        Próximo evento; levanta TimeoutError se nada chegar no prazo.
+        """
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self):
+        self.backend.unsubscribe(self)
+
+
+class EventBackend:
+    """
+    Interface do pub/sub de eventos das notas.
+    """
+
+    def publish(self, channel, event):
+        """
+        Envia o evento (um dicionário serializável em JSON) aos inscritos.
+        """
+        raise NotImplementedError
+
+    def subscribe(self, channel, maxsize):
+        """
+        Inscreve a conexão atual no canal; deve ser chamado dentro do
+        event loop que vai consumir a ``Subscription`` devolvida.
+        """
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        """
+        Cancela a inscrição.
+        """
+
+    def has_subscribers(self, channel):
+        """
+        Permite pular a publicação quando ninguém escuta o canal. Backends
+        entre processos que não sabem responder devem devolver True.
+        """
+        return True
+
+
+class InProcessBackend(EventBackend):
+    """
+    Pub/sub em memória, válido dentro de um processo. Com vários processos
+    (vários workers do servidor ASGI) cada um só vê as alterações feitas
+    nele; nesse caso use um backend com um broker compartilhado.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channels = {}
+        self._ids = itertools.count(1)
+
+    def publish(self, channel, event):
+        event = {**event, "seq": next(self._ids)}
+        with self._lock:
+            subscriptions = list(self._channels.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.deliver(event)
+
+    def subscribe(self, channel, maxsize):
+        subscription = Subscription(self, channel, maxsize)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._channels.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._channels[subscription.channel]
+
+    def has_subscribers(self, channel):
+        return channel in self._channels
+
+
+_backends = {}
+
+
+def get_event_backend():
+    """
+    Retorna o backend configurado em ``NOTES_EVENTS_BACKEND`` (por padrão o
+    pub/sub em memória), uma instância por processo.
+    """
+    path = getattr(settings, "NOTES_EVENTS_BACKEND", "core.events.InProcessBackend")
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+    return _backends[path]
+
+
+def user_channel(user_id):
+    return f"notes:user:{user_id}"
+
+
+def publish_note_events(owner_id, events):
+    """
+    Publica os eventos de notas do usuário depois do commit da transação
+    atual, para que o cliente nunca busque uma alteração ainda não gravada.
+    """
+    backend = get_event_backend()
+    channel = user_channel(owner_id)
+    events = list(events)
+    if not events or not backend.has_subscribers(channel):
+        return
+
+    def publish():
+        for event in events:
+            backend.publish(channel, event)
+
+    transaction.on_commit(publish)
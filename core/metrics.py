@@ -0,0 +1,270 @@
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+
+# Medidas da requisição em andamento. Uma ContextVar (e não um atributo do
+# request) para que o wrapper das consultas, que não recebe o request, as
+# encontre; o sync_to_async copia o contexto, então consultas feitas em
+# threads a partir de views assíncronas também são contadas.
+_current = ContextVar("notes_request_metrics", default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Uma view fez mais consultas SQL que o orçamento configurado.
+    """
+
+
+class RequestMetrics:
+    """
+    Consultas, tempo de banco e tempo de cada fase (serialização,
+    renderização) de uma requisição.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.phases = {}
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Soma o tempo do bloco à fase ``name``, descontando o tempo das
+        consultas feitas dentro dele (já contado em ``db_time``).
+        """
+        started = time.perf_counter()
+        db_time = self.db_time
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started - (self.db_time - db_time)
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self, total):
+        """
+        Valor do cabeçalho ``Server-Timing`` (durações em milissegundos).
+        """
+        entries = [f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries"']
+        entries += [
+            f"{name};dur={duration * 1000:.2f}"
+            for name, duration in self.phases.items()
+        ]
+        entries.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(entries)
+
+
+def get_request_metrics():
+    """
+    Medidas da requisição atual, ou None se a instrumentação está desligada.
+    """
+    return _current.get()
+
+
+@contextmanager
+def collect():
+    """
+    Ativa a coleta de medidas no contexto atual e devolve o RequestMetrics.
+    """
+    install_query_recorder()
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def measure(phase):
+    """
+    Mede uma fase da requisição atual; não faz nada fora de ``collect``.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    with metrics.phase(phase):
+        yield
+
+
+def instrument(obj, method_name, phase):
+    """
+    Faz com que as chamadas a ``obj.<method_name>`` sejam medidas como
+    ``phase`` na requisição atual.
+    """
+    if _current.get() is None:
+        return obj
+    method = getattr(obj, method_name)
+
+    @functools.wraps(method)
+    def measured(*args, **kwargs):
+        with measure(phase):
+            return method(*args, **kwargs)
+
+    setattr(obj, method_name, measured)
+    return obj
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Wrapper de execução instalado nas conexões; só mede quando há uma
+    requisição sendo instrumentada.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics.record_query(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection=None, **kwargs):
+    """
+    Instala ``record_query`` na conexão informada (receptor do sinal
+    ``connection_created``) ou nas conexões já abertas da thread atual.
+    """
+    targets = [connection] if connection is not None else connections.all()
+    for target in targets:
+        if record_query not in target.execute_wrappers:
+            target.execute_wrappers.append(record_query)
+
+
+class Histogram:
+    """
+    Histograma cumulativo no formato do Prometheus.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            total += count
+            yield bound, total
+
+
+class MetricsRegistry:
+    """
+    Histogramas em memória, por processo, de latência e de consultas por
+    view e método, expostos em texto no formato do Prometheus.
+    """
+
+    duration_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    query_buckets = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._requests = {}
+            self._durations = {}
+            self._queries = {}
+            self._db_time = {}
+            self._phases = {}
+
+    def observe(self, view, method, status, metrics, duration):
+        labels = (view, method)
+        with self._lock:
+            key = (view, method, f"{status // 100}xx")
+            self._requests[key] = self._requests.get(key, 0) + 1
+            if labels not in self._durations:
+                self._durations[labels] = Histogram(self.duration_buckets)
+                self._queries[labels] = Histogram(self.query_buckets)
+            self._durations[labels].observe(duration)
+            self._queries[labels].observe(metrics.queries)
+            self._db_time[labels] = self._db_time.get(labels, 0.0) + metrics.db_time
+            for phase, seconds in metrics.phases.items():
+                key = (view, method, phase)
+                self._phases[key] = self._phases.get(key, 0.0) + seconds
+
+    def render(self):
+        with self._lock:
+            lines = []
+            self._render_counter(
+                lines,
+                "notes_requests_total",
+                "Requisições atendidas.",
+                ("view", "method", "status"),
+                self._requests,
+            )
+            self._render_histogram(
+                lines,
+                "notes_request_duration_seconds",
+                "Tempo de resposta.",
+                self._durations,
+            )
+            self._render_histogram(
+                lines,
+                "notes_request_queries",
+                "Consultas SQL por requisição.",
+                self._queries,
+            )
+            self._render_counter(
+                lines,
+                "notes_request_db_seconds_total",
+                "Tempo gasto no banco.",
+                ("view", "method"),
+                self._db_time,
+            )
+            self._render_counter(
+                lines,
+                "notes_request_phase_seconds_total",
+                "Tempo de serialização e renderização, sem o tempo de banco.",
+                ("view", "method", "phase"),
+                self._phases,
+            )
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _labels(names, values, **extra):
+        pairs = [*zip(names, values), *extra.items()]
+        escaped = (
+            (name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+            for name, value in pairs
+        )
+        return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+    def _render_counter(self, lines, name, help_text, label_names, values):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for labels, value in sorted(values.items()):
+            lines.append(f"{name}{self._labels(label_names, labels)} {value}")
+
+    def _render_histogram(self, lines, name, help_text, histograms):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        names = ("view", "method")
+        for labels, histogram in sorted(histograms.items()):
+            for bound, count in histogram.cumulative():
+                lines.append(
+                    f"{name}_bucket{self._labels(names, labels, le=bound)} {count}"
+                )
+            lines.append(f"{name}_sum{self._labels(names, labels)} {histogram.sum}")
+            lines.append(f"{name}_count{self._labels(names, labels)} {histogram.count}")
+
+
+registry = MetricsRegistry()
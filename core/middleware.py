@@ -0,0 +1,86 @@
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+
+from .metrics import QueryBudgetExceeded, collect, install_query_recorder, registry
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentationMiddleware:
+    """
+    Mede cada requisição: número de consultas SQL, tempo de banco e, nas
+    views que usam ``InstrumentedViewMixin``, tempo de serialização e de
+    renderização. As medidas vão no cabeçalho ``Server-Timing`` e nos
+    histogramas servidos em ``/metrics/``.
+
+    Opcional: só é carregado com ``NOTES_INSTRUMENTATION = True``. Em
+    ``NOTES_QUERY_BUDGETS`` (``"MÉTODO nome-da-url"`` ou ``"nome-da-url"``
+    -> máximo de consultas) ficam os orçamentos; quando um é estourado,
+    ``NOTES_QUERY_BUDGET_ACTION`` decide entre registrar um aviso
+    (``"warn"``) e levantar ``QueryBudgetExceeded`` (``"raise"``, para
+    falhar os testes).
+
+    Em respostas em streaming, mede só até o envio dos cabeçalhos.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "NOTES_INSTRUMENTATION", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        self.installed_in_executor = False
+        if self.async_mode:
+            markcoroutinefunction(self)
+        # Conexões abertas daqui em diante, em qualquer thread, e as que já
+        # estão abertas nesta
+        connection_created.connect(install_query_recorder)
+        install_query_recorder()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with collect() as metrics:
+            response = self.get_response(request)
+        return self.process_metrics(request, response, metrics)
+
+    async def __acall__(self, request):
+        if not self.installed_in_executor:
+            # O ORM chamado pelas views assíncronas roda na thread do
+            # sync_to_async, que tem as próprias conexões
+            await sync_to_async(install_query_recorder)()
+            self.installed_in_executor = True
+        with collect() as metrics:
+            response = await self.get_response(request)
+        return self.process_metrics(request, response, metrics)
+
+    def process_metrics(self, request, response, metrics):
+        total = metrics.elapsed()
+        view_name = (
+            request.resolver_match.view_name if request.resolver_match else "unresolved"
+        )
+        response["Server-Timing"] = metrics.server_timing(total)
+        registry.observe(
+            view_name, request.method, response.status_code, metrics, total
+        )
+        self.check_budget(view_name, request, metrics)
+        return response
+
+    def check_budget(self, view_name, request, metrics):
+        budgets = getattr(settings, "NOTES_QUERY_BUDGETS", {})
+        budget = budgets.get(f"{request.method} {view_name}", budgets.get(view_name))
+        if budget is None or metrics.queries <= budget:
+            return
+        message = (
+            f"{request.method} {request.path} ({view_name}) ran {metrics.queries} "
+            f"queries; budget is {budget}."
+        )
+        if getattr(settings, "NOTES_QUERY_BUDGET_ACTION", "warn") == "raise":
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
@@ -0,0 +1,155 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+FTS_TABLE = "core_note_fts"
+
+# Tabela FTS5 com conteúdo externo em core_note, mantida por gatilhos.
+# Atenção: no SQLite, migrações que recriam a tabela core_note (AlterField,
+# RemoveField...) descartam estes gatilhos; nesses casos recrie-os e rode
+# "INSERT INTO core_note_fts(core_note_fts) VALUES ('rebuild')".
+CREATE_FTS_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, content, owner_id UNINDEXED,
+        content='core_note', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON core_note BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, content, owner_id)
+        VALUES (new.id, new.title, new.content, new.owner_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON core_note BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content, owner_id)
+        VALUES ('delete', old.id, old.title, old.content, old.owner_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON core_note BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content, owner_id)
+        VALUES ('delete', old.id, old.title, old.content, old.owner_id);
+        INSERT INTO {FTS_TABLE}(rowid, title, content, owner_id)
+        VALUES (new.id, new.title, new.content, new.owner_id);
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+DROP_FTS_SQL = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def create_fts_index(apps, schema_editor):
+    """
+    Cria o índice FTS5 quando o banco é SQLite com suporte a FTS5; nos
+    demais casos a busca usa a tabela NoteSearchTerm.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        if "ENABLE_FTS5" not in {row[0] for row in cursor.fetchall()}:
+            return
+    for sql in CREATE_FTS_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for sql in DROP_FTS_SQL:
+            schema_editor.execute(sql)
+
+
+def build_term_index(apps, schema_editor):
+    """
+    Preenche o índice em tabela para as notas existentes quando não há FTS5.
+    """
+    if FTS_TABLE in schema_editor.connection.introspection.table_names():
+        return
+
+    from core.search import tokenize
+
+    Note = apps.get_model("core", "Note")
+    NoteSearchTerm = apps.get_model("core", "NoteSearchTerm")
+    rows = []
+    for note in Note.objects.only("id", "owner_id", "title", "content").iterator():
+        weights = {}
+        for term in tokenize(note.content):
+            weights[term] = weights.get(term, 0) + 1
+        for term in tokenize(note.title):
+            weights[term] = weights.get(term, 0) + 10
+        rows.extend(
+            NoteSearchTerm(
+                note_id=note.id, owner_id=note.owner_id, term=term[:64], weight=weight
+            )
+            for term, weight in weights.items()
+        )
+    NoteSearchTerm.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_notetombstone"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NoteSearchTerm",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("term", models.CharField(max_length=64)),
+                ("weight", models.PositiveIntegerField(default=1)),
+                (
+                    "note",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="core.note",
+                    ),
+                ),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["owner", "term"], name="core_searchterm_owner_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("term", "note"), name="core_searchterm_term_note_uniq"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(create_fts_index, drop_fts_index),
+        migrations.RunPython(build_term_index, migrations.RunPython.noop),
+    ]
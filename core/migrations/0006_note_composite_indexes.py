@@ -0,0 +1,36 @@
+# Generated by Django 5.1.2 on 2026-10-18 12:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_note_search"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="note",
+            index=models.Index(
+                fields=["owner", "-updated_at", "-id"],
+                name="core_note_owner_updated_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="note",
+            index=models.Index(
+                fields=["owner", "created_at"], name="core_note_owner_created_idx"
+            ),
+        ),
+        # Índice de cobertura para "notas de uma categoria" na tabela
+        # intermediária gerada pelo ManyToManyField (que só tem índices em
+        # (note_id, category_id) e em category_id isolado).
+        migrations.RunSQL(
+            "CREATE INDEX core_note_categories_cat_note_idx "
+            "ON core_note_categories (category_id, note_id)",
+            "DROP INDEX core_note_categories_cat_note_idx",
+        ),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 5.1.2 on 2026-10-18 13:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_category_usage(apps, schema_editor):
+    """
+    Preenche os contadores de uso a partir das notas existentes.
+    """
+    Category = apps.get_model("core", "Category")
+    CategoryUsage = apps.get_model("core", "CategoryUsage")
+    Through = apps.get_model("core", "Note").categories.through
+
+    totals = {}
+    rows = []
+    for owner_id, category_id, total in (
+        Through.objects.values_list("note__owner_id", "category_id")
+        .annotate(total=Count("id"))
+        .order_by()
+    ):
+        totals[category_id] = totals.get(category_id, 0) + total
+        rows.append(
+            CategoryUsage(owner_id=owner_id, category_id=category_id, count=total)
+        )
+    CategoryUsage.objects.bulk_create(rows, batch_size=1000)
+    for category in Category.objects.filter(pk__in=totals):
+        category.usage_count = totals[category.pk]
+        category.save(update_fields=["usage_count"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_note_composite_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="usage_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="category",
+            index=models.Index(
+                fields=["-usage_count", "name"], name="core_category_usage_idx"
+            ),
+        ),
+        migrations.CreateModel(
+            name="CategoryUsage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="core.category",
+                    ),
+                ),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["owner", "-count"], name="core_usage_owner_count_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("owner", "category"),
+                        name="core_usage_owner_category_uniq",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(count_category_usage, migrations.RunPython.noop),
+    ]
@@ -8,6 +8,20 @@ class Category(models.Model):
     """
 
     name = models.CharField(max_length=64, unique=True)
+    # Quantidade de notas com a categoria, mantida pelos sinais em
+    # core/usage.py (recalculada com ``recount_category_usage``)
+    usage_count = models.PositiveIntegerField(default=0)
+    # Entra nos validadores (ETag) das notas: renomear a categoria muda a
+    # representação delas sem mudar o updated_at das notas
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Categorias mais usadas primeiro (nuvem de tags global)
+            models.Index(
+                fields=["-usage_count", "name"], name="core_category_usage_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -28,5 +42,97 @@ class Note(models.Model):
     categories = models.ManyToManyField(Category, related_name="notes")
     owner = models.ForeignKey(User, on_delete=models.CASCADE)
 
+    class Meta:
+        indexes = [
+            # Listagens do usuário ordenadas pela última alteração (e
+            # paginação por cursor em (updated_at, id))
+            models.Index(
+                fields=["owner", "-updated_at", "-id"],
+                name="core_note_owner_updated_idx",
+            ),
+            models.Index(
+                fields=["owner", "created_at"], name="core_note_owner_created_idx"
+            ),
+        ]
+
     def __str__(self):
         return self.title
+
+
+class NoteTombstone(models.Model):
+    """
+    Registro leve de uma nota excluída.
+
+    Exclusões não deixam rastro na tabela de notas, então a sincronização
+    incremental consulta esta tabela para informar aos clientes quais notas
+    sumiram desde o último token. O proprietário não tem restrição de chave
+    estrangeira para que a exclusão em cascata de um usuário não falhe.
+    """
+
+    note_id = models.BigIntegerField()
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["owner", "deleted_at"], name="core_tombstone_owner_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Nota {self.note_id} excluída em {self.deleted_at}"
+
+
+class NoteSearchTerm(models.Model):
+    """
+    Entrada do índice invertido portátil usado pela busca quando o banco
+    não oferece FTS5: uma linha por (nota, termo) com o peso do termo.
+    """
+
+    note = models.ForeignKey(Note, on_delete=models.CASCADE, related_name="+")
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    term = models.CharField(max_length=64)
+    weight = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["term", "note"], name="core_searchterm_term_note_uniq"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["owner", "term"], name="core_searchterm_owner_idx"),
+        ]
+
+    def __str__(self):
+        return self.term
+
+
+class CategoryUsage(models.Model):
+    """
+    Contador desnormalizado de quantas notas de um usuário usam cada
+    categoria, para nuvens de tags sem COUNT na tabela intermediária.
+    """
+
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="+")
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["owner", "category"], name="core_usage_owner_category_uniq"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["owner", "-count"], name="core_usage_owner_count_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.category_id}: {self.count}"
@@ -0,0 +1,232 @@
+import re
+import unicodedata
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import (
+    Count,
+    FloatField,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from .models import Category, Note, NoteSearchTerm
+
+FTS_TABLE = "core_note_fts"
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """
+    Quebra o texto em termos minúsculos e sem acentos, do mesmo jeito que o
+    tokenizador ``unicode61 remove_diacritics 2`` do FTS5.
+    """
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return _WORD_RE.findall(text)
+
+
+class SearchBackend:
+    """
+    Interface dos índices invertidos de notas.
+    """
+
+    def filter_queryset(self, queryset, query, owner_id=None):
+        """
+        Restringe o queryset de notas a todas as que contêm os termos da
+        consulta, com uma subconsulta no índice em vez de uma lista de ids,
+        e anota ``search_rank`` (também numa consulta sem termos, que não
+        encontra nada): ordenar por ele, crescente, traz as mais relevantes
+        primeiro.
+        """
+        raise NotImplementedError
+
+    def index_notes(self, notes):
+        """
+        Atualiza o índice para as notas informadas (criadas ou alteradas).
+        """
+
+    def rebuild(self):
+        """
+        Reconstrói o índice inteiro a partir da tabela de notas.
+        """
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """
+    Usa a tabela virtual FTS5 ``core_note_fts``, com conteúdo externo
+    apontando para ``core_note``. Gatilhos criados na migração mantêm o
+    índice atualizado a cada INSERT/UPDATE/DELETE, inclusive em operações
+    em lote que não disparam sinais do Django.
+    """
+
+    # Peso do título e do conteúdo no ranking bm25
+    weights = (10.0, 1.0)
+
+    @staticmethod
+    def _match(query):
+        # Cada termo entre aspas para que a entrada do usuário não seja
+        # interpretada como operadores do FTS5
+        return " ".join(f'"{term}"' for term in tokenize(query))
+
+    def filter_queryset(self, queryset, query, owner_id=None):
+        match = self._match(query)
+        if not match:
+            return queryset.annotate(search_rank=Value(0)).none()
+
+        owner_sql = " AND owner_id = %s" if owner_id is not None else ""
+        owner_params = [owner_id] if owner_id is not None else []
+        ids = RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s{owner_sql}",
+            [match, *owner_params],
+        )
+        # bm25 é negativo e menor para as mais relevantes
+        rank = RawSQL(
+            f"SELECT bm25({FTS_TABLE}, %s, %s, 0) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s "
+            f'AND {FTS_TABLE}.rowid = "{Note._meta.db_table}"."id"',
+            [*self.weights, match],
+            output_field=FloatField(),
+        )
+        return queryset.filter(id__in=ids).annotate(search_rank=rank)
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+class TermIndexBackend(SearchBackend):
+    """
+    Índice invertido portátil em uma tabela comum (``NoteSearchTerm``), com
+    uma linha por (nota, termo) e a frequência do termo. A relevância é a
+    soma das frequências, com peso extra para termos do título.
+    """
+
+    title_weight = 10
+
+    def filter_queryset(self, queryset, query, owner_id=None):
+        terms = set(tokenize(query))
+        if not terms:
+            return queryset.annotate(search_rank=Value(0)).none()
+
+        rows = NoteSearchTerm.objects.filter(term__in=terms)
+        if owner_id is not None:
+            rows = rows.filter(owner_id=owner_id)
+        matches = (
+            rows.values("note_id")
+            .annotate(matched=Count("term"))
+            .filter(matched=len(terms))
+            .values("note_id")
+        )
+        score = (
+            rows.filter(note_id=OuterRef("pk"))
+            .values("note_id")
+            .annotate(score=Sum("weight"))
+            .values("score")
+        )
+        return queryset.filter(id__in=matches).annotate(
+            search_rank=-Subquery(score, output_field=IntegerField())
+        )
+
+    def index_notes(self, notes):
+        notes = list(notes)
+        if not notes:
+            return
+
+        rows = []
+        for note in notes:
+            weights = Counter(tokenize(note.content))
+            for term in tokenize(note.title):
+                weights[term] += self.title_weight
+            rows.extend(
+                NoteSearchTerm(
+                    note_id=note.pk,
+                    owner_id=note.owner_id,
+                    term=term[:64],
+                    weight=weight,
+                )
+                for term, weight in weights.items()
+            )
+
+        NoteSearchTerm.objects.filter(note_id__in=[note.pk for note in notes]).delete()
+        NoteSearchTerm.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+    def rebuild(self):
+        NoteSearchTerm.objects.all().delete()
+        batch = []
+        for note in Note.objects.only("id", "owner_id", "title", "content").iterator(
+            chunk_size=1000
+        ):
+            batch.append(note)
+            if len(batch) == 1000:
+                self.index_notes(batch)
+                batch = []
+        self.index_notes(batch)
+
+
+_fts_tables = {}
+
+
+def fts_available():
+    """
+    Indica se a tabela FTS5 foi criada pela migração neste banco. O
+    resultado fica guardado por banco para não consultar o catálogo a
+    cada busca.
+    """
+    if connection.vendor != "sqlite":
+        return False
+    key = (connection.alias, str(connection.settings_dict["NAME"]))
+    if not _fts_tables.get(key):
+        _fts_tables[key] = FTS_TABLE in connection.introspection.table_names()
+    return _fts_tables[key]
+
+
+_backends = {}
+
+
+def get_backend():
+    """
+    Retorna o backend configurado em ``NOTES_SEARCH_BACKEND`` ou, por padrão,
+    o FTS5 quando disponível e o índice em tabela nos demais bancos.
+    """
+    path = getattr(settings, "NOTES_SEARCH_BACKEND", None)
+    if path is None:
+        path = (
+            "core.search.SQLiteFTSBackend"
+            if fts_available()
+            else "core.search.TermIndexBackend"
+        )
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+    return _backends[path]
+
+
+def filter_notes(queryset, query, owner_id=None):
+    """
+    Atalho para ``get_backend().filter_queryset``.
+    """
+    return get_backend().filter_queryset(queryset, query, owner_id=owner_id)
+
+
+# Maior code point válido: toda string que começa com o prefixo é menor
+# que ``prefixo + _MAX_CHAR``
+_MAX_CHAR = "\U0010ffff"
+
+
+def categories_by_prefix(prefix):
+    """
+    Categorias cujo nome começa com ``prefix`` (já normalizado), das mais
+    usadas para as menos usadas. O prefixo vira uma busca por faixa no
+    índice único de ``name`` em vez de LIKE, que no SQLite não usa índice.
+    """
+    queryset = Category.objects.all()
+    if prefix:
+        queryset = queryset.filter(name__gte=prefix, name__lt=prefix + _MAX_CHAR)
+    return queryset.order_by("-usage_count", "name")
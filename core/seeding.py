@@ -0,0 +1,139 @@
+import random
+import time
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from .models import Category, Note
+from .signals import notes_bulk_saved
+from .usage import recount_usage
+
+WORDS = (
+    "reunião projeto cliente entrega prazo ideia leitura compras viagem código "
+    "revisão estudo treino saúde finanças orçamento família casa receita filme "
+    "livro música relatório apresentação contrato pagamento backup servidor "
+    "banco consulta índice cache deploy teste bug melhoria documentação equipe"
+).split()
+
+
+def zipf_cum_weights(count, skew):
+    """
+    Pesos acumulados de uma distribuição de Zipf: o item de posição ``r``
+    é escolhido com probabilidade proporcional a ``1 / r ** skew``.
+    """
+    return list(accumulate(1 / rank**skew for rank in range(1, count + 1)))
+
+
+class DatasetSeeder:
+    """
+    Gera um conjunto de dados realista para testes de carga, gravado com
+    bulk_create em lotes (usuários, categorias, notas e tabela
+    intermediária), sem passar pelos serializers.
+
+    Donos e categorias seguem distribuições de Zipf com expoente ``skew``:
+    poucos usuários concentram a maior parte das notas e poucas categorias
+    a maior parte das ligações, como em dados reais. Cada lote dispara
+    ``notes_bulk_saved`` (índice de busca e cache); os contadores de uso
+    são recalculados uma vez no final. Com a mesma ``seed`` os dados
+    gerados são os mesmos.
+    """
+
+    def __init__(
+        self,
+        notes,
+        users=None,
+        categories=200,
+        skew=1.1,
+        max_categories=3,
+        batch_size=5000,
+        seed=0,
+        prefix="seed",
+        progress=None,
+    ):
+        self.notes = notes
+        self.users = users or max(1, notes // 200)
+        self.categories = categories
+        self.skew = skew
+        self.max_categories = max_categories
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+        self.prefix = prefix
+        self.progress = progress
+
+    def run(self):
+        """
+        Grava os dados e retorna um relatório com os ids gerados (usuários
+        do mais para o menos ativo) e o tempo gasto.
+        """
+        started = time.monotonic()
+        user_ids = self._create_users()
+        category_ids = self._create_categories()
+        owner_weights = zipf_cum_weights(len(user_ids), self.skew)
+        category_weights = zipf_cum_weights(len(category_ids), self.skew)
+
+        created = links = 0
+        while created < self.notes:
+            size = min(self.batch_size, self.notes - created)
+            owners = self.random.choices(user_ids, cum_weights=owner_weights, k=size)
+            links += self._create_batch(owners, category_ids, category_weights)
+            created += size
+            if self.progress:
+                self.progress(created, self.notes)
+
+        recount_usage()
+        elapsed = time.monotonic() - started
+        return {
+            "users": user_ids,
+            "categories": category_ids,
+            "notes": created,
+            "links": links,
+            "elapsed": round(elapsed, 3),
+            "rows_per_sec": round((created + links) / elapsed, 1) if elapsed else 0,
+        }
+
+    def _create_users(self):
+        User = get_user_model()
+        # Um hash inutilizável, calculado uma vez, em vez de um por usuário
+        password = make_password(None)
+        users = User.objects.bulk_create(
+            (
+                User(username=f"{self.prefix}-{i}", password=password)
+                for i in range(self.users)
+            ),
+            batch_size=self.batch_size,
+        )
+        return [user.pk for user in users]
+
+    def _create_categories(self):
+        categories = Category.objects.bulk_create(
+            (Category(name=f"{self.prefix} {i}") for i in range(self.categories)),
+            batch_size=self.batch_size,
+        )
+        return [category.pk for category in categories]
+
+    def _text(self, low, high):
+        return " ".join(self.random.choices(WORDS, k=self.random.randint(low, high)))
+
+    def _create_batch(self, owners, category_ids, category_weights):
+        notes = [
+            Note(owner_id=owner_id, title=self._text(2, 6), content=self._text(20, 80))
+            for owner_id in owners
+        ]
+        Through = Note.categories.through
+        with transaction.atomic():
+            Note.objects.bulk_create(notes)
+            rows = []
+            for note in notes:
+                count = self.random.randint(0, self.max_categories)
+                chosen = self.random.choices(
+                    category_ids, cum_weights=category_weights, k=count
+                )
+                rows += [
+                    Through(note_id=note.pk, category_id=category_id)
+                    for category_id in set(chosen)
+                ]
+            Through.objects.bulk_create(rows, batch_size=self.batch_size)
+            notes_bulk_saved.send(sender=Note, notes=notes, created=True)
+        return len(rows)
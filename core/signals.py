@@ -0,0 +1,240 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+
+from .cache import invalidate_categories, invalidate_users
+from .events import publish_note_events
+from .models import Category, Note, NoteTombstone
+from .search import get_backend
+from .usage import apply_usage_changes, note_links
+
+# Enviado pelas operações em lote (bulk_create/bulk_update) que não disparam
+# post_save. Argumentos: ``notes``, a lista de notas gravadas, e
+# ``created`` (opcional, padrão False), se as notas foram criadas agora.
+notes_bulk_saved = Signal()
+
+
+# Ligado por bulk_deleting(): a exclusão em lote grava de uma vez o que os
+# receptores de exclusão de notas gravariam nota a nota.
+_bulk_deleting = ContextVar("notes_bulk_deleting", default=False)
+
+
+@contextmanager
+def bulk_deleting():
+    """
+    Desliga, dentro do bloco, os receptores de exclusão de notas que gravam
+    no banco (registro de exclusões e contadores de uso). Quem exclui em
+    lote (``delete_notes``) faz esse trabalho de uma vez para todas as notas.
+    """
+    token = _bulk_deleting.set(True)
+    try:
+        yield
+    finally:
+        _bulk_deleting.reset(token)
+
+
+@receiver(post_delete, sender=Note)
+def record_note_tombstone(sender, instance, **kwargs):
+    """
+    Registra a exclusão da nota para a sincronização incremental.
+    """
+    if _bulk_deleting.get():
+        return
+    NoteTombstone.objects.create(note_id=instance.pk, owner_id=instance.owner_id)
+
+
+@receiver(post_save, sender=Note)
+def index_saved_note(sender, instance, raw=False, **kwargs):
+    """
+    Atualiza o índice de busca da nota salva.
+    """
+    if raw:
+        return
+    get_backend().index_notes([instance])
+
+
+@receiver(notes_bulk_saved, sender=Note)
+def index_bulk_saved_notes(sender, notes, **kwargs):
+    """
+    Atualiza o índice de busca das notas gravadas em lote.
+    """
+    get_backend().index_notes(notes)
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def invalidate_note_owner(sender, instance, raw=False, **kwargs):
+    """
+    Invalida as respostas em cache do dono da nota alterada ou excluída.
+    """
+    if not raw:
+        invalidate_users([instance.owner_id])
+
+
+@receiver(notes_bulk_saved, sender=Note)
+def invalidate_bulk_saved_owners(sender, notes, **kwargs):
+    """
+    Invalida o cache dos donos das notas gravadas em lote.
+    """
+    invalidate_users(note.owner_id for note in notes)
+
+
+@receiver(m2m_changed, sender=Note.categories.through)
+def invalidate_on_categories_changed(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """
+    Invalida o cache quando as categorias de uma nota mudam, tanto pelo
+    lado da nota (note.categories) quanto pelo da categoria (category.notes).
+    """
+    if action not in ("post_add", "post_remove", "post_clear", "pre_clear"):
+        return
+    if not reverse:
+        invalidate_users([instance.owner_id])
+    elif action == "pre_clear":
+        invalidate_users(_category_owner_ids(instance))
+    elif pk_set:
+        invalidate_users(
+            Note.objects.filter(pk__in=pk_set).values_list("owner_id", flat=True)
+        )
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def invalidate_category_owners(sender, instance, created=False, raw=False, **kwargs):
+    """
+    Renomear ou excluir uma categoria muda a representação das notas de
+    todos os usuários que a usam.
+    """
+    if not created and not raw:
+        invalidate_users(_category_owner_ids(instance))
+
+
+def _category_owner_ids(category):
+    return (
+        Note.objects.filter(categories=category)
+        .values_list("owner_id", flat=True)
+        .distinct()
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_list(sender, instance, raw=False, **kwargs):
+    """
+    Qualquer gravação em Category muda a listagem global de categorias.
+    """
+    if not raw:
+        invalidate_categories()
+
+
+@receiver(m2m_changed, sender=Note.categories.through)
+def update_category_usage(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Mantém os contadores de uso das categorias. As ligações que vão sumir
+    são lidas antes da remoção (pre_remove/pre_clear), porque pk_set pode
+    trazer ids que não estavam ligados e vem vazio no clear.
+    """
+    field = "category_id" if reverse else "note_id"
+    if action == "post_add" and pk_set:
+        if reverse:
+            added = note_links(category_id=instance.pk, note_id__in=pk_set)
+        else:
+            added = [(instance.owner_id, category_id) for category_id in pk_set]
+        apply_usage_changes(added=added)
+    elif action in ("pre_remove", "pre_clear"):
+        filters = {field: instance.pk}
+        if action == "pre_remove":
+            filters["note_id__in" if reverse else "category_id__in"] = pk_set
+        instance._removed_category_links = note_links(**filters)
+    elif action in ("post_remove", "post_clear"):
+        apply_usage_changes(
+            removed=instance.__dict__.pop("_removed_category_links", ())
+        )
+
+
+@receiver(pre_delete, sender=Note)
+def release_category_usage(sender, instance, **kwargs):
+    """
+    A exclusão da nota apaga as ligações com as categorias em cascata,
+    sem m2m_changed, então os contadores são ajustados aqui.
+    """
+    if _bulk_deleting.get():
+        return
+    apply_usage_changes(removed=note_links(note_id=instance.pk))
+
+
+def _note_event(note, created=False):
+    return {
+        "type": "note.created" if created else "note.updated",
+        "id": note.pk,
+        "updated_at": note.updated_at.isoformat() if note.updated_at else None,
+    }
+
+
+@receiver(post_save, sender=Note)
+def publish_saved_note(sender, instance, created=False, raw=False, **kwargs):
+    """
+    Avisa as conexões de eventos do dono que a nota foi criada ou alterada.
+    """
+    if not raw:
+        publish_note_events(instance.owner_id, [_note_event(instance, created)])
+
+
+@receiver(notes_bulk_saved, sender=Note)
+def publish_bulk_saved_notes(sender, notes, created=False, **kwargs):
+    """
+    Eventos das notas gravadas em lote, agrupados por dono.
+    """
+    by_owner = {}
+    for note in notes:
+        by_owner.setdefault(note.owner_id, []).append(_note_event(note, created))
+    for owner_id, events in by_owner.items():
+        publish_note_events(owner_id, events)
+
+
+@receiver(post_delete, sender=Note)
+def publish_deleted_note(sender, instance, **kwargs):
+    """
+    Avisa as conexões de eventos do dono que a nota foi excluída.
+    """
+    publish_note_events(
+        instance.owner_id, [{"type": "note.deleted", "id": instance.pk}]
+    )
+
+
+@receiver(m2m_changed, sender=Note.categories.through)
+def publish_categories_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Trocar as categorias muda a representação da nota. Pelo lado da
+    categoria, as notas afetadas vêm de pk_set (ou, no clear, são lidas
+    antes da remoção).
+    """
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            publish_note_events(
+                instance.owner_id, [{"type": "note.updated", "id": instance.pk}]
+            )
+        return
+
+    if action == "pre_clear":
+        instance._cleared_note_ids = list(instance.notes.values_list("id", flat=True))
+        return
+    if action == "post_clear":
+        note_ids = instance.__dict__.pop("_cleared_note_ids", [])
+    elif action in ("post_add", "post_remove"):
+        note_ids = pk_set or []
+    else:
+        return
+
+    by_owner = {}
+    for note_id, owner_id in Note.objects.filter(pk__in=note_ids).values_list(
+        "id", "owner_id"
+    ):
+        by_owner.setdefault(owner_id, []).append(
+            {"type": "note.updated", "id": note_id}
+        )
+    for owner_id, events in by_owner.items():
+        publish_note_events(owner_id, events)
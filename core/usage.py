@@ -0,0 +1,113 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .cache import bump_versions, get_version
+from .models import Category, CategoryUsage, Note
+
+USAGE_SCOPE = "category_usage"
+
+
+def note_links(**filters):
+    """
+    Pares ``(owner_id, category_id)`` das ligações nota–categoria que
+    atendem aos filtros da tabela intermediária (ex.: ``note_id__in=...``).
+    """
+    return list(
+        Note.categories.through.objects.filter(**filters).values_list(
+            "note__owner_id", "category_id"
+        )
+    )
+
+
+def apply_usage_changes(added=(), removed=()):
+    """
+    Atualiza os contadores de uso a partir das ligações incluídas e
+    removidas, dadas como pares ``(owner_id, category_id)``. Os incrementos
+    são agrupados, então o número de consultas depende da quantidade de
+    valores diferentes de incremento, não da quantidade de ligações.
+    Um contador que ficou defasado (SQL direto, backup restaurado) para em
+    zero em vez de violar a restrição; ``recount_usage`` o corrige.
+    """
+    deltas = Counter(added)
+    deltas.subtract(Counter(removed))
+    deltas = {pair: delta for pair, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    per_category = Counter()
+    for (_, category_id), delta in deltas.items():
+        per_category[category_id] += delta
+
+    with transaction.atomic():
+        CategoryUsage.objects.bulk_create(
+            [
+                CategoryUsage(owner_id=owner_id, category_id=category_id)
+                for (owner_id, category_id), delta in deltas.items()
+                if delta > 0
+            ],
+            ignore_conflicts=True,
+        )
+        by_delta = defaultdict(list)
+        for category_id, delta in per_category.items():
+            if delta:
+                by_delta[delta].append(category_id)
+        for delta, category_ids in by_delta.items():
+            Category.objects.filter(pk__in=category_ids).update(
+                usage_count=Greatest(F("usage_count") + delta, 0)
+            )
+        by_owner = defaultdict(list)
+        for (owner_id, category_id), delta in deltas.items():
+            by_owner[(owner_id, delta)].append(category_id)
+        for (owner_id, delta), category_ids in by_owner.items():
+            CategoryUsage.objects.filter(
+                owner_id=owner_id, category_id__in=category_ids
+            ).update(count=Greatest(F("count") + delta, 0))
+
+    bump_versions([USAGE_SCOPE])
+    transaction.on_commit(lambda: bump_versions([USAGE_SCOPE]))
+
+
+def get_usage_version():
+    """
+    Versão dos contadores de uso, para validar respostas que os incluem.
+    """
+    return get_version(USAGE_SCOPE)
+
+
+def recount_usage():
+    """
+    Recalcula todos os contadores a partir da tabela intermediária, com uma
+    agregação para as categorias e outra para os pares (usuário, categoria).
+    """
+    Through = Note.categories.through
+    totals = (
+        Through.objects.filter(category_id=OuterRef("pk"))
+        .order_by()
+        .values("category_id")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    per_owner = (
+        Through.objects.order_by()
+        .values_list("note__owner_id", "category_id")
+        .annotate(total=Count("id"))
+    )
+
+    with transaction.atomic():
+        updated = Category.objects.update(
+            usage_count=Coalesce(Subquery(totals), Value(0))
+        )
+        CategoryUsage.objects.all().delete()
+        CategoryUsage.objects.bulk_create(
+            (
+                CategoryUsage(owner_id=owner_id, category_id=category_id, count=total)
+                for owner_id, category_id, total in per_owner.iterator()
+            ),
+            batch_size=1000,
+        )
+
+    bump_versions([USAGE_SCOPE])
+    return updated
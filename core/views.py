@@ -1,3 +1,17 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
 
-# Create your views here.
+from .metrics import registry
+
+
+def metrics(request):
+    """
+    Histogramas de latência e de consultas por view, no formato texto do
+    Prometheus. Restrito à equipe (is_staff) e aos ``INTERNAL_IPS``.
+    """
+    internal = request.META.get("REMOTE_ADDR") in settings.INTERNAL_IPS
+    if not internal and not request.user.is_staff:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
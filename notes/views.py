@@ -1,12 +1,75 @@
 from django.views.generic import ListView
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.paginator import Page
+from core.cache import get_notes_cache, note_list_validators, user_cache_key
 from core.models import Note
 
 
 class NoteListView(LoginRequiredMixin, ListView):
+    """
+    Página inicial com as notas do usuário, paginada.
+
+    Cada página resolvida (notas com proprietário e nomes das categorias)
+    fica em cache até a próxima alteração do usuário, e o
+    template guarda o HTML de cada nota em um fragmento próprio, então
+    depois de uma edição só as notas alteradas são renderizadas de novo.
+    Os agregados de ``note_list_validators`` entram na chave, então edições
+    feitas por outro processo também mudam a chave; a contagem deles
+    substitui o COUNT do paginador.
+    """
+
     model = Note
     template_name = "index.html"
     context_object_name = "notes"
+    paginate_by = 24
 
     def get_queryset(self):
-        return Note.objects.filter(owner=self.request.user).order_by("-updated_at")
+        return (
+            Note.objects.filter(owner=self.request.user)
+            .select_related("owner")
+            .prefetch_related("categories")
+            .order_by("-updated_at", "-id")
+        )
+
+    def get_paginator(self, *args, **kwargs):
+        paginator = super().get_paginator(*args, **kwargs)
+        # Evita o COUNT: o total veio dos validadores
+        paginator.count = self.note_count
+        return paginator
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Reaproveita a página em cache; numa falha, pagina normalmente e
+        guarda só os dados necessários para remontá-la.
+        """
+        cache = get_notes_cache()
+        page_number = self.request.GET.get(self.page_kwarg) or 1
+        validators = note_list_validators(self.request.user.pk)
+        self.note_count = validators[0]
+        key = user_cache_key(
+            self.request.user.pk, "note_list", page_number, page_size, *validators
+        )
+
+        cached = cache.get(key)
+        if cached is not None:
+            notes, number = cached
+            paginator = self.get_paginator(
+                queryset,
+                page_size,
+                orphans=self.get_paginate_orphans(),
+                allow_empty_first_page=self.get_allow_empty(),
+            )
+            page = Page(notes, number, paginator)
+            return paginator, page, notes, page.has_other_pages()
+
+        paginator, page, notes, is_paginated = super().paginate_queryset(
+            queryset, page_size
+        )
+        notes = list(notes)
+        for note in notes:
+            # Usado pelo template no lugar de note.categories.all
+            note.category_names = [category.name for category in note.categories.all()]
+            note._prefetched_objects_cache = {}
+        page.object_list = notes
+        cache.set(key, (notes, page.number))
+        return paginator, page, notes, is_paginated
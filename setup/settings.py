@@ -53,6 +53,7 @@ SWAGGER_SETTINGS = {
 
 
 MIDDLEWARE = [
+    "core.middleware.InstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -62,6 +63,24 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Instrumentação (consultas, tempo de banco, serialização e renderização
+# por requisição em Server-Timing e em /metrics/). Desligada por padrão: o
+# middleware se remove da pilha quando NOTES_INSTRUMENTATION é falso.
+NOTES_INSTRUMENTATION = os.environ.get("NOTES_INSTRUMENTATION") == "1"
+
+# Máximo de consultas por requisição, por "MÉTODO nome-da-url" ou só pelo
+# nome da URL; inclui as consultas de sessão e usuário da autenticação.
+# "warn" registra um aviso e "raise" levanta QueryBudgetExceeded.
+NOTES_QUERY_BUDGETS = {
+    "GET note-list": 5,
+    "GET note-detail": 5,
+    "GET category-list": 4,
+    "GET note_list": 5,
+}
+NOTES_QUERY_BUDGET_ACTION = "warn"
+
+INTERNAL_IPS = ["127.0.0.1"]
+
 ROOT_URLCONF = "setup.urls"
 
 TEMPLATES = [
@@ -85,13 +104,71 @@ WSGI_APPLICATION = "setup.wsgi.application"
 
 # Database
 
+# Perfil ajustado para produção: conexões persistentes (verificadas antes
+# de serem reaproveitadas) e transações IMMEDIATE, que pegam o lock de
+# escrita no BEGIN; assim um escritor espera o busy_timeout em vez de
+# falhar com "database is locked" ao tentar promover uma transação de
+# leitura. Sob ASGI, a documentação do Django recomenda desligar as
+# conexões persistentes: use NOTES_CONN_MAX_AGE=0.
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": int(os.environ.get("NOTES_CONN_MAX_AGE", 600)),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "transaction_mode": "IMMEDIATE",
+        },
     }
 }
 
+# Aplicados a cada conexão SQLite aberta (core.db.configure_sqlite). O WAL
+# deixa leitores e o escritor trabalharem ao mesmo tempo; com ele,
+# synchronous=NORMAL só perde as últimas transações numa queda de energia,
+# sem corromper o banco. cache_size negativo é em KiB.
+NOTES_SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -64000,
+    "mmap_size": 256 * 1024 * 1024,
+}
+
+
+# Cache
+
+# "notes" guarda as respostas por usuário (listagens da API e da página
+# inicial) e as versões que as invalidam. O LocMemCache é de cada processo:
+# com mais de um worker, use um backend compartilhado (Redis, Memcached,
+# DatabaseCache ou, num único servidor, FileBasedCache), senão uma edição
+# atendida por um worker não invalida o cache dos outros. O
+# ``manage.py check --deploy`` avisa (core.W001).
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "notes": {
+        "BACKEND": "core.cache.BoundedLocMemCache",
+        "LOCATION": "notes",
+        "TIMEOUT": 300,
+        "OPTIONS": {
+            "MAX_ENTRIES": 5000,
+            "MAX_BYTES": 32 * 1024 * 1024,
+        },
+    },
+    # Fragmentos do template (HTML de cada nota na página inicial)
+    "template_fragments": {
+        "BACKEND": "core.cache.BoundedLocMemCache",
+        "LOCATION": "template_fragments",
+        "OPTIONS": {
+            "MAX_ENTRIES": 20000,
+            "MAX_BYTES": 32 * 1024 * 1024,
+        },
+    },
+}
+
+NOTES_CACHE_ALIAS = "notes"
+
 
 # Password validation
 
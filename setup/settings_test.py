@@ -0,0 +1,26 @@
+"""
+Perfil de configuração da suíte de testes (``pytest.ini``).
+
+Banco SQLite em memória (cada processo do pytest-xdist tem o seu), hash
+de senha rápido e instrumentação ligada, para que os orçamentos de
+consultas do projeto (``NOTES_QUERY_BUDGETS``) falhem os testes que os
+estouram.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+    }
+}
+
+# O PBKDF2 padrão leva centenas de milissegundos por senha, e os testes de
+# autenticação HTTP Basic fazem um hash por requisição
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+NOTES_INSTRUMENTATION = True
+NOTES_QUERY_BUDGET_ACTION = "raise"
@@ -4,6 +4,7 @@ from django.urls import path, include
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
+from core.views import metrics
 from notes.views import NoteListView
 
 schema_view = get_schema_view(
@@ -35,4 +36,5 @@ urlpatterns = [
     ),
     path("redoc/", schema_view.with_ui("redoc", cache_timeout=0), name="schema-redoc"),
     path("admin/", admin.site.urls),
+    path("metrics/", metrics, name="metrics"),
 ]
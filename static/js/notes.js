@@ -35,8 +35,9 @@ function openEditNoteModal(noteId, title, content, categories) {
   document.getElementById('noteTitle').value = title;
   document.getElementById('noteContent').value = content;
 
-  // Preencher as categorias selecionadas
+  // Preencher as categorias selecionadas (mesmo as que não vieram nas sugestões)
   const categorySelect = document.getElementById('categorySelect');
+  categories.forEach(name => addCategoryOption(name));
   Array.from(categorySelect.options).forEach(option => {
     option.selected = categories.includes(option.value);
   });
@@ -111,9 +112,21 @@ function deleteNote(id) {
     });
 }
 
-// Listagem das categorias no dropdown
-document.addEventListener('DOMContentLoaded', function() {
-  fetch('/api/categories/')
+// Adiciona uma categoria ao dropdown, se ainda não estiver lá
+function addCategoryOption(name) {
+  const categorySelect = document.getElementById('categorySelect');
+  if (Array.from(categorySelect.options).some(option => option.value === name)) {
+    return;
+  }
+  const option = document.createElement('option');
+  option.value = name;
+  option.textContent = name;
+  categorySelect.appendChild(option);
+}
+
+// Sugestões de categorias pelo prefixo digitado, mantendo as já selecionadas
+function loadCategorySuggestions(query) {
+  fetch(`/api/categories/autocomplete/?q=${encodeURIComponent(query)}`)
     .then(response => {
       if (!response.ok) {
         throw new Error('Erro ao carregar categorias');
@@ -122,15 +135,60 @@ document.addEventListener('DOMContentLoaded', function() {
     })
     .then(data => {
       const categorySelect = document.getElementById('categorySelect');
-      data.forEach(category => {
-        const option = document.createElement('option');
-        option.value = category.name;
-        option.textContent = category.name;
-        categorySelect.appendChild(option);
-      });
+      Array.from(categorySelect.options)
+        .filter(option => !option.selected)
+        .forEach(option => option.remove());
+      data.forEach(category => addCategoryOption(category.name));
     })
     .catch(error => {
       console.error('Erro ao carregar categorias:', error);
     });
+}
+
+// Carrega as categorias mais usadas e busca outras conforme a digitação
+document.addEventListener('DOMContentLoaded', function() {
+  loadCategorySuggestions('');
+
+  let searchTimeout = null;
+  document.getElementById('categorySearch').addEventListener('input', function(event) {
+    clearTimeout(searchTimeout);
+    searchTimeout = setTimeout(() => loadCategorySuggestions(event.target.value), 200);
+  });
+
+  // Enter na busca seleciona o texto digitado como categoria (nova ou existente)
+  document.getElementById('categorySearch').addEventListener('keydown', function(event) {
+    if (event.key !== 'Enter') {
+      return;
+    }
+    event.preventDefault();
+    const name = event.target.value.trim().toLowerCase().split(/\s+/).join(' ');
+    if (name) {
+      addCategoryOption(name);
+      const option = Array.from(document.getElementById('categorySelect').options)
+        .find(option => option.value === name);
+      option.selected = true;
+      event.target.value = '';
+    }
+  });
 });
 
+// Atualizações ao vivo: recarrega a página quando notas do usuário são
+// alteradas em outro dispositivo (só quando o modal não está aberto)
+document.addEventListener('DOMContentLoaded', function() {
+  if (!window.EventSource || !document.getElementById('notesList')) {
+    return;
+  }
+  const events = new EventSource('/api/async/notes/events/');
+  let reloadTimeout = null;
+  const scheduleReload = () => {
+    clearTimeout(reloadTimeout);
+    reloadTimeout = setTimeout(() => {
+      if (document.getElementById('noteModal').classList.contains('hidden')) {
+        window.location.reload();
+      }
+    }, 500);
+  };
+  ['note.created', 'note.updated', 'note.deleted', 'resync'].forEach(name => {
+    events.addEventListener(name, scheduleReload);
+  });
+});
@@ -0,0 +1,33 @@
+import pytest
+from django.core.cache import caches
+from django.db import transaction
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Limpa os caches em memória para que um teste não veja dados de outro."""
+    for cache in caches.all():
+        cache.clear()
+    yield
+
+
+@pytest.fixture(scope="class")
+def class_db(django_db_setup, django_db_blocker):
+    """
+    Transação aberta durante toda a classe de testes, como o
+    ``setUpTestData`` do Django: dados criados em fixtures com
+    ``scope="class"`` que dependem desta são gravados uma vez e desfeitos
+    no fim da classe, e cada teste (``django_db``) roda num savepoint
+    dentro dela, então as alterações de um teste não vazam para o próximo.
+
+    Não serve para classes com ``django_db(transaction=True)``, que
+    esvaziam as tabelas ao fim de cada teste.
+    """
+    with django_db_blocker.unblock():
+        atomic = transaction.atomic()
+        atomic.__enter__()
+        try:
+            yield
+        finally:
+            transaction.set_rollback(True)
+            atomic.__exit__(None, None, None)
@@ -1,25 +1,51 @@
+import random
+
 import factory
+from django.db import transaction
 from factory.django import DjangoModelFactory
 from core.models import Note, Category
+from core.signals import notes_bulk_saved
+from core.usage import apply_usage_changes
 from django.contrib.auth.models import User
 
 
-class UserFactory(DjangoModelFactory):
+class BulkFactoryMixin:
+    """
+    Modo em lote: monta as instâncias em memória com a estratégia ``build``
+    e grava todas com um bulk_create, em vez de um INSERT por objeto.
+    Campos únicos recebem valores de uma sequência (``_bulk_unique``), já
+    que os valores aleatórios do Faker podem se repetir num lote grande.
+    """
+
+    _bulk_unique = {}
+
+    @classmethod
+    def create_bulk(cls, size, batch_size=1000, **kwargs):
+        kwargs = {**cls._bulk_unique, **kwargs}
+        objs = cls.build_batch(size, **kwargs)
+        return cls._meta.model.objects.bulk_create(objs, batch_size=batch_size)
+
+
+class UserFactory(BulkFactoryMixin, DjangoModelFactory):
     class Meta:
         model = User
 
     username = factory.Faker("user_name")
     email = factory.Faker("email")
 
+    _bulk_unique = {"username": factory.Sequence(lambda n: f"bulk-user-{n}")}
+
 
-class CategoryFactory(DjangoModelFactory):
+class CategoryFactory(BulkFactoryMixin, DjangoModelFactory):
     class Meta:
         model = Category
 
-    name = factory.Faker("word")
+    # Sequência, e não Faker("word"): o nome é único e palavras sorteadas
+    # se repetem mesmo em lotes pequenos
+    name = factory.Sequence(lambda n: f"category #{n}")
 
 
-class NoteFactory(DjangoModelFactory):
+class NoteFactory(BulkFactoryMixin, DjangoModelFactory):
     class Meta:
         model = Note
         skip_postgeneration_save = True
@@ -41,3 +67,58 @@ class NoteFactory(DjangoModelFactory):
         if extracted:  # Se categorias forem passadas, as adiciona
             for category in extracted:
                 self.categories.add(category)
+
+    @classmethod
+    def create_bulk(
+        cls,
+        size,
+        owner=None,
+        owners=5,
+        categories=None,
+        categories_per_note=0,
+        category_pool=10,
+        batch_size=1000,
+        seed=None,
+        **kwargs,
+    ):
+        """
+        Cria ``size`` notas com poucas consultas: os donos vêm de ``owner``
+        ou de um conjunto de ``owners`` usuários (uma lista ou a quantidade
+        a criar), distribuídos em rodízio, e cada nota recebe todas as
+        ``categories`` informadas ou ``categories_per_note`` categorias
+        sorteadas de um conjunto de ``category_pool`` categorias. Notas,
+        usuários e a tabela intermediária são gravados com bulk_create, e
+        o índice de busca e os contadores de uso são atualizados em lote.
+        """
+        if owner is not None:
+            owners = [owner]
+        elif isinstance(owners, int):
+            owners = UserFactory.create_bulk(owners, batch_size=batch_size)
+
+        pool = None
+        if categories is None and categories_per_note:
+            pool = CategoryFactory.create_bulk(category_pool, batch_size=batch_size)
+        rng = random.Random(seed)
+
+        notes = [
+            cls.build(owner=owners[i % len(owners)], **kwargs) for i in range(size)
+        ]
+        Through = Note.categories.through
+        with transaction.atomic():
+            Note.objects.bulk_create(notes, batch_size=batch_size)
+            rows = []
+            for note in notes:
+                chosen = categories
+                if pool is not None:
+                    chosen = rng.sample(pool, min(categories_per_note, len(pool)))
+                rows += [
+                    Through(note_id=note.pk, category_id=category.pk)
+                    for category in chosen or ()
+                ]
+            Through.objects.bulk_create(rows, batch_size=batch_size)
+            owner_by_note = {note.pk: note.owner_id for note in notes}
+            apply_usage_changes(
+                added=[(owner_by_note[row.note_id], row.category_id) for row in rows]
+            )
+            notes_bulk_saved.send(sender=Note, notes=notes, created=True)
+        return notes
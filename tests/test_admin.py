@@ -0,0 +1,155 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.services import duplicate_notes
+from core.models import CategoryUsage, Note
+from .factories import CategoryFactory, UserFactory
+
+
+@pytest.mark.django_db
+class TestAdminChangelist:
+    @pytest.fixture
+    def superuser(self):
+        """Fixture para criar um superusuário."""
+        return UserFactory(is_staff=True, is_superuser=True)
+
+    @pytest.fixture
+    def admin_client(self, client, superuser):
+        """Fixture para um cliente logado no admin."""
+        client.force_login(superuser)
+        return client
+
+    def _create_notes(self, count):
+        start = Note.objects.count()
+        categories = [CategoryFactory(name=f"category {start}-{i}") for i in range(2)]
+        Through = Note.categories.through
+        for i in range(start, start + count):
+            owner = UserFactory(username=f"owner{i}")
+            note = Note.objects.create(title="Note", content="...", owner=owner)
+            Through.objects.bulk_create(
+                Through(note_id=note.id, category_id=category.id)
+                for category in categories
+            )
+
+    def _count_queries(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        return len(context.captured_queries)
+
+    @pytest.mark.parametrize(
+        "url_name", ["admin:core_note_changelist", "admin:core_category_changelist"]
+    )
+    def test_changelist_queries_do_not_grow_with_rows(self, admin_client, url_name):
+        """A listagem do admin não faz consultas por linha."""
+        self._create_notes(3)
+        few = self._count_queries(admin_client, reverse(url_name))
+        self._create_notes(20)
+        many = self._count_queries(admin_client, reverse(url_name))
+        assert many == few
+
+    def test_category_note_count_is_sortable(self, admin_client):
+        """A contagem de notas por categoria vem do contador e é ordenável."""
+        busy, idle = CategoryFactory(name="busy"), CategoryFactory(name="idle")
+        note = Note.objects.create(title="Note", content="...", owner=UserFactory())
+        note.categories.add(busy)
+
+        response = admin_client.get(
+            reverse("admin:core_category_changelist"), {"o": "-2"}
+        )
+        names = [category.name for category in response.context["cl"].result_list]
+        assert names == ["busy", "idle"]
+        assert response.context["cl"].result_list[0].usage_count == 1
+
+    def test_owner_filter_by_username(self, admin_client):
+        """O filtro de proprietário recebe o nome de usuário digitado."""
+        alice = UserFactory(username="alice")
+        Note.objects.create(title="Alice", content="...", owner=alice)
+        Note.objects.create(title="Other", content="...", owner=UserFactory())
+
+        response = admin_client.get(
+            reverse("admin:core_note_changelist"), {"owner": "alice"}
+        )
+        titles = [note.title for note in response.context["cl"].result_list]
+        assert titles == ["Alice"]
+        assert 'name="owner" value="alice"' in response.content.decode()
+
+
+@pytest.mark.django_db
+class TestDuplicateNotes:
+    def test_copies_notes_and_categories_in_constant_queries(
+        self, django_assert_max_num_queries
+    ):
+        """Duplicar muitas notas não gera consultas por nota."""
+        user = UserFactory()
+        categories = CategoryFactory.create_batch(2)
+        notes = Note.objects.bulk_create(
+            Note(title=f"Note {i}", content="...", owner=user) for i in range(50)
+        )
+        Through = Note.categories.through
+        Through.objects.bulk_create(
+            Through(note_id=note.id, category_id=category.id)
+            for note in notes
+            for category in categories
+        )
+
+        with django_assert_max_num_queries(15):
+            copies = duplicate_notes(Note.objects.filter(owner=user).order_by("pk"))
+
+        assert [copy.title for copy in copies[:2]] == [
+            "Cópia de Note 0",
+            "Cópia de Note 1",
+        ]
+        assert Through.objects.filter(note__in=copies).count() == 100
+
+    def test_admin_action(self, client):
+        """A ação do admin duplica as notas selecionadas."""
+        client.force_login(UserFactory(is_staff=True, is_superuser=True))
+        note = Note.objects.create(title="Note", content="...", owner=UserFactory())
+        note.categories.add(CategoryFactory())
+
+        response = client.post(
+            reverse("admin:core_note_changelist"),
+            {"action": "duplicate_note", "_selected_action": [note.pk]},
+            follow=True,
+        )
+
+        assert "1 nota(s) duplicada(s)" in response.content.decode()
+        copy = Note.objects.exclude(pk=note.pk).get()
+        assert copy.owner_id == note.owner_id
+        assert list(copy.categories.all()) == list(note.categories.all())
+
+
+@pytest.mark.django_db
+class TestNoteAdminUsage:
+    def test_owner_change_moves_usage(self, client):
+        """Trocar o dono no admin transfere os contadores de uso por usuário."""
+        client.force_login(UserFactory(is_staff=True, is_superuser=True))
+        old_owner, new_owner = UserFactory(username="old"), UserFactory(username="new")
+        work, home = CategoryFactory(name="work"), CategoryFactory(name="home")
+        note = Note.objects.create(title="Note", content="...", owner=old_owner)
+        note.categories.add(work, home)
+
+        response = client.post(
+            reverse("admin:core_note_change", args=[note.pk]),
+            {
+                "title": "Note",
+                "content": "...",
+                "categories": [work.pk],
+                "owner": new_owner.pk,
+            },
+        )
+
+        assert response.status_code == 302
+        counts = {
+            (owner, category): count
+            for owner, category, count in CategoryUsage.objects.filter(
+                count__gt=0
+            ).values_list("owner__username", "category__name", "count")
+        }
+        assert counts == {("new", "work"): 1}
+        work.refresh_from_db()
+        home.refresh_from_db()
+        assert (work.usage_count, home.usage_count) == (1, 0)
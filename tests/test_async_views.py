@@ -0,0 +1,255 @@
+import base64
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import DatabaseError
+from django.db.models import QuerySet
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Category, Note
+from .factories import CategoryFactory, NoteFactory, UserFactory
+
+
+def basic_auth(username, password):
+    token = base64.b64encode(f"{username}:{password}".encode()).decode()
+    return {"authorization": f"Basic {token}"}
+
+
+def request(client, method, url, **kwargs):
+    """
+    Executa a requisição no AsyncClient e consome o corpo, inclusive
+    respostas em streaming, devolvendo ``(resposta, corpo)``. Cabeçalhos
+    padrão do cliente (``client.auth_headers``) são enviados em toda
+    requisição.
+    """
+    kwargs["headers"] = {
+        **getattr(client, "auth_headers", {}),
+        **kwargs.get("headers", {}),
+    }
+
+    async def run():
+        response = await getattr(client, method)(url, **kwargs)
+        if response.streaming:
+            body = b"".join([chunk async for chunk in response.streaming_content])
+        else:
+            body = response.content
+        return response, body
+
+    return async_to_sync(run)()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncNoteAPI:
+    @pytest.fixture
+    def user(self):
+        """Fixture para criar um usuário com senha conhecida."""
+        user = UserFactory(username="alice")
+        user.set_password("secret")
+        user.save()
+        return user
+
+    @pytest.fixture
+    def async_client(self, user):
+        """Fixture para um AsyncClient autenticado por HTTP Basic."""
+        client = AsyncClient()
+        client.auth_headers = basic_auth("alice", "secret")
+        return client
+
+    @pytest.fixture
+    def sync_client(self, user):
+        """Fixture para o APIClient do caminho síncrono."""
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+        return api_client
+
+    def test_list_matches_sync_api(self, async_client, sync_client, user):
+        """A listagem assíncrona devolve o mesmo JSON da API síncrona."""
+        for note in NoteFactory.create_batch(3, owner=user):
+            note.categories.add(CategoryFactory(name=f"category {note.id}"))
+        NoteFactory()  # de outro usuário
+
+        response, body = request(async_client, "get", reverse("async-note-list"))
+        expected = sync_client.get(reverse("note-list"))
+
+        assert response.status_code == 200
+        assert json.loads(body) == sorted(expected.json(), key=lambda n: n["id"])
+
+    def test_retrieve(self, async_client, user):
+        """Testa o detalhe de uma nota e o 404 para notas de outros usuários."""
+        note = NoteFactory(owner=user, title="Mine")
+        response, body = request(
+            async_client, "get", reverse("async-note-detail", args=[note.id])
+        )
+        assert response.status_code == 200
+        assert json.loads(body)["title"] == "Mine"
+
+        other = NoteFactory()
+        response, _ = request(
+            async_client, "get", reverse("async-note-detail", args=[other.id])
+        )
+        assert response.status_code == 404
+
+    def test_create_with_categories(self, async_client, user):
+        """Testa a criação assíncrona com categorias novas e existentes."""
+        CategoryFactory(name="work")
+        response, body = request(
+            async_client,
+            "post",
+            reverse("async-note-list"),
+            data={"title": "T", "content": "C", "category_names": ["Work", "new"]},
+            content_type="application/json",
+        )
+
+        assert response.status_code == 201
+        data = json.loads(body)
+        assert data["owner"] == "alice"
+        assert [c["name"] for c in data["categories"]] == ["work", "new"]
+        assert Note.objects.get(pk=data["id"]).categories.count() == 2
+
+    def test_create_with_category_ids(self, async_client):
+        """Ids de categorias são resolvidos; um id inexistente devolve 400."""
+        work = CategoryFactory(name="work")
+        response, body = request(
+            async_client,
+            "post",
+            reverse("async-note-list"),
+            data={"title": "T", "content": "C", "category_names": [work.id, "new"]},
+            content_type="application/json",
+        )
+        assert response.status_code == 201
+        assert [c["name"] for c in json.loads(body)["categories"]] == ["work", "new"]
+
+        response, body = request(
+            async_client,
+            "post",
+            reverse("async-note-list"),
+            data={"title": "T", "content": "C", "category_names": [99999]},
+            content_type="application/json",
+        )
+        assert response.status_code == 400
+        assert json.loads(body) == {
+            "category_names": ["Category with id 99999 does not exist."]
+        }
+        assert Note.objects.count() == 1
+
+    def test_create_is_atomic(self, async_client, monkeypatch):
+        """Se a ligação com as categorias falha, a nota também não é gravada."""
+        Through = Note.categories.through
+        bulk_create = QuerySet.bulk_create
+
+        def failing_bulk_create(queryset, objs, *args, **kwargs):
+            if queryset.model is Through:
+                raise DatabaseError("link failed")
+            return bulk_create(queryset, objs, *args, **kwargs)
+
+        monkeypatch.setattr(QuerySet, "bulk_create", failing_bulk_create)
+        with pytest.raises(DatabaseError):
+            request(
+                async_client,
+                "post",
+                reverse("async-note-list"),
+                data={"title": "T", "content": "C", "category_names": ["work"]},
+                content_type="application/json",
+            )
+        assert not Note.objects.exists()
+
+    def test_create_validation_error(self, async_client):
+        """Dados inválidos devolvem 400 com os erros por campo."""
+        response, body = request(
+            async_client,
+            "post",
+            reverse("async-note-list"),
+            data={"content": "C"},
+            content_type="application/json",
+        )
+        assert response.status_code == 400
+        assert "title" in json.loads(body)
+
+    def test_requires_authentication(self, user):
+        """Sem credenciais (ou com credenciais erradas) a resposta é 401."""
+        response, _ = request(AsyncClient(), "get", reverse("async-note-list"))
+        assert response.status_code == 401
+
+        response, _ = request(
+            AsyncClient(),
+            "get",
+            reverse("async-note-list"),
+            headers=basic_auth("alice", "wrong"),
+        )
+        assert response.status_code == 401
+
+    def test_session_post_requires_csrf(self, user):
+        """Com sessão, POST sem token CSRF é recusado como no DRF."""
+        client = AsyncClient(enforce_csrf_checks=True)
+        client.force_login(user)
+        response, _ = request(
+            client,
+            "post",
+            reverse("async-note-list"),
+            data={"title": "T", "content": "C"},
+            content_type="application/json",
+        )
+        assert response.status_code == 403
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncCategoryAPI:
+    @pytest.fixture
+    def async_client(self):
+        """Fixture para um AsyncClient com sessão."""
+        client = AsyncClient()
+        client.force_login(UserFactory())
+        return client
+
+    def test_list_and_create(self, async_client):
+        """Testa a listagem e a criação assíncronas de categorias."""
+        CategoryFactory(name="work")
+        response, body = request(
+            async_client,
+            "post",
+            reverse("async-category-list"),
+            data={"name": "home"},
+            content_type="application/json",
+        )
+        assert response.status_code == 201
+
+        response, body = request(async_client, "get", reverse("async-category-list"))
+        assert [c["name"] for c in json.loads(body)] == ["work", "home"]
+
+    def test_duplicate_name(self, async_client):
+        """Nome repetido devolve 400, como no CategorySerializer."""
+        CategoryFactory(name="work")
+        response, body = request(
+            async_client,
+            "post",
+            reverse("async-category-list"),
+            data={"name": "work"},
+            content_type="application/json",
+        )
+        assert response.status_code == 400
+        assert Category.objects.count() == 1
+
+    def test_duplicate_name_created_concurrently(self, async_client, monkeypatch):
+        """
+        Se outra requisição cria o nome entre a verificação e o INSERT, a
+        resposta é o mesmo 400, e não um erro 500.
+        """
+        CategoryFactory(name="work")
+
+        async def aexists(queryset):
+            return False
+
+        monkeypatch.setattr(QuerySet, "aexists", aexists)
+        response, body = request(
+            async_client,
+            "post",
+            reverse("async-category-list"),
+            data={"name": "work"},
+            content_type="application/json",
+        )
+        assert response.status_code == 400
+        assert json.loads(body) == {"name": ["category with this name already exists."]}
+        assert Category.objects.count() == 1
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from core.models import Category, CategoryUsage, Note
+from core.seeding import DatasetSeeder
+
+
+@pytest.mark.django_db
+class TestDatasetSeeder:
+    def test_seeds_in_bulk_with_skewed_owners(self, django_assert_max_num_queries):
+        """Testa que a geração em lote não faz consultas por nota."""
+        with django_assert_max_num_queries(40):
+            report = DatasetSeeder(1000, users=10, categories=20, batch_size=500).run()
+
+        assert Note.objects.count() == report["notes"] == 1000
+        counts = [Note.objects.filter(owner_id=pk).count() for pk in report["users"]]
+        # Zipf: o primeiro usuário concentra bem mais notas que o último
+        assert counts[0] > 3 * counts[-1]
+        assert Note.categories.through.objects.count() == report["links"]
+
+    def test_usage_counters_match_links(self):
+        """Testa que os contadores de uso são recalculados no final."""
+        report = DatasetSeeder(300, users=3, categories=10, seed=1).run()
+
+        total = sum(Category.objects.values_list("usage_count", flat=True))
+        assert total == report["links"]
+        assert sum(CategoryUsage.objects.values_list("count", flat=True)) == total
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+def test_bench_notes_command(tmp_path):
+    """Roda a suíte de benchmark num conjunto pequeno e confere o JSON."""
+    output = tmp_path / "bench.json"
+    call_command(
+        "bench_notes", notes=500, repeat=2, current_db=True, output=str(output)
+    )
+
+    report = json.loads(output.read_text())
+    assert report["dataset"]["notes"] == 500
+    for name, result in report["results"].items():
+        assert result["status"] in (200, 201), name
+        assert result["median_ms"] > 0
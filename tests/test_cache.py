@@ -0,0 +1,190 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import SystemCheckError
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.cache import BoundedLocMemCache, get_user_version
+from core.checks import check_shared_notes_cache
+from core.models import Note
+from .factories import CategoryFactory, NoteFactory, UserFactory
+
+
+class TestBoundedLocMemCache:
+    def make_cache(self, **options):
+        cache = BoundedLocMemCache(
+            f"test-{id(options)}", {"OPTIONS": {"MAX_ENTRIES": 100, **options}}
+        )
+        cache.clear()
+        return cache
+
+    def test_evicts_least_recently_used_when_over_bytes(self):
+        """Passar do limite de bytes remove as entradas menos usadas."""
+        cache = self.make_cache(MAX_BYTES=2500)
+        cache.set("a", "x" * 1000)
+        cache.set("b", "x" * 1000)
+        cache.get("a")  # "a" passa a ser a mais recente
+        cache.set("c", "x" * 1000)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.current_bytes <= 2500
+
+    def test_max_entries_evicts_one_entry_at_a_time(self):
+        """Ao atingir MAX_ENTRIES só a entrada mais antiga é descartada."""
+        cache = self.make_cache(MAX_ENTRIES=3)
+        for key in "abcd":
+            cache.set(key, 1)
+        assert [cache.get(key) for key in "abcd"] == [None, 1, 1, 1]
+
+    def test_delete_releases_bytes(self):
+        """Excluir uma entrada libera o espaço contabilizado."""
+        cache = self.make_cache(MAX_BYTES=10_000)
+        cache.set("a", "x" * 1000)
+        cache.delete("a")
+        assert cache.current_bytes == 0
+
+
+@pytest.mark.django_db
+class TestUserResponseCache:
+    @pytest.fixture
+    def user(self):
+        """Fixture para criar um usuário autenticado."""
+        return UserFactory()
+
+    @pytest.fixture
+    def api_client(self, user):
+        """Fixture para criar um APIClient autenticado."""
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+        return api_client
+
+    def test_second_list_is_served_from_cache(
+        self, api_client, user, django_assert_num_queries
+    ):
+        """A segunda listagem só faz a consulta agregada dos validadores (ETag)."""
+        NoteFactory.create_batch(2, owner=user)
+        first = api_client.get(reverse("note-list"))
+        with django_assert_num_queries(1):
+            second = api_client.get(reverse("note-list"))
+        assert second.data == first.data
+
+    def test_saving_a_note_invalidates_the_list(self, api_client, user):
+        """Editar uma nota faz a próxima listagem refletir a alteração."""
+        note = NoteFactory(owner=user)
+        api_client.get(reverse("note-list"))
+        note.title = "Changed"
+        note.save()
+        response = api_client.get(reverse("note-list"))
+        assert response.data[0]["title"] == "Changed"
+
+    def test_category_changes_invalidate_the_list(self, api_client, user):
+        """Adicionar ou renomear categorias invalida o cache dos donos das notas."""
+        note = NoteFactory(owner=user)
+        category = CategoryFactory(name="old")
+        api_client.get(reverse("note-list"))
+
+        note.categories.add(category)
+        response = api_client.get(reverse("note-list"))
+        assert response.data[0]["categories"][0]["name"] == "old"
+
+        category.name = "new"
+        category.save()
+        response = api_client.get(reverse("note-list"))
+        assert response.data[0]["categories"][0]["name"] == "new"
+
+    def test_edit_from_another_process_changes_the_key(self, api_client, user):
+        """
+        Uma edição que não avançou a versão vista por este processo (como
+        uma feita por outro worker) ainda muda a chave pelos agregados do ETag.
+        """
+        note, other = NoteFactory.create_batch(2, owner=user)
+        first = api_client.get(reverse("note-list"))
+
+        # update() não dispara sinais: a versão do usuário fica igual
+        Note.objects.filter(pk=note.pk).update(
+            title="Changed elsewhere", updated_at=timezone.now()
+        )
+        response = api_client.get(reverse("note-list"))
+        assert "Changed elsewhere" in {item["title"] for item in response.data}
+        assert response["ETag"] != first["ETag"]
+
+        Note.objects.filter(pk=other.pk)._raw_delete(connection.alias)
+        response = api_client.get(reverse("note-list"))
+        assert [item["id"] for item in response.data] == [note.pk]
+
+    def test_versions_are_per_user(self, user):
+        """Alterar notas de um usuário não muda a versão de outro."""
+        other = UserFactory()
+        other_version = get_user_version(other.pk)
+        NoteFactory(owner=user)
+        assert get_user_version(other.pk) == other_version
+
+    def test_html_list_is_cached_and_invalidated(self, client, user):
+        """A página inicial reaproveita a lista em cache até a próxima alteração."""
+        client.force_login(user)
+        note = NoteFactory(owner=user, title="Before")
+        assert "Before" in client.get(reverse("note_list")).content.decode()
+
+        with CaptureQueriesContext(connection) as context:
+            client.get(reverse("note_list"))
+        # Só a consulta agregada dos validadores lê as notas
+        note_queries = [
+            q["sql"] for q in context.captured_queries if "core_note" in q["sql"]
+        ]
+        assert len(note_queries) == 1 and "MAX(" in note_queries[0]
+
+        note.title = "After"
+        note.save()
+        assert "After" in client.get(reverse("note_list")).content.decode()
+
+    def test_html_list_sees_edits_from_another_process(self, client, user):
+        """
+        Uma edição que não avançou a versão vista por este processo muda a
+        chave da página pelos agregados das notas.
+        """
+        client.force_login(user)
+        note, other = NoteFactory.create_batch(2, owner=user, title="Before")
+        assert "Before" in client.get(reverse("note_list")).content.decode()
+
+        # update() e _raw_delete() não disparam sinais: a versão do usuário
+        # fica igual
+        Note.objects.filter(pk=note.pk).update(
+            title="Edited elsewhere", updated_at=timezone.now()
+        )
+        assert "Edited elsewhere" in client.get(reverse("note_list")).content.decode()
+
+        Note.objects.filter(pk=note.pk)._raw_delete(connection.alias)
+        response = client.get(reverse("note_list"))
+        assert "Edited elsewhere" not in response.content.decode()
+        assert [n.pk for n in response.context["notes"]] == [other.pk]
+
+
+class TestSharedCacheCheck:
+    def test_warns_when_notes_cache_is_per_process(self):
+        """O cache em memória padrão gera o aviso core.W001."""
+        assert [error.id for error in check_shared_notes_cache(None)] == ["core.W001"]
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "notes": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": "/tmp/notes-cache-check",
+            },
+        }
+    )
+    def test_shared_backend_passes(self):
+        """Com um backend compartilhado não há aviso."""
+        assert check_shared_notes_cache(None) == []
+
+    def test_only_reported_by_deploy_checks(self):
+        """O aviso só aparece no check --deploy, não no desenvolvimento."""
+        call_command("check", fail_level="WARNING")
+        with pytest.raises(SystemCheckError):
+            call_command("check", deploy=True, tags=["caches"], fail_level="WARNING")
@@ -0,0 +1,59 @@
+import pytest
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import override_settings
+
+
+@pytest.fixture
+def file_connection(tmp_path, django_db_blocker):
+    """Conexão nova a um banco SQLite em arquivo, fora do banco de testes."""
+    settings_dict = {
+        **connection.settings_dict,
+        "NAME": str(tmp_path / "tuning.sqlite3"),
+        "OPTIONS": {"transaction_mode": "IMMEDIATE"},
+    }
+    wrapper = DatabaseWrapper(settings_dict, alias="tuning")
+    with django_db_blocker.unblock():
+        yield wrapper
+        wrapper.close()
+
+
+def pragma(wrapper, name):
+    return wrapper.connection.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+class TestSQLiteTuning:
+    @override_settings(
+        NOTES_SQLITE_PRAGMAS={
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 1234,
+            "cache_size": -2000,
+        }
+    )
+    def test_pragmas_applied_on_connect(self, file_connection):
+        """Os PRAGMAs configurados são aplicados a cada conexão aberta."""
+        file_connection.ensure_connection()
+        assert pragma(file_connection, "journal_mode") == "wal"
+        assert pragma(file_connection, "synchronous") == 1
+        assert pragma(file_connection, "busy_timeout") == 1234
+        assert pragma(file_connection, "cache_size") == -2000
+
+    @override_settings(NOTES_SQLITE_PRAGMAS={})
+    def test_without_pragmas_keeps_defaults(self, file_connection):
+        """Sem PRAGMAs configurados, o banco fica no modo de journal padrão."""
+        file_connection.ensure_connection()
+        assert pragma(file_connection, "journal_mode") == "delete"
+
+    @override_settings(NOTES_SQLITE_PRAGMAS={"journal_mode; DROP": "WAL"})
+    def test_rejects_invalid_pragma_name(self, file_connection):
+        """Nomes de PRAGMA inválidos são recusados."""
+        with pytest.raises(ValueError):
+            file_connection.ensure_connection()
+
+    @override_settings(NOTES_SQLITE_PRAGMAS={"busy_timeout": 1234})
+    def test_pragmas_are_not_logged_as_queries(self, file_connection):
+        """Os PRAGMAs não entram no log de consultas da conexão."""
+        file_connection.force_debug_cursor = True
+        file_connection.ensure_connection()
+        assert file_connection.queries == []
@@ -0,0 +1,131 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import AsyncClient
+from django.urls import reverse
+
+from api.services import duplicate_notes
+from core.events import RESYNC, InProcessBackend
+from core.models import Note
+from .factories import CategoryFactory, NoteFactory, UserFactory
+
+
+class TestInProcessBackend:
+    def test_publish_reaches_only_channel_subscribers(self):
+        """Eventos chegam apenas aos inscritos no canal."""
+        backend = InProcessBackend()
+
+        async def run():
+            mine = backend.subscribe("a", maxsize=10)
+            other = backend.subscribe("b", maxsize=10)
+            backend.publish("a", {"type": "note.updated", "id": 1})
+            event = await mine.get(timeout=1)
+            assert other.queue.empty()
+            mine.close()
+            other.close()
+            return event
+
+        assert asyncio.run(run()) == {"type": "note.updated", "id": 1, "seq": 1}
+        assert not backend.has_subscribers("a")
+
+    def test_full_queue_is_replaced_by_resync(self):
+        """Com a fila cheia os eventos pendentes viram um único resync."""
+        backend = InProcessBackend()
+
+        async def run():
+            subscription = backend.subscribe("a", maxsize=2)
+            for pk in range(3):
+                backend.publish("a", {"type": "note.updated", "id": pk})
+            await asyncio.sleep(0)
+            events = []
+            while not subscription.queue.empty():
+                events.append(subscription.queue.get_nowait())
+            subscription.close()
+            return events
+
+        assert asyncio.run(run()) == [RESYNC]
+
+
+def read_events(user, action, count):
+    """
+    Abre o stream de eventos do usuário, executa ``action`` (síncrona) e
+    devolve os ``count`` primeiros eventos recebidos depois do ``ready``.
+    """
+
+    async def run():
+        client = AsyncClient()
+        await client.aforce_login(user)
+        response = await client.get(reverse("async-note-events"))
+        assert response["Content-Type"] == "text/event-stream"
+        stream = response.streaming_content.__aiter__()
+        assert b"event: ready" in await anext(stream)
+
+        await sync_to_async(action)()
+        events = []
+        for _ in range(count):
+            chunk = (await asyncio.wait_for(anext(stream), 2)).decode()
+            fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+            events.append((fields["event"], json.loads(fields["data"])))
+        await stream.aclose()
+        return events
+
+    return async_to_sync(run)()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestNoteEventStream:
+    @pytest.fixture
+    def user(self):
+        """Fixture para criar um usuário."""
+        return UserFactory()
+
+    def test_create_update_delete(self, user):
+        """Criar, editar e excluir uma nota gera um evento cada."""
+
+        def action():
+            NoteFactory(owner=UserFactory())  # de outro usuário: não aparece
+            note = NoteFactory(owner=user)
+            note.title = "Changed"
+            note.save()
+            note.delete()
+
+        events = read_events(user, action, 3)
+        assert [name for name, _ in events] == [
+            "note.created",
+            "note.updated",
+            "note.deleted",
+        ]
+        assert len({data["id"] for _, data in events}) == 1
+
+    def test_category_changes(self, user):
+        """Alterar as categorias pelos dois lados da relação gera eventos."""
+        note = NoteFactory(owner=user)
+        category = CategoryFactory(name="work")
+
+        def action():
+            note.categories.add(category)
+            category.notes.remove(note)
+
+        events = read_events(user, action, 2)
+        assert events == [
+            ("note.updated", {"id": note.id}),
+            ("note.updated", {"id": note.id}),
+        ]
+
+    def test_bulk_create(self, user):
+        """Notas criadas em lote geram eventos note.created."""
+
+        def action():
+            duplicate_notes(Note.objects.filter(owner=user))
+
+        NoteFactory(owner=user)
+        events = read_events(user, action, 1)
+        assert events[0][0] == "note.created"
+
+    def test_requires_asgi(self, client, user):
+        """Sob WSGI o stream infinito é recusado."""
+        client.force_login(user)
+        response = client.get(reverse("async-note-events"))
+        assert response.status_code == 501
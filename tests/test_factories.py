@@ -0,0 +1,44 @@
+import pytest
+
+from core.models import Category, Note
+from core.search import filter_notes
+from .factories import CategoryFactory, NoteFactory, UserFactory
+
+
+@pytest.mark.django_db
+class TestBulkFactories:
+    def test_create_bulk_uses_few_queries(self, django_assert_max_num_queries):
+        """Testa que mil notas com categorias não geram consultas por nota."""
+        # Os contadores de uso custam uma consulta por incremento distinto
+        with django_assert_max_num_queries(100):
+            notes = NoteFactory.create_bulk(1000, categories_per_note=3)
+
+        assert len(notes) == Note.objects.count() == 1000
+        assert all(note.pk for note in notes)
+        assert Note.categories.through.objects.count() == 3000
+        assert Note.objects.values("owner").distinct().count() == 5
+
+    def test_explicit_owner_and_categories(self):
+        """Testa o modo em lote com dono e categorias fixos."""
+        user = UserFactory()
+        categories = CategoryFactory.create_bulk(2)
+        NoteFactory.create_bulk(10, owner=user, categories=categories, title="Fixo")
+
+        assert Note.objects.filter(owner=user, title="Fixo").count() == 10
+        assert Category.objects.get(pk=categories[0].pk).usage_count == 10
+
+    def test_unique_fields_do_not_collide(self):
+        """Testa que usuários e categorias em lote recebem nomes únicos."""
+        users = UserFactory.create_bulk(300)
+        categories = CategoryFactory.create_bulk(300)
+
+        assert len({user.username for user in users}) == 300
+        assert len({category.name for category in categories}) == 300
+
+    def test_bulk_notes_are_searchable(self):
+        """Testa que as notas criadas em lote entram no índice de busca."""
+        user = UserFactory()
+        notes = NoteFactory.create_bulk(5, owner=user, title="Zebra listrada")
+
+        matches = filter_notes(Note.objects.all(), "zebra", owner_id=user.pk)
+        assert set(matches.values_list("id", flat=True)) == {n.pk for n in notes}
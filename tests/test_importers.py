@@ -0,0 +1,159 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from api.importers import NoteImporter, parse_csv, parse_ndjson
+from core.models import Category, Note
+from .factories import CategoryFactory, UserFactory
+
+
+def ndjson(rows):
+    """Converte uma lista de dicionários em linhas NDJSON (bytes)."""
+    return [json.dumps(row).encode() + b"\n" for row in rows]
+
+
+@pytest.mark.django_db
+class TestNoteImporter:
+    def test_imports_in_batches_with_categories(self):
+        """Testa a importação em vários lotes, reaproveitando as categorias."""
+        user = UserFactory()
+        existing = CategoryFactory(name="work")
+        rows = [
+            {"title": f"Note {i}", "content": "...", "category_names": ["Work", "new"]}
+            for i in range(25)
+        ]
+
+        report = NoteImporter(user, batch_size=10).run(parse_ndjson(ndjson(rows)))
+
+        assert report["rows"] == 25
+        assert report["created"] == 25
+        assert report["errors"] == 0
+        assert report["rows_per_sec"] > 0
+        assert Note.objects.filter(owner=user).count() == 25
+        assert Category.objects.count() == 2
+        assert existing.notes.count() == 25
+        assert Category.objects.get(name="new").notes.count() == 25
+
+    def test_invalid_rows_are_skipped_and_reported(self):
+        """Linhas inválidas não impedem a importação das demais."""
+        user = UserFactory()
+        lines = ndjson([{"title": "Ok", "content": "..."}, {"content": "No title"}])
+        lines.append(b"not json\n")
+
+        report = NoteImporter(user).run(parse_ndjson(lines))
+
+        assert report["created"] == 1
+        assert report["errors"] == 2
+        assert [error["line"] for error in report["error_details"]] == [2, 3]
+
+    def test_category_ids_are_resolved(self):
+        """Ids de categorias são resolvidos; linhas com ids inexistentes são puladas."""
+        user = UserFactory()
+        work = CategoryFactory(name="work")
+        rows = [
+            {"title": "A", "content": "...", "category_names": [work.id, "new"]},
+            {"title": "B", "content": "...", "category_names": [99999]},
+        ]
+
+        report = NoteImporter(user).run(parse_ndjson(ndjson(rows)))
+
+        assert report["created"] == 1
+        assert report["error_details"] == [
+            {
+                "line": 2,
+                "errors": {
+                    "category_names": ["Category with id 99999 does not exist."]
+                },
+            }
+        ]
+        note = Note.objects.get(owner=user)
+        assert sorted(note.categories.values_list("name", flat=True)) == [
+            "new",
+            "work",
+        ]
+        assert Category.objects.count() == 2
+
+    def test_progress_is_reported_per_batch(self):
+        """O callback de progresso é chamado a cada lote."""
+        user = UserFactory()
+        rows = [{"title": f"Note {i}", "content": "..."} for i in range(5)]
+        reports = []
+        NoteImporter(user, batch_size=2, progress=reports.append).run(rows)
+        assert [report["rows"] for report in reports] == [2, 4, 5]
+
+    def test_parse_csv_splits_categories(self):
+        """A coluna categories do CSV é dividida por ';'."""
+        lines = [b"title,content,categories\n", b"A,B,x;y\n"]
+        assert list(parse_csv(lines)) == [
+            {"title": "A", "content": "B", "category_names": ["x", "y"]}
+        ]
+
+
+@pytest.mark.django_db
+class TestNoteImportEndpoint:
+    def test_import_ndjson_body(self):
+        """Testa o endpoint de importação com corpo NDJSON."""
+        user = UserFactory()
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+        body = b"".join(
+            ndjson([{"title": "A", "content": "a"}, {"title": "B", "content": "b"}])
+        )
+
+        response = api_client.post(
+            reverse("note-import"), body, content_type="application/x-ndjson"
+        )
+
+        assert response.status_code == 200
+        assert response.data["created"] == 2
+        assert Note.objects.filter(owner=user).count() == 2
+
+    def test_export_output_can_be_imported(self):
+        """O NDJSON da exportação pode ser importado de volta."""
+        user = UserFactory()
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+        api_client.post(
+            reverse("note-list"),
+            {"title": "A", "content": "a", "category_names": ["x"]},
+            format="json",
+        )
+        exported = b"".join(
+            api_client.get(
+                reverse("note-export"), {"format": "ndjson"}
+            ).streaming_content
+        )
+
+        response = api_client.post(
+            reverse("note-import"), exported, content_type="application/x-ndjson"
+        )
+
+        assert response.data["created"] == 1
+        assert Note.objects.filter(categories__name="x").count() == 2
+
+    def test_unsupported_content_type(self):
+        """Um tipo de conteúdo desconhecido resulta em 415."""
+        api_client = APIClient()
+        api_client.force_authenticate(user=UserFactory())
+        response = api_client.post(
+            reverse("note-import"), b"<xml/>", content_type="application/xml"
+        )
+        assert response.status_code == 415
+
+
+@pytest.mark.django_db
+def test_import_notes_command(tmp_path):
+    """Testa o comando import_notes com um arquivo CSV."""
+    user = UserFactory(username="importer")
+    path = tmp_path / "notes.csv"
+    path.write_text("title,content,categories\nA,a,x\nB,b,x;y\n")
+    out = io.StringIO()
+
+    call_command("import_notes", str(path), user="importer", stdout=out)
+
+    assert Note.objects.filter(owner=user).count() == 2
+    assert "2 nota(s) importada(s)" in out.getvalue()
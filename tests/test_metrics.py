@@ -0,0 +1,149 @@
+import logging
+
+import pytest
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.metrics import QueryBudgetExceeded, registry
+from .factories import CategoryFactory, NoteFactory, UserFactory
+from .test_async_views import basic_auth, request
+
+
+@pytest.fixture
+def instrumentation(settings):
+    """Zera os histogramas (a instrumentação já vem ligada em settings_test)."""
+    registry.reset()
+    yield settings
+    registry.reset()
+
+
+@pytest.fixture
+def user():
+    """Fixture para criar um usuário com algumas notas."""
+    user = UserFactory()
+    for i, note in enumerate(NoteFactory.create_batch(3, owner=user)):
+        note.categories.add(CategoryFactory(name=f"metrics {i}"))
+    return user
+
+
+@pytest.fixture
+def api_client(user):
+    """Fixture para um APIClient autenticado."""
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def server_timing(response):
+    entries = {}
+    for entry in response["Server-Timing"].split(", "):
+        name, *params = entry.split(";")
+        entries[name] = dict(param.split("=", 1) for param in params)
+    return entries
+
+
+@pytest.mark.django_db
+class TestInstrumentationMiddleware:
+    def test_disabled_by_default(self, settings, api_client):
+        """Testa que sem a configuração o middleware não é carregado."""
+        settings.NOTES_INSTRUMENTATION = False
+        response = api_client.get(reverse("note-list"))
+        assert "Server-Timing" not in response
+
+    def test_server_timing_header(self, instrumentation, api_client):
+        """Testa as medidas de consultas, serialização e renderização."""
+        response = api_client.get(reverse("note-list"))
+
+        timing = server_timing(response)
+        # Validadores do ETag, notas e categorias
+        assert timing["db"]["desc"] == '"3 queries"'
+        assert {"db", "serialize", "render", "total"} <= timing.keys()
+        assert float(timing["total"]["dur"]) >= float(timing["db"]["dur"])
+
+    def test_detail_uses_drf_serializer_timing(self, instrumentation, api_client, user):
+        """Testa a medida da serialização pelo NoteSerializer."""
+        note = NoteFactory(owner=user)
+        response = api_client.get(reverse("note-detail", kwargs={"pk": note.pk}))
+
+        assert response.status_code == 200
+        assert "serialize" in server_timing(response)
+
+    def test_histogram_endpoint(self, instrumentation, api_client, client):
+        """Testa que /metrics/ expõe os histogramas por view."""
+        api_client.get(reverse("note-list"))
+        api_client.get(reverse("note-list"))
+
+        response = client.get(reverse("metrics"))
+        text = response.content.decode()
+        labels = 'view="note-list",method="GET"'
+        assert response.status_code == 200
+        assert f'notes_requests_total{{{labels},status="2xx"}} 2' in text
+        # A segunda listagem vem do cache: só a consulta dos validadores
+        assert f'notes_request_queries_bucket{{{labels},le="0"}} 0' in text
+        assert f'notes_request_queries_bucket{{{labels},le="1"}} 1' in text
+        assert f'notes_request_queries_bucket{{{labels},le="3"}} 2' in text
+        assert f"notes_request_duration_seconds_count{{{labels}}} 2" in text
+
+    def test_histogram_endpoint_requires_staff(self, instrumentation, client, user):
+        """Testa que fora dos INTERNAL_IPS só a equipe vê as métricas."""
+        client.force_login(user)
+        response = client.get(reverse("metrics"), REMOTE_ADDR="10.0.0.1")
+        assert response.status_code == 403
+
+        user.is_staff = True
+        user.save()
+        response = client.get(reverse("metrics"), REMOTE_ADDR="10.0.0.1")
+        assert response.status_code == 200
+
+    def test_query_budget_raises(self, instrumentation, api_client):
+        """Testa que um orçamento estourado falha o teste com "raise"."""
+        instrumentation.NOTES_QUERY_BUDGETS = {"GET note-list": 2}
+        instrumentation.NOTES_QUERY_BUDGET_ACTION = "raise"
+
+        with pytest.raises(QueryBudgetExceeded, match="ran 3 queries; budget is 2"):
+            api_client.get(reverse("note-list"))
+
+    def test_query_budget_warns(self, instrumentation, api_client, caplog):
+        """Testa que com "warn" o orçamento estourado só gera um aviso."""
+        instrumentation.NOTES_QUERY_BUDGETS = {"note-list": 1}
+        instrumentation.NOTES_QUERY_BUDGET_ACTION = "warn"
+
+        with caplog.at_level(logging.WARNING, logger="core.middleware"):
+            response = api_client.get(reverse("note-list"))
+
+        assert response.status_code == 200
+        assert "budget is 1" in caplog.text
+
+    def test_within_project_budgets(self, instrumentation, api_client, client, user):
+        """
+        Testa as páginas com orçamento nos orçamentos reais do projeto, que
+        com "raise" (settings_test) falhariam o teste se estourados.
+        """
+        assert instrumentation.NOTES_QUERY_BUDGETS["GET note-list"]
+        assert instrumentation.NOTES_QUERY_BUDGET_ACTION == "raise"
+        note = user.note_set.first()
+        client.force_login(user)
+
+        assert api_client.get(reverse("note-list")).status_code == 200
+        detail = reverse("note-detail", kwargs={"pk": note.pk})
+        assert api_client.get(detail).status_code == 200
+        assert api_client.get(reverse("category-list")).status_code == 200
+        assert client.get(reverse("note_list")).status_code == 200
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncInstrumentation:
+    def test_counts_queries_of_async_views(self, instrumentation):
+        """Testa que consultas do ORM assíncrono também são contadas."""
+        user = UserFactory(username="alice")
+        user.set_password("secret")
+        user.save()
+        NoteFactory.create_batch(2, owner=user)
+        client = AsyncClient()
+        client.auth_headers = basic_auth("alice", "secret")
+
+        response, _ = request(client, "get", reverse("async-note-list"))
+
+        timing = server_timing(response)
+        assert int(timing["db"]["desc"].strip('"').split()[0]) >= 1
@@ -1,5 +1,5 @@
 import pytest
-from core.models import Note, Category
+from core.models import Note, Category, NoteTombstone
 from .factories import UserFactory, CategoryFactory, NoteFactory
 
 
@@ -77,3 +77,43 @@ class TestCategoryModel:
         """Testa o método __str__ do modelo Category."""
         category = CategoryFactory(name="Test Category")
         assert str(category) == "Test Category"
+
+
+@pytest.mark.django_db
+class TestNoteTombstone:
+    def test_delete_records_tombstone(self):
+        """Excluir uma nota registra o id e o proprietário para a sincronização."""
+        note = NoteFactory()
+        note_id, owner_id = note.id, note.owner_id
+        note.delete()
+        tombstone = NoteTombstone.objects.get()
+        assert (tombstone.note_id, tombstone.owner_id) == (note_id, owner_id)
+
+    def test_deleting_owner_cascades_without_error(self):
+        """Excluir o usuário apaga as notas em cascata sem violar chaves estrangeiras."""
+        note = NoteFactory()
+        note.owner.delete()
+        assert Note.objects.count() == 0
+        assert NoteTombstone.objects.filter(note_id=note.id).exists()
+
+
+@pytest.mark.django_db
+class TestClassScopedData:
+    @pytest.fixture(scope="class")
+    @classmethod
+    def note(cls, class_db):
+        return NoteFactory(title="Compartilhada")
+
+    def test_changes_are_rolled_back(self, note):
+        """Alterações feitas por um teste não ficam visíveis no próximo."""
+        assert Note.objects.get(pk=note.pk).title == "Compartilhada"
+        Note.objects.filter(pk=note.pk).update(title="Alterada")
+        NoteFactory(owner=note.owner)
+        assert Note.objects.count() == 2
+
+    def test_deletes_are_rolled_back(self, note):
+        """Os dados da classe continuam lá depois de um teste excluí-los."""
+        assert Note.objects.get(pk=note.pk).title == "Compartilhada"
+        assert Note.objects.count() == 1
+        Note.objects.all().delete()
+        assert Note.objects.count() == 0
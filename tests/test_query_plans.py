@@ -0,0 +1,65 @@
+import pytest
+from django.db import connection
+from django.utils import timezone
+
+from core.models import Category, Note
+from core.search import categories_by_prefix
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != "sqlite", reason="Usa EXPLAIN QUERY PLAN do SQLite."
+    ),
+]
+
+
+def query_plan(queryset):
+    """Retorna as linhas de detalhe do EXPLAIN QUERY PLAN do queryset."""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def assert_uses_index(plan, index_name):
+    """Garante que o plano usa o índice e não precisa ordenar em memória."""
+    assert any(index_name in step for step in plan), plan
+    assert not any(step.startswith("SCAN") for step in plan), plan
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+def test_notes_by_owner_ordered_by_updated_at():
+    """A listagem do usuário por updated_at usa o índice composto."""
+    plan = query_plan(Note.objects.filter(owner_id=1).order_by("-updated_at"))
+    assert_uses_index(plan, "core_note_owner_updated_idx")
+
+
+def test_cursor_page_seek():
+    """A página seguinte da paginação por cursor é uma busca por faixa no índice."""
+    queryset = Note.objects.filter(owner_id=1, updated_at__lte=timezone.now()).order_by(
+        "-updated_at", "-id"
+    )
+    assert_uses_index(query_plan(queryset), "core_note_owner_updated_idx")
+
+
+def test_notes_by_owner_ordered_by_created_at():
+    """A listagem do usuário por created_at usa o índice composto."""
+    plan = query_plan(Note.objects.filter(owner_id=1).order_by("created_at"))
+    assert_uses_index(plan, "core_note_owner_created_idx")
+
+
+def test_notes_by_category_uses_covering_index():
+    """Buscar as notas de uma categoria usa o índice de cobertura da tabela intermediária."""
+    category = Category(id=1)
+    plan = query_plan(category.notes.values("id"))
+    assert_uses_index(plan, "COVERING INDEX core_note_categories_cat_note_idx")
+
+
+def test_category_prefix_uses_name_index():
+    """O autocomplete de categorias é uma busca por faixa no índice de nome."""
+    plan = query_plan(categories_by_prefix("wo"))
+    assert any(
+        step.startswith("SEARCH core_category USING INDEX") and "name>" in step
+        for step in plan
+    ), plan
+    assert not any(step.startswith("SCAN") for step in plan), plan
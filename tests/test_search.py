@@ -0,0 +1,159 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Note
+from core.search import SQLiteFTSBackend, TermIndexBackend, get_backend, tokenize
+from .factories import NoteFactory, UserFactory
+
+
+def test_tokenize_strips_case_and_accents():
+    """Testa que a tokenização ignora maiúsculas, acentos e pontuação."""
+    assert tokenize("Reunião às 10h, PLANEJAMENTO!") == [
+        "reuniao",
+        "as",
+        "10h",
+        "planejamento",
+    ]
+
+
+def ranked_ids(backend, query, owner_id):
+    """Ids das notas encontradas pelo backend, da mais relevante à menos."""
+    queryset = backend.filter_queryset(Note.objects.all(), query, owner_id=owner_id)
+    return list(queryset.order_by("search_rank", "-id").values_list("id", flat=True))
+
+
+@pytest.mark.django_db
+class TestSearchBackends:
+    @pytest.fixture(
+        params=["core.search.SQLiteFTSBackend", "core.search.TermIndexBackend"]
+    )
+    def backend(self, request, settings):
+        """Executa cada teste com os dois backends de busca."""
+        settings.NOTES_SEARCH_BACKEND = request.param
+        return get_backend()
+
+    def test_finds_notes_by_title_and_content(self, backend):
+        """Testa a busca por termos do título e do conteúdo."""
+        user = UserFactory()
+        groceries = NoteFactory(owner=user, title="Lista de compras", content="Leite")
+        meeting = NoteFactory(owner=user, title="Reunião", content="Comprar café")
+        NoteFactory(owner=user, title="Outra", content="Nada a ver")
+
+        assert ranked_ids(backend, "leite", user.id) == [groceries.id]
+        assert ranked_ids(backend, "REUNIAO", user.id) == [meeting.id]
+        assert ranked_ids(backend, "lista compras", user.id) == [groceries.id]
+
+    def test_title_matches_rank_first(self, backend):
+        """Notas com o termo no título aparecem antes das que só o têm no conteúdo."""
+        user = UserFactory()
+        in_content = NoteFactory(owner=user, title="Ideias", content="projeto")
+        in_title = NoteFactory(owner=user, title="Projeto", content="ideias")
+
+        assert ranked_ids(backend, "projeto", user.id) == [
+            in_title.id,
+            in_content.id,
+        ]
+
+    def test_index_follows_updates_and_deletes(self, backend):
+        """O índice acompanha edições e exclusões das notas."""
+        user = UserFactory()
+        note = NoteFactory(owner=user, title="Rascunho", content="texto")
+        note.title = "Final"
+        note.save()
+        assert ranked_ids(backend, "rascunho", user.id) == []
+        assert ranked_ids(backend, "final", user.id) == [note.id]
+
+        note.delete()
+        assert ranked_ids(backend, "final", user.id) == []
+
+    def test_search_is_scoped_by_owner(self, backend):
+        """A busca com owner_id não retorna notas de outros usuários."""
+        note = NoteFactory(title="Segredo")
+        assert ranked_ids(backend, "segredo", note.owner_id + 1) == []
+
+    def test_query_without_terms_finds_nothing(self, backend):
+        """Uma consulta só com pontuação não encontra notas e ainda ordena."""
+        NoteFactory(title="Texto")
+        assert ranked_ids(backend, "?!", None) == []
+
+    def test_operators_in_query_are_treated_as_text(self, backend):
+        """Aspas e operadores do FTS5 na consulta não geram erro."""
+        user = UserFactory()
+        NoteFactory(owner=user, title="Texto")
+        assert ranked_ids(backend, '"texto" (', user.id) != []
+
+
+@pytest.mark.django_db
+class TestNoteSearchAPI:
+    def test_search_query_param(self):
+        """Testa o parâmetro ?q= na listagem de notas."""
+        user = UserFactory()
+        match = NoteFactory(owner=user, title="Viagem", content="Passagens")
+        NoteFactory(owner=user, title="Trabalho", content="Relatório")
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+
+        response = api_client.get(reverse("note-list"), {"q": "passagens"})
+
+        assert response.status_code == 200
+        assert [item["id"] for item in response.data] == [match.id]
+
+    @pytest.mark.parametrize(
+        "backend", ["core.search.SQLiteFTSBackend", "core.search.TermIndexBackend"]
+    )
+    def test_cursor_walks_all_search_matches(self, settings, backend):
+        """A paginação percorre todos os resultados da busca, sem corte."""
+        settings.NOTES_SEARCH_BACKEND = backend
+        user = UserFactory()
+        notes = NoteFactory.create_bulk(250, owner=user, title="Orçamento anual")
+        NoteFactory.create_bulk(5, owner=user, title="Outro assunto", content="x")
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+
+        ids = []
+        url = reverse("note-list") + "?q=orcamento&page_size=100"
+        while url:
+            response = api_client.get(url)
+            assert response.status_code == 200
+            ids.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+
+        assert sorted(ids) == sorted(note.id for note in notes)
+
+    @pytest.mark.parametrize(
+        "backend", ["core.search.SQLiteFTSBackend", "core.search.TermIndexBackend"]
+    )
+    @pytest.mark.parametrize("extra", ["", "&view=summary"])
+    def test_pages_follow_relevance(self, settings, backend, extra):
+        """Com paginação, as páginas da busca seguem a relevância e não a data."""
+        settings.NOTES_SEARCH_BACKEND = backend
+        user = UserFactory()
+        in_title = NoteFactory.create_batch(
+            3, owner=user, title="Projeto", content="ideias"
+        )
+        # Mais recentes, mas com o termo só no conteúdo
+        in_content = NoteFactory.create_batch(
+            3, owner=user, title="Ideias", content="projeto"
+        )
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+
+        pages = []
+        url = reverse("note-list") + "?q=projeto&page_size=3" + extra
+        while url:
+            response = api_client.get(url)
+            assert response.status_code == 200
+            pages.append([item["id"] for item in response.data["results"]])
+            url = response.data["next"]
+
+        by_id = lambda notes: sorted((note.id for note in notes), reverse=True)
+        assert pages == [by_id(in_title), by_id(in_content)]
+
+        previous = api_client.get(response.data["previous"])
+        assert [item["id"] for item in previous.data["results"]] == by_id(in_title)
+
+    def test_default_backend_on_sqlite_is_fts(self):
+        """No SQLite com FTS5 o backend padrão é a tabela FTS."""
+        assert isinstance(get_backend(), SQLiteFTSBackend)
+        assert not isinstance(get_backend(), TermIndexBackend)
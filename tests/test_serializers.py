@@ -0,0 +1,147 @@
+from unittest import mock
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from api.serializers import (
+    CategoryCountSerializer,
+    CategorySerializer,
+    CategoryValuesSerializer,
+    NoteSerializer,
+    NoteValuesSerializer,
+)
+from core.models import Category, Note
+from .factories import CategoryFactory, NoteFactory
+
+
+@pytest.mark.django_db
+class TestCategoryResolution:
+    def test_resolves_names_and_ids_in_constant_queries(self):
+        """Resolver 20 categorias (ids e nomes novos) custa sempre 3 consultas."""
+        existing = CategoryFactory.create_batch(5)
+        items = [category.id for category in existing] + [f"Tag {i}" for i in range(15)]
+
+        with CaptureQueriesContext(connection) as context:
+            categories = NoteSerializer()._optimize_category_query(items)
+
+        # Ignora os SAVEPOINT/RELEASE abertos pelo transaction.atomic
+        queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if "SAVEPOINT" not in query["sql"]
+        ]
+        assert len(queries) == 3
+
+        assert len(categories) == 20
+        assert categories[:5] == existing
+        assert categories[5].name == "tag 0"
+
+    def test_duplicate_names_are_collapsed(self):
+        """Nomes que normalizam para o mesmo valor viram uma única categoria."""
+        categories = NoteSerializer()._optimize_category_query(
+            ["Work", "  work ", "WORK"]
+        )
+        assert [category.name for category in categories] == ["work"]
+        assert Category.objects.count() == 1
+
+    def test_unknown_id_raises_validation_error(self):
+        """Um id inexistente gera erro de validação."""
+        with pytest.raises(serializers.ValidationError):
+            NoteSerializer()._optimize_category_query([9999])
+
+    def test_concurrent_creation_of_same_name(self):
+        """Se outra requisição cria o mesmo nome no meio do caminho, a linha dela é reutilizada."""
+        original_bulk_create = Category.objects.bulk_create
+
+        def racing_bulk_create(objs, **kwargs):
+            # Simula a requisição concorrente gravando o nome antes de nós
+            Category.objects.create(name="shared")
+            return original_bulk_create(objs, **kwargs)
+
+        with mock.patch.object(
+            Category.objects, "bulk_create", side_effect=racing_bulk_create
+        ):
+            categories = NoteSerializer()._optimize_category_query(["Shared"])
+
+        assert Category.objects.filter(name="shared").count() == 1
+        assert categories[0].pk == Category.objects.get(name="shared").pk
+
+    def test_set_categories_replaces_note_categories(self):
+        """Testa que _set_categories substitui as categorias da nota."""
+        note = NoteFactory(categories=CategoryFactory.create_batch(2))
+        NoteSerializer()._set_categories(note, ["only one"])
+        assert list(note.categories.values_list("name", flat=True)) == ["only one"]
+
+
+@pytest.mark.django_db
+class TestValuesSerializers:
+    @pytest.fixture
+    def notes(self):
+        """Fixture com notas de dois usuários e várias categorias por nota."""
+        categories = [CategoryFactory(name=f"tag {i}") for i in range(4)]
+        notes = NoteFactory.create_batch(6)
+        for i, note in enumerate(notes):
+            note.categories.set(categories[: i % 4])
+        return notes
+
+    def _render(self, data):
+        return JSONRenderer().render(data)
+
+    def test_note_output_is_byte_identical(self, notes):
+        """Testa que o caminho rápido gera o mesmo JSON do NoteSerializer."""
+        queryset = NoteSerializer.setup_eager_loading(Note.objects.order_by("-id"))
+        expected = self._render(NoteSerializer(queryset, many=True).data)
+
+        fast = NoteValuesSerializer()
+        assert self._render(fast.serialize(fast.get_values(queryset))) == expected
+
+    @override_settings(TIME_ZONE="UTC")
+    def test_utc_datetimes_use_z_suffix(self, notes):
+        """Testa o formato de datas em UTC, que o DRF termina com "Z"."""
+        queryset = NoteSerializer.setup_eager_loading(Note.objects.all())
+        fast = NoteValuesSerializer()
+        data = fast.serialize(fast.get_values(queryset))
+
+        assert data[0]["created_at"].endswith("Z")
+        assert self._render(data) == self._render(
+            NoteSerializer(queryset, many=True).data
+        )
+
+    def test_sparse_fields_match(self, notes):
+        """Testa o caminho rápido com só alguns campos."""
+        fields = ["title", "categories"]
+        queryset = Note.objects.order_by("id")
+        expected = NoteSerializer(
+            NoteSerializer.setup_eager_loading(queryset, field_names=fields),
+            many=True,
+            context={"fields": fields},
+        ).data
+
+        fast = NoteValuesSerializer(fields)
+        assert self._render(fast.serialize(fast.get_values(queryset))) == self._render(
+            expected
+        )
+
+    def test_categories_are_loaded_in_one_query(self, notes):
+        """Testa que as categorias de todas as notas vêm de uma consulta."""
+        fast = NoteValuesSerializer()
+        with CaptureQueriesContext(connection) as context:
+            fast.serialize(fast.get_values(Note.objects.all()))
+
+        assert len(context.captured_queries) == 2
+
+    @pytest.mark.parametrize("with_counts", [False, True])
+    def test_category_output_is_byte_identical(self, notes, with_counts):
+        """Testa as categorias, com e sem o contador de uso."""
+        serializer_class = (
+            CategoryCountSerializer if with_counts else CategorySerializer
+        )
+        queryset = Category.objects.all()
+        expected = self._render(serializer_class(queryset, many=True).data)
+
+        fast = CategoryValuesSerializer(with_counts=with_counts)
+        assert self._render(fast.serialize(fast.get_values(queryset))) == expected
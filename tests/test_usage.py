@@ -0,0 +1,207 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Category, CategoryUsage, Note
+from .factories import CategoryFactory, NoteFactory, UserFactory
+
+
+def usage(owner, category):
+    row = CategoryUsage.objects.filter(owner=owner, category=category).first()
+    return row.count if row else 0
+
+
+@pytest.mark.django_db
+class TestCategoryUsageCounters:
+    @pytest.fixture
+    def user(self):
+        """Fixture para criar um usuário."""
+        return UserFactory()
+
+    def test_add_remove_and_clear(self, user):
+        """Os contadores acompanham add, remove e clear nos dois lados."""
+        work, home = CategoryFactory(name="work"), CategoryFactory(name="home")
+        note = NoteFactory(owner=user)
+        note.categories.add(work, home)
+        note.categories.add(work)  # já ligada: não conta de novo
+        work.notes.add(NoteFactory(owner=user))
+
+        work.refresh_from_db()
+        assert work.usage_count == 2
+        assert usage(user, work) == 2
+
+        note.categories.remove(home, CategoryFactory(name="unused"))
+        home.refresh_from_db()
+        assert home.usage_count == 0
+
+        work.notes.clear()
+        work.refresh_from_db()
+        assert work.usage_count == 0
+        assert usage(user, work) == 0
+
+    def test_note_delete_releases_usage(self, user):
+        """Excluir notas (inclusive em lote) decrementa os contadores."""
+        work = CategoryFactory(name="work")
+        for note in NoteFactory.create_batch(3, owner=user):
+            note.categories.add(work)
+
+        Note.objects.filter(owner=user)[:1].get().delete()
+        Note.objects.filter(owner=user).delete()
+
+        work.refresh_from_db()
+        assert work.usage_count == 0
+
+    def test_bulk_api_paths_update_usage(self, user):
+        """Criação e atualização em lote pela API mantêm os contadores."""
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+        response = api_client.post(
+            reverse("note-list"),
+            [
+                {"title": "A", "content": "...", "category_names": ["work"]},
+                {"title": "B", "content": "...", "category_names": ["work", "home"]},
+            ],
+            format="json",
+        )
+        work = Category.objects.get(name="work")
+        assert work.usage_count == 2
+
+        api_client.patch(
+            reverse("note-bulk"),
+            [{"id": response.data[0]["id"], "category_names": ["home"]}],
+            format="json",
+        )
+        work.refresh_from_db()
+        assert work.usage_count == 1
+        assert usage(user, Category.objects.get(name="home")) == 2
+
+    def test_drifted_counters_stop_at_zero(self, user):
+        """Remover uma categoria com contadores defasados não gera erro 500."""
+        work = CategoryFactory(name="work")
+        note = NoteFactory(owner=user, categories=[work])
+        Category.objects.update(usage_count=0)
+        CategoryUsage.objects.update(count=0)
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+
+        response = api_client.patch(
+            reverse("note-detail", kwargs={"pk": note.pk}),
+            {"category_names": []},
+            format="json",
+        )
+
+        assert response.status_code == 200
+        work.refresh_from_db()
+        assert work.usage_count == 0
+        assert usage(user, work) == 0
+
+    def test_recount_repairs_counters(self, user):
+        """O comando de recontagem corrige contadores divergentes."""
+        work = CategoryFactory(name="work")
+        NoteFactory(owner=user).categories.add(work)
+        Category.objects.update(usage_count=99)
+        CategoryUsage.objects.all().delete()
+
+        call_command("recount_category_usage", stdout=io.StringIO())
+
+        work.refresh_from_db()
+        assert work.usage_count == 1
+        assert usage(user, work) == 1
+
+
+@pytest.mark.django_db
+class TestCategoryCountsAPI:
+    @pytest.fixture
+    def user(self):
+        """Fixture para criar um usuário."""
+        return UserFactory()
+
+    @pytest.fixture
+    def api_client(self, user):
+        """Fixture para criar um APIClient autenticado."""
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+        return api_client
+
+    @pytest.fixture
+    def categories(self, user):
+        """Três categorias usadas 3, 2 e 1 vezes pelo usuário."""
+        categories = [CategoryFactory(name=name) for name in ("a", "b", "c")]
+        for count, category in zip((3, 2, 1), categories):
+            for note in NoteFactory.create_batch(count, owner=user):
+                note.categories.add(category)
+        return categories
+
+    def test_list_with_counts(self, api_client, categories):
+        """?with_counts=1 inclui os contadores sem agregar por categoria."""
+        response = api_client.get(reverse("category-list"), {"with_counts": 1})
+        counts = {item["name"]: item["usage_count"] for item in response.data}
+        assert counts == {"a": 3, "b": 2, "c": 1}
+
+        response = api_client.get(reverse("category-list"))
+        assert "usage_count" not in response.data[0]
+
+    def test_etag_changes_when_counts_change(self, api_client, user, categories):
+        """O ETag da listagem com contadores muda quando o uso muda."""
+        url = reverse("category-list")
+        etag = api_client.get(url, {"with_counts": 1})["ETag"]
+        NoteFactory(owner=user).categories.add(categories[2])
+
+        response = api_client.get(url, {"with_counts": 1}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+    def test_cloud_for_current_user(self, api_client, categories):
+        """A nuvem de tags traz as categorias mais usadas pelo usuário."""
+        NoteFactory().categories.add(categories[2])  # outro usuário
+        response = api_client.get(reverse("category-cloud"), {"limit": 2})
+        assert response.data == [
+            {"id": categories[0].id, "name": "a", "count": 3},
+            {"id": categories[1].id, "name": "b", "count": 2},
+        ]
+
+    def test_cloud_for_all_users(self, api_client, categories):
+        """Com scope=all a nuvem usa o contador global da categoria."""
+        for note in NoteFactory.create_batch(3):
+            note.categories.add(categories[2])
+        response = api_client.get(reverse("category-cloud"), {"scope": "all"})
+        assert [item["name"] for item in response.data] == ["c", "a", "b"]
+        assert response.data[0]["count"] == 4
+
+
+@pytest.mark.django_db
+class TestCategoryAutocomplete:
+    @pytest.fixture
+    def api_client(self):
+        """Fixture para criar um APIClient autenticado."""
+        api_client = APIClient()
+        api_client.force_authenticate(user=UserFactory())
+        return api_client
+
+    def test_matches_normalized_prefix_ranked_by_usage(self, api_client):
+        """O prefixo é normalizado e os resultados vêm ordenados por uso."""
+        Category.objects.bulk_create(
+            [
+                Category(name="work", usage_count=1),
+                Category(name="work trips", usage_count=5),
+                Category(name="workout", usage_count=3),
+                Category(name="home", usage_count=9),
+            ]
+        )
+        response = api_client.get(
+            reverse("category-autocomplete"), {"q": "  WORK ", "limit": 2}
+        )
+        assert [item["name"] for item in response.data] == ["work trips", "workout"]
+
+        response = api_client.get(reverse("category-autocomplete"), {"q": "Work  T"})
+        assert [item["name"] for item in response.data] == ["work trips"]
+
+    def test_empty_query_returns_most_used(self, api_client):
+        """Sem prefixo, devolve as categorias mais usadas."""
+        Category.objects.bulk_create(
+            [Category(name="a", usage_count=1), Category(name="b", usage_count=2)]
+        )
+        response = api_client.get(reverse("category-autocomplete"))
+        assert [item["name"] for item in response.data] == ["b", "a"]
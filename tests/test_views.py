@@ -1,7 +1,19 @@
+import csv
+import io
+import json
+import time
 import pytest
+from datetime import timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
 from rest_framework.test import APIClient
-from core.models import Note, Category
+from api.pagination import NoteCursorPagination
+from api.sync import encode_sync_token
+from core.cache import get_notes_cache
+from core.models import Note, Category, CategoryUsage, NoteTombstone
 from .factories import UserFactory, CategoryFactory, NoteFactory
 
 
@@ -12,9 +24,10 @@ class TestNoteAPI:
         """Fixture para criar uma instância do APIClient."""
         return APIClient()
 
-    @pytest.fixture#(scope='session')
-    def user(self):
-        """Fixture para criar um usuário autenticado."""
+    @pytest.fixture(scope="class")
+    @classmethod
+    def user(cls, class_db):
+        """Fixture para criar um usuário autenticado, uma vez por classe."""
         return UserFactory()
 
     def test_list_notes(self, api_client, user):
@@ -44,6 +57,41 @@ class TestNoteAPI:
         assert Note.objects.count() == 1  # Verifica se uma nova nota foi criada
         assert Category.objects.count() == 1  # Verifica se a categoria foi criada
 
+    def test_create_note_with_category_ids(self, api_client, user):
+        """Ids de categorias existentes são resolvidos, e não viram nomes."""
+        work = CategoryFactory(name="work")
+        api_client.force_authenticate(user=user)
+        data = {"title": "T", "content": "C", "category_names": [work.id, "New"]}
+        response = api_client.post(reverse("note-list"), data, format="json")
+
+        assert response.status_code == 201
+        assert [c["name"] for c in response.data["categories"]] == ["work", "new"]
+        assert Category.objects.count() == 2
+
+    def test_create_note_with_unknown_category_id(self, api_client, user):
+        """Um id inexistente devolve 400 sem criar a nota nem categorias."""
+        work = CategoryFactory(name="work")
+        api_client.force_authenticate(user=user)
+        data = {"title": "T", "content": "C", "category_names": [work.id, 99999]}
+        response = api_client.post(reverse("note-list"), data, format="json")
+
+        assert response.status_code == 400
+        assert response.data["category_names"] == [
+            "Category with id 99999 does not exist."
+        ]
+        assert Note.objects.count() == 0
+        assert list(Category.objects.values_list("name", flat=True)) == ["work"]
+
+    def test_create_note_rejects_invalid_category_items(self, api_client, user):
+        """Itens que não são id nem nome são recusados na validação."""
+        api_client.force_authenticate(user=user)
+        for item in ({"id": 1}, True, " "):
+            data = {"title": "T", "content": "C", "category_names": [item]}
+            response = api_client.post(reverse("note-list"), data, format="json")
+            assert response.status_code == 400
+            assert "category_names" in response.data
+        assert Category.objects.count() == 0
+
     def test_create_note_unauthenticated(self, api_client):
         """Testa o endpoint de criação de nota para um usuário não autenticado."""
         url = reverse("note-list")  # Endpoint de criação de notas
@@ -128,3 +176,729 @@ class TestNoteAPI:
         response = api_client.patch(url, data, format="json")  # Faz a requisição PATCH
 
         assert response.status_code == 404  # Verifica se a resposta é 404 Not Found
+
+
+@pytest.mark.django_db
+class TestNotePagination:
+    @pytest.fixture
+    def api_client(self):
+        """Fixture para criar uma instância do APIClient."""
+        return APIClient()
+
+    @pytest.fixture
+    def user(self):
+        """Fixture para criar um usuário autenticado."""
+        return UserFactory()
+
+    def _collect(self, api_client, url):
+        """Percorre todas as páginas seguindo o link 'next'."""
+        ids = []
+        while url:
+            response = api_client.get(url)
+            assert response.status_code == 200
+            ids.extend(item["id"] for item in response.data["results"])
+            url = response.data["next"]
+        return ids
+
+    def test_list_without_params_is_not_paginated(self, api_client, user):
+        """Sem parâmetros de paginação a listagem continua sendo uma lista simples."""
+        NoteFactory.create_batch(3, owner=user)
+        api_client.force_authenticate(user=user)
+        response = api_client.get(reverse("note-list"))
+        assert isinstance(response.data, list)
+
+    def test_cursor_walks_all_notes_in_order(self, api_client, user):
+        """Testa que as páginas cobrem todas as notas, da mais recente para a mais antiga."""
+        notes = NoteFactory.create_batch(7, owner=user)
+        api_client.force_authenticate(user=user)
+        ids = self._collect(api_client, reverse("note-list") + "?page_size=3")
+        expected = [
+            note.id
+            for note in sorted(notes, key=lambda n: (n.updated_at, n.id), reverse=True)
+        ]
+        assert ids == expected
+
+    def test_cursor_is_stable_when_note_is_edited(self, api_client, user):
+        """Editar uma nota já vista não duplica nem pula registros nas próximas páginas."""
+        NoteFactory.create_batch(6, owner=user)
+        api_client.force_authenticate(user=user)
+        response = api_client.get(reverse("note-list") + "?page_size=3")
+        first_page = [item["id"] for item in response.data["results"]]
+
+        edited = Note.objects.get(id=first_page[-1])
+        edited.title = "Edited"
+        edited.save()
+
+        rest = self._collect(api_client, response.data["next"])
+        assert len(rest) == 3
+        assert not set(rest) & set(first_page)
+
+    def test_previous_link_returns_to_previous_page(self, api_client, user):
+        """Testa a navegação para trás usando o link 'previous'."""
+        NoteFactory.create_batch(5, owner=user)
+        api_client.force_authenticate(user=user)
+        first = api_client.get(reverse("note-list") + "?page_size=2")
+        second = api_client.get(first.data["next"])
+        back = api_client.get(second.data["previous"])
+        assert back.data["results"] == first.data["results"]
+
+    def test_page_size_is_capped(self, api_client, user, monkeypatch):
+        """O tamanho de página pedido pelo cliente é limitado por max_page_size."""
+        monkeypatch.setattr(NoteCursorPagination, "max_page_size", 2)
+        NoteFactory.create_batch(3, owner=user)
+        api_client.force_authenticate(user=user)
+        response = api_client.get(reverse("note-list") + "?page_size=1000")
+        assert len(response.data["results"]) == 2
+
+    def test_invalid_cursor_returns_404(self, api_client, user):
+        """Um cursor corrompido resulta em 404."""
+        api_client.force_authenticate(user=user)
+        response = api_client.get(reverse("note-list") + "?cursor=garbage")
+        assert response.status_code == 404
+
+
+@pytest.mark.django_db
+class TestNoteQueryCount:
+    def test_list_runs_constant_number_of_queries(self, django_assert_num_queries):
+        """Listar 1.000 notas com categorias não gera consultas por nota."""
+        user = UserFactory()
+        categories = CategoryFactory.create_bulk(3)
+        NoteFactory.create_bulk(1000, owner=user, categories=categories)
+
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+        # Uma consulta para os validadores (ETag), uma para as notas (com o
+        # proprietário) e outra para as categorias
+        with django_assert_num_queries(3):
+            response = api_client.get(reverse("note-list"))
+
+        assert response.status_code == 200
+        assert len(response.data) == 1000
+        assert len(response.data[0]["categories"]) == 3
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+    @pytest.fixture
+    def api_client(self):
+        """Fixture para criar uma instância do APIClient."""
+        return APIClient()
+
+    @pytest.fixture(scope="class")
+    @classmethod
+    def user(cls, class_db):
+        """Fixture para criar um usuário, uma vez por classe."""
+        return UserFactory()
+
+    @pytest.fixture(scope="class")
+    @classmethod
+    def note(cls, user):
+        """Fixture para uma nota com conteúdo longo e uma categoria."""
+        note = NoteFactory(owner=user, title="Longa", content="palavra " * 500)
+        note.categories.add(CategoryFactory(name="work"))
+        return note
+
+    def _selects(self, queries):
+        return [q["sql"] for q in queries if 'FROM "core_note"' in q["sql"]]
+
+    def test_fields_limits_output_and_columns(self, api_client, user, note):
+        """Testa que ?fields= devolve só os campos pedidos sem ler o conteúdo."""
+        api_client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client.get(reverse("note-list") + "?fields=id,title")
+
+        assert response.status_code == 200
+        assert response.data == [{"id": note.id, "title": "Longa"}]
+        selects = self._selects(ctx.captured_queries)
+        assert selects and all('"content"' not in sql for sql in selects)
+        # Só a consulta agregada do ETag junta as categorias; nenhuma é carregada
+        assert not any('FROM "core_category"' in q["sql"] for q in ctx.captured_queries)
+
+    def test_omit_removes_fields(self, api_client, user, note):
+        """Testa que ?omit= remove os campos informados."""
+        api_client.force_authenticate(user=user)
+        response = api_client.get(reverse("note-list") + "?omit=content,owner")
+
+        assert set(response.data[0]) == {
+            "id",
+            "title",
+            "created_at",
+            "updated_at",
+            "categories",
+        }
+
+    def test_unknown_field_returns_400(self, api_client, user, note):
+        """Testa que um campo inexistente é rejeitado."""
+        api_client.force_authenticate(user=user)
+        response = api_client.get(reverse("note-list") + "?fields=id,secret")
+
+        assert response.status_code == 400
+        assert response.data == {"fields": ["Unknown field(s): secret."]}
+
+    def test_summary_view(self, api_client, user, note):
+        """Testa a representação compacta, com os nomes das categorias."""
+        api_client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client.get(reverse("note-list") + "?view=summary")
+
+        assert response.data == [
+            {
+                "id": note.id,
+                "title": "Longa",
+                "updated_at": response.data[0]["updated_at"],
+                "categories": ["work"],
+            }
+        ]
+        assert all(
+            '"content"' not in sql for sql in self._selects(ctx.captured_queries)
+        )
+
+    def test_summary_preview_is_truncated_in_database(self, api_client, user, note):
+        """Testa que a prévia é cortada no banco e marcada com reticências."""
+        api_client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client.get(
+                reverse("note-detail", kwargs={"pk": note.id})
+                + "?view=summary&preview=12"
+            )
+
+        assert response.status_code == 200
+        assert response.data["content_preview"] == "palavra pala…"
+        assert any(
+            "SUBSTR" in sql.upper() for sql in self._selects(ctx.captured_queries)
+        )
+
+    def test_short_content_preview_is_not_marked(self, api_client, user):
+        """Testa que conteúdo menor que a prévia volta inteiro."""
+        note = NoteFactory(owner=user, content="curta")
+        api_client.force_authenticate(user=user)
+        response = api_client.get(
+            reverse("note-detail", kwargs={"pk": note.id}) + "?view=summary&preview=50"
+        )
+
+        assert response.data["content_preview"] == "curta"
+
+    def test_invalid_preview_returns_400(self, api_client, user, note):
+        """Testa que a prévia tem limite de tamanho."""
+        api_client.force_authenticate(user=user)
+        response = api_client.get(reverse("note-list") + "?view=summary&preview=5000")
+
+        assert response.status_code == 400
+        assert "preview" in response.data
+
+    def test_representation_changes_etag(self, api_client, user, note):
+        """Testa que cada representação da nota tem o próprio ETag."""
+        api_client.force_authenticate(user=user)
+        url = reverse("note-detail", kwargs={"pk": note.id})
+        full = api_client.get(url)
+        partial = api_client.get(url + "?fields=id")
+
+        assert full["ETag"] != partial["ETag"]
+        assert partial.data == {"id": note.id}
+
+    def test_cursor_pagination_with_sparse_fields(self, api_client, user, note):
+        """Testa a paginação por cursor com campos que não incluem updated_at."""
+        NoteFactory.create_batch(2, owner=user)
+        api_client.force_authenticate(user=user)
+        response = api_client.get(reverse("note-list") + "?fields=title&page_size=2")
+        next_page = api_client.get(response.data["next"])
+
+        assert len(response.data["results"]) == 2
+        assert len(next_page.data["results"]) == 1
+        assert set(next_page.data["results"][0]) == {"title"}
+
+
+@pytest.mark.django_db
+class TestNoteBulkAPI:
+    @pytest.fixture
+    def api_client(self):
+        """Fixture para criar uma instância do APIClient."""
+        return APIClient()
+
+    @pytest.fixture
+    def user(self):
+        """Fixture para criar um usuário autenticado."""
+        return UserFactory()
+
+    def test_bulk_create(self, api_client, user):
+        """Testa a criação de várias notas com uma única requisição."""
+        api_client.force_authenticate(user=user)
+        data = [
+            {"title": f"Note {i}", "content": "...", "category_names": ["Bulk", "Tag"]}
+            for i in range(5)
+        ]
+        response = api_client.post(reverse("note-list"), data, format="json")
+
+        assert response.status_code == 201
+        assert len(response.data) == 5
+        assert Note.objects.filter(owner=user).count() == 5
+        assert Category.objects.count() == 2
+        assert {c["name"] for c in response.data[0]["categories"]} == {"bulk", "tag"}
+
+    def test_bulk_create_reports_errors_per_item(self, api_client, user):
+        """Um item inválido impede a gravação do lote e o erro aponta o item."""
+        api_client.force_authenticate(user=user)
+        data = [{"title": "Ok", "content": "..."}, {"content": "Missing title"}]
+        response = api_client.post(reverse("note-list"), data, format="json")
+
+        assert response.status_code == 400
+        assert response.data[0] == {}
+        assert "title" in response.data[1]
+        assert Note.objects.count() == 0
+
+    def test_bulk_update(self, api_client, user):
+        """Testa a atualização parcial de várias notas."""
+        notes = NoteFactory.create_batch(3, owner=user)
+        api_client.force_authenticate(user=user)
+        data = [
+            {"id": notes[0].id, "title": "First"},
+            {"id": notes[1].id, "category_names": ["Updated"]},
+        ]
+        response = api_client.patch(reverse("note-bulk"), data, format="json")
+
+        assert response.status_code == 200
+        notes[0].refresh_from_db()
+        assert notes[0].title == "First"
+        assert list(notes[1].categories.values_list("name", flat=True)) == ["updated"]
+        assert response.data[1]["categories"][0]["name"] == "updated"
+
+    def test_bulk_create_and_update_with_category_ids(self, api_client, user):
+        """O lote aceita ids de categorias misturados com nomes."""
+        work = CategoryFactory(name="work")
+        api_client.force_authenticate(user=user)
+        data = [
+            {"title": "A", "content": "...", "category_names": [work.id]},
+            {"title": "B", "content": "...", "category_names": ["home", work.id]},
+        ]
+        response = api_client.post(reverse("note-list"), data, format="json")
+
+        assert response.status_code == 201
+        assert [c["name"] for c in response.data[0]["categories"]] == ["work"]
+        assert {c["name"] for c in response.data[1]["categories"]} == {"home", "work"}
+        assert Category.objects.count() == 2
+
+        data = [{"id": response.data[0]["id"], "category_names": [99999]}]
+        response = api_client.patch(reverse("note-bulk"), data, format="json")
+        assert response.status_code == 400
+        assert Category.objects.count() == 2
+
+    def test_bulk_update_ignores_notes_of_other_users(self, api_client, user):
+        """Notas de outro usuário são reportadas como não encontradas."""
+        other_note = NoteFactory()
+        api_client.force_authenticate(user=user)
+        data = [{"id": other_note.id, "title": "Hijacked"}]
+        response = api_client.patch(reverse("note-bulk"), data, format="json")
+
+        assert response.status_code == 400
+        assert "id" in response.data[0]
+        other_note.refresh_from_db()
+        assert other_note.title != "Hijacked"
+
+    def test_bulk_delete(self, api_client, user):
+        """Testa a exclusão de várias notas por lista de ids."""
+        notes = NoteFactory.create_batch(3, owner=user)
+        api_client.force_authenticate(user=user)
+        ids = [note.id for note in notes[:2]]
+        response = api_client.delete(reverse("note-bulk"), {"ids": ids}, format="json")
+
+        assert response.status_code == 204
+        assert list(Note.objects.values_list("id", flat=True)) == [notes[2].id]
+
+    def test_bulk_delete_records_tombstones_in_one_insert(self, api_client, user):
+        """A exclusão em lote registra todas as exclusões com um só INSERT."""
+        notes = NoteFactory.create_bulk(20, owner=user)
+        ids = [note.id for note in notes]
+        api_client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.delete(
+                reverse("note-bulk"), {"ids": ids}, format="json"
+            )
+
+        assert response.status_code == 204
+        table = NoteTombstone._meta.db_table
+        inserts = [
+            query
+            for query in context.captured_queries
+            if query["sql"].startswith(f'INSERT INTO "{table}"')
+        ]
+        assert len(inserts) == 1
+        assert set(NoteTombstone.objects.values_list("note_id", flat=True)) == set(ids)
+
+    def test_bulk_delete_queries_do_not_grow_with_notes(self, api_client, user):
+        """A exclusão em lote faz o mesmo número de consultas para 5 ou 100 notas."""
+        api_client.force_authenticate(user=user)
+        categories = CategoryFactory.create_bulk(3)
+        queries = []
+        for size in (5, 100):
+            notes = NoteFactory.create_bulk(size, owner=user, categories=categories)
+            with CaptureQueriesContext(connection) as context:
+                response = api_client.delete(
+                    reverse("note-bulk"),
+                    {"ids": [note.id for note in notes]},
+                    format="json",
+                )
+            assert response.status_code == 204
+            queries.append(len(context.captured_queries))
+
+        assert queries[0] == queries[1]
+        assert not CategoryUsage.objects.filter(owner=user, count__gt=0).exists()
+        assert set(Category.objects.values_list("usage_count", flat=True)) == {0}
+
+    def test_bulk_delete_is_all_or_nothing(self, api_client, user):
+        """Se um id não pertence ao usuário, nenhuma nota é excluída."""
+        note = NoteFactory(owner=user)
+        other_note = NoteFactory()
+        api_client.force_authenticate(user=user)
+        ids = [note.id, other_note.id]
+        response = api_client.delete(reverse("note-bulk"), {"ids": ids}, format="json")
+
+        assert response.status_code == 400
+        assert response.data["ids"][0] == {}
+        assert Note.objects.count() == 2
+
+    def test_duplicate_copies_categories(self, api_client, user):
+        """Testa a duplicação de notas em lote, com as categorias."""
+        categories = CategoryFactory.create_batch(2)
+        note = NoteFactory(owner=user, title="Template", categories=categories)
+        api_client.force_authenticate(user=user)
+        response = api_client.post(
+            reverse("note-duplicate"), {"ids": [note.id]}, format="json"
+        )
+
+        assert response.status_code == 201
+        assert response.data[0]["title"] == "Cópia de Template"
+        assert {c["name"] for c in response.data[0]["categories"]} == {
+            c.name for c in categories
+        }
+        assert Note.objects.filter(owner=user).count() == 2
+
+    def test_duplicate_rejects_notes_of_other_users(self, api_client, user):
+        """Notas de outros usuários não podem ser duplicadas."""
+        other_note = NoteFactory()
+        api_client.force_authenticate(user=user)
+        response = api_client.post(
+            reverse("note-duplicate"), {"ids": [other_note.id]}, format="json"
+        )
+
+        assert response.status_code == 400
+        assert Note.objects.count() == 1
+
+
+@pytest.mark.django_db
+class TestNoteSyncAPI:
+    @pytest.fixture
+    def api_client(self):
+        """Fixture para criar uma instância do APIClient."""
+        return APIClient()
+
+    @pytest.fixture
+    def user(self):
+        """Fixture para criar um usuário autenticado."""
+        return UserFactory()
+
+    def test_first_sync_returns_everything(self, api_client, user):
+        """Sem token, a sincronização devolve todas as notas do usuário."""
+        NoteFactory.create_batch(3, owner=user)
+        NoteFactory()  # Nota de outro usuário
+        api_client.force_authenticate(user=user)
+        response = api_client.get(reverse("note-sync"))
+
+        assert response.status_code == 200
+        assert len(response.data["changed"]) == 3
+        assert response.data["deleted"] == []
+        assert response.data["reset"] is True
+        assert response.data["token"]
+
+    def test_sync_returns_only_changes_since_token(self, api_client, user):
+        """Com token, vêm só as notas alteradas e os ids das excluídas."""
+        untouched, edited, removed = NoteFactory.create_batch(3, owner=user)
+        old = timezone.now() - timedelta(minutes=10)
+        Note.objects.filter(owner=user).update(updated_at=old)
+        token = encode_sync_token(old + timedelta(minutes=1))
+
+        edited.title = "Edited"
+        edited.save()
+        removed_id = removed.id
+        removed.delete()
+        created = NoteFactory(owner=user)
+
+        api_client.force_authenticate(user=user)
+        response = api_client.get(reverse("note-sync"), {"token": token})
+
+        assert response.status_code == 200
+        assert {item["id"] for item in response.data["changed"]} == {
+            edited.id,
+            created.id,
+        }
+        assert response.data["deleted"] == [removed_id]
+        assert response.data["reset"] is False
+
+    def test_sync_with_invalid_token(self, api_client, user):
+        """Um token corrompido resulta em 400."""
+        api_client.force_authenticate(user=user)
+        response = api_client.get(reverse("note-sync"), {"token": "garbage"})
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestConditionalRequests:
+    @pytest.fixture
+    def user(self):
+        """Fixture para criar um usuário autenticado."""
+        return UserFactory()
+
+    @pytest.fixture
+    def api_client(self, user):
+        """Fixture para criar um APIClient autenticado."""
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+        return api_client
+
+    def test_list_if_none_match_returns_304(self, api_client, user):
+        """Repetir a listagem com o ETag recebido resulta em 304."""
+        NoteFactory.create_batch(2, owner=user)
+        first = api_client.get(reverse("note-list"))
+        assert first.status_code == 200
+
+        second = api_client.get(reverse("note-list"), HTTP_IF_NONE_MATCH=first["ETag"])
+        assert second.status_code == 304
+        assert second["ETag"] == first["ETag"]
+
+    def test_list_etag_changes_after_edit_and_delete(self, api_client, user):
+        """O ETag da listagem muda quando uma nota é editada ou excluída."""
+        note, other = NoteFactory.create_batch(2, owner=user)
+        etag = api_client.get(reverse("note-list"))["ETag"]
+
+        note.title = "Changed"
+        note.save()
+        response = api_client.get(reverse("note-list"), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+        etag = response["ETag"]
+        other.delete()
+        response = api_client.get(reverse("note-list"), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+    def test_if_modified_since_alone_never_returns_stale_304(self, api_client, user):
+        """Sem Last-Modified, um If-Modified-Since sozinho não gera 304 antigo."""
+        category = CategoryFactory(name="work")
+        note, other = NoteFactory.create_batch(2, owner=user, categories=[category])
+        list_url = reverse("note-list")
+        detail_url = reverse("note-detail", kwargs={"pk": note.id})
+        for url in (list_url, detail_url):
+            assert "Last-Modified" not in api_client.get(url)
+        since = http_date(time.time() + 3600)
+
+        other.delete()
+        response = api_client.get(list_url, HTTP_IF_MODIFIED_SINCE=since)
+        assert response.status_code == 200
+        assert len(response.data) == 1
+
+        category.name = "renamed"
+        category.save()
+        response = api_client.get(detail_url, HTTP_IF_MODIFIED_SINCE=since)
+        assert response.status_code == 200
+        assert response.data["categories"][0]["name"] == "renamed"
+
+    def test_patch_with_stale_if_match_returns_412(self, api_client, user):
+        """Um PATCH com ETag desatualizado é rejeitado com 412."""
+        note = NoteFactory(owner=user)
+        url = reverse("note-detail", kwargs={"pk": note.id})
+        etag = api_client.get(url)["ETag"]
+
+        note.title = "Changed elsewhere"
+        note.save()
+        response = api_client.patch(
+            url, {"title": "Mine"}, format="json", HTTP_IF_MATCH=etag
+        )
+        assert response.status_code == 412
+        note.refresh_from_db()
+        assert note.title == "Changed elsewhere"
+
+    def test_patch_with_current_if_match_succeeds(self, api_client, user):
+        """Um PATCH com o ETag atual é aplicado e devolve o novo ETag."""
+        note = NoteFactory(owner=user)
+        url = reverse("note-detail", kwargs={"pk": note.id})
+        etag = api_client.get(url)["ETag"]
+
+        response = api_client.patch(
+            url, {"title": "Mine"}, format="json", HTTP_IF_MATCH=etag
+        )
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        assert api_client.get(url)["ETag"] == response["ETag"]
+
+    def test_editing_another_note_keeps_if_match_valid(self, api_client, user):
+        """Editar uma nota não muda o ETag das outras notas do usuário."""
+        note, other = NoteFactory.create_batch(2, owner=user)
+        url = reverse("note-detail", kwargs={"pk": other.id})
+        etag = api_client.get(url)["ETag"]
+
+        note.title = "Changed"
+        note.save()
+        response = api_client.patch(
+            url, {"title": "Mine"}, format="json", HTTP_IF_MATCH=etag
+        )
+        assert response.status_code == 200
+
+    def test_etags_do_not_depend_on_process_local_state(self, api_client, user):
+        """
+        Os ETags vêm só do banco: outro worker, com o cache (e as versões)
+        vazio, calcula os mesmos valores e responde 304.
+        """
+        note = NoteFactory(owner=user, categories=[CategoryFactory(name="work")])
+        urls = [reverse("note-list"), reverse("note-detail", kwargs={"pk": note.id})]
+        etags = [api_client.get(url)["ETag"] for url in urls]
+
+        get_notes_cache().clear()
+        for url, etag in zip(urls, etags):
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 304
+
+    def test_renaming_a_category_changes_note_etags(self, api_client, user):
+        """Renomear uma categoria muda o ETag da listagem e das notas que a usam."""
+        category = CategoryFactory(name="work")
+        note = NoteFactory(owner=user, categories=[category])
+        urls = [reverse("note-list"), reverse("note-detail", kwargs={"pk": note.id})]
+        etags = [api_client.get(url)["ETag"] for url in urls]
+
+        category.name = "renamed"
+        category.save()
+        get_notes_cache().clear()
+        for url, etag in zip(urls, etags):
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 200
+
+    def test_delete_with_stale_if_match_returns_412(self, api_client, user):
+        """Um DELETE com ETag desatualizado não exclui a nota."""
+        note = NoteFactory(owner=user)
+        url = reverse("note-detail", kwargs={"pk": note.id})
+        response = api_client.delete(url, HTTP_IF_MATCH='"stale"')
+        assert response.status_code == 412
+        assert Note.objects.filter(id=note.id).exists()
+
+    def test_category_list_etag(self, api_client):
+        """A listagem de categorias responde 304 até uma categoria ser renomeada."""
+        category = CategoryFactory()
+        etag = api_client.get(reverse("category-list"))["ETag"]
+        response = api_client.get(reverse("category-list"), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        category.name = "renamed"
+        category.save()
+        response = api_client.get(reverse("category-list"), HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+
+@pytest.mark.django_db
+class TestNoteExport:
+    @pytest.fixture
+    def user(self):
+        """Fixture para criar um usuário autenticado."""
+        return UserFactory()
+
+    @pytest.fixture
+    def api_client(self, user):
+        """Fixture para criar um APIClient autenticado."""
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+        return api_client
+
+    def test_export_ndjson_streams_one_note_per_line(self, api_client, user):
+        """A exportação NDJSON traz uma nota por linha, com as categorias."""
+        category = CategoryFactory(name="export")
+        notes = [NoteFactory(owner=user, categories=[category]) for _ in range(3)]
+        NoteFactory()  # Nota de outro usuário
+
+        response = api_client.get(reverse("note-export"), {"format": "ndjson"})
+
+        assert response.status_code == 200
+        assert response.streaming
+        assert response["Content-Type"].startswith("application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        assert [row["id"] for row in rows] == [note.id for note in notes]
+        assert rows[0]["categories"] == [{"id": category.id, "name": "export"}]
+
+    def test_export_csv(self, api_client, user):
+        """A exportação CSV tem cabeçalho e categorias separadas por ';'."""
+        categories = [CategoryFactory(name="a"), CategoryFactory(name="b")]
+        note = NoteFactory(owner=user, title="Nota, com vírgula", categories=categories)
+
+        response = api_client.get(reverse("note-export"), {"format": "csv"})
+
+        assert response.status_code == 200
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        assert rows[0]["id"] == str(note.id)
+        assert rows[0]["title"] == "Nota, com vírgula"
+        assert sorted(rows[0]["categories"].split(";")) == ["a", "b"]
+
+    def test_export_csv_without_notes_has_header(self, api_client):
+        """Mesmo sem notas, o CSV traz a linha de cabeçalho."""
+        response = api_client.get(reverse("note-export"), {"format": "csv"})
+        content = b"".join(response.streaming_content).decode()
+        assert content.splitlines() == [
+            "id,title,content,created_at,updated_at,owner,categories"
+        ]
+
+
+@pytest.mark.django_db
+class TestNoteListPage:
+    @pytest.fixture
+    def user(self):
+        """Fixture para criar um usuário."""
+        return UserFactory()
+
+    @pytest.fixture
+    def logged_client(self, client, user):
+        """Fixture para um cliente com sessão do usuário."""
+        client.force_login(user)
+        return client
+
+    def _create_notes(self, user, count):
+        category = CategoryFactory(name="work")
+        notes = Note.objects.bulk_create(
+            Note(title=f"Note {i}", content="...", owner=user) for i in range(count)
+        )
+        Through = Note.categories.through
+        Through.objects.bulk_create(
+            Through(note_id=note.id, category_id=category.id) for note in notes
+        )
+        return notes
+
+    def test_list_is_paginated(self, logged_client, user):
+        """A página inicial mostra 24 notas por página com links de navegação."""
+        self._create_notes(user, 30)
+
+        response = logged_client.get(reverse("note_list"))
+        assert len(response.context["notes"]) == 24
+        assert response.context["is_paginated"]
+        assert "?page=2" in response.content.decode()
+
+        response = logged_client.get(reverse("note_list"), {"page": 2})
+        assert len(response.context["notes"]) == 6
+        assert "?page=1" in response.content.decode()
+
+    def test_page_runs_constant_number_of_queries(
+        self, logged_client, user, django_assert_num_queries
+    ):
+        """Uma página com categorias não gera consultas por nota."""
+        self._create_notes(user, 100)
+        # Sessão, usuário, agregados da chave (com o total), notas (com o
+        # proprietário) e categorias
+        with django_assert_num_queries(5):
+            response = logged_client.get(reverse("note_list"))
+        assert response.content.decode().count(">work</span>") == 24
+
+    def test_note_fragment_is_rendered_again_after_edit(self, logged_client, user):
+        """Editar uma nota troca só o fragmento dela na página em cache."""
+        note, other = self._create_notes(user, 2)
+        logged_client.get(reverse("note_list"))
+
+        note.refresh_from_db()
+        note.title = "Edited"
+        note.save()
+        content = logged_client.get(reverse("note_list")).content.decode()
+        assert "Edited" in content
+        assert other.title in content